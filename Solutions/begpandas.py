@@ -227,7 +227,7 @@ nyc.head()
 #  * s.s.temp.
 #
 # * Replace empty values (``.``) with ``NaN``. 
-# * Pull the year, month, and date columns into a single variable using the ``parse_dates`` parameter (see the ``pd.read_csv`` docs for info on this).
+# * Combine the year, month, and day columns into a single date column (``pd.to_datetime`` with a ``format`` can parse them once they are joined into one string).
 #
 # FYI, zonal winds are along east/west axis. Meridonal winds are north/south.
 
@@ -245,8 +245,11 @@ humidity
 air temp.
 s.s.temp.'''.split('\n')
 
-nino = pd.read_csv('../data/tao-all2.dat.gz', sep=' ', names=names, na_values='.',
-                  parse_dates=[[1,2,3]])
+nino = pd.read_csv('../data/tao-all2.dat.gz', sep=' ', names=names, na_values='.')
+# pandas 2 dropped parse_dates=[[1,2,3]], so combine year, month and day ourselves
+ymd = nino.pop('year')*10_000 + nino.pop('month')*100 + nino.pop('day')
+nino.insert(0, 'year_month_day',
+            pd.to_datetime(ymd.astype(str).str.zfill(6), format='%y%m%d'))
 nino
 # -
 
@@ -95,8 +95,11 @@ humidity
 air temp.
 s.s.temp.'''.split('\n')
 
-nino = pd.read_csv('../data/tao-all2.dat.gz', sep=' ', names=names, na_values='.',
-                  parse_dates=[[1,2,3]])
+nino = pd.read_csv('../data/tao-all2.dat.gz', sep=' ', names=names, na_values='.')
+# pandas 2 dropped parse_dates=[[1,2,3]], so combine year, month and day ourselves
+ymd = nino.pop('year')*10_000 + nino.pop('month')*100 + nino.pop('day')
+nino.insert(0, 'year_month_day',
+            pd.to_datetime(ymd.astype(str).str.zfill(6), format='%y%m%d'))
 
 nino = tweak_nino(nino)
 # -
@@ -157,14 +160,14 @@ nyc.plot(x='EST', y='Mean_Humidity', figsize=(12, 6) )
 
 # Can resample columns, since our index is a date we can use *Offset Aliases*
 # see https://pandas.pydata.org/pandas-docs/stable/user_guide/timeseries.html#offset-aliases
-nyc.set_index('EST').Mean_Humidity.resample('M').mean().plot(figsize=(10, 6)) 
+nyc.set_index('EST').Mean_Humidity.resample('ME').mean().plot(figsize=(10, 6)) 
 
 # Can resample columns, since our index is a date we can use *Offset Aliases*
 # see https://pandas.pydata.org/pandas-docs/stable/user_guide/timeseries.html#offset-aliases
 (nyc
  .set_index('EST')
  .Mean_Humidity
- .resample('M')
+ .resample('ME')
  .mean()
  .plot(figsize=(10, 6)) 
 )
@@ -373,19 +376,19 @@ nino.zon_winds.fillna(nino.zon_winds.median()).hist()
 # Pandas allows us to perform aggregates calculations over grouped portions of ``Series`` or ``DataFrames``. The ``.groupby`` method is the low level workhorse that enables this.
 
 # We can group by a column, but if it has unique values it isn't useful
-nyc.groupby('EST').mean()['CloudCover']
+nyc.groupby('EST').mean(numeric_only=True)['CloudCover']
 
 # We can group by a column, but if it has unique values it isn't useful
 (nyc
  .groupby('EST')
- .mean()
+ .mean(numeric_only=True)
  ['CloudCover']
 )
 
 # Let's get the average cloud cover each month
 (nyc
  .groupby(nyc.EST.dt.month)
- .mean()
+ .mean(numeric_only=True)
  ['CloudCover']
 )
 
@@ -393,7 +396,7 @@ nyc.groupby('EST').mean()['CloudCover']
 # what if we want to group by year and month?
 (nyc
  .groupby([nyc.EST.dt.year, nyc.EST.dt.month])
- .mean()
+ .mean(numeric_only=True)
  ['CloudCover']
 )
 
@@ -401,35 +404,38 @@ nyc.groupby('EST').mean()['CloudCover']
 # what if we want to group by year and month?
 (nyc
  .groupby([nyc.EST.dt.year, nyc.EST.dt.month])
- .mean()
+ .mean(numeric_only=True)
  ['CloudCover']
  .plot()
 )
 
 # To fix date/index can use grouper
 (nyc
- .groupby(pd.Grouper(key='EST', freq='M'))
- .mean()
+ .groupby(pd.Grouper(key='EST', freq='ME'))
+ .mean(numeric_only=True)
  ['CloudCover']
  .plot()
 )
 
 # With the .agg method we can apply many functions
 (nyc
- .groupby(pd.Grouper(key='EST', freq='M'))
+ .groupby(pd.Grouper(key='EST', freq='ME'))
+ [nyc.select_dtypes('number').columns]
  .agg(['mean', 'max', 'count'])
 )
 
 # Pull out a column
 (nyc
- .groupby(pd.Grouper(key='EST', freq='M'))
+ .groupby(pd.Grouper(key='EST', freq='ME'))
+ [nyc.select_dtypes('number').columns]
  .agg(['mean', 'max', 'count'])
  .Mean_TemperatureF
 )
 
 # Then Plot
 (nyc
- .groupby(pd.Grouper(key='EST', freq='M'))
+ .groupby(pd.Grouper(key='EST', freq='ME'))
+ [nyc.select_dtypes('number').columns]
  .agg(['mean', 'max', 'count'])
  .Mean_TemperatureF
  .plot()
@@ -466,7 +472,7 @@ nyc.pivot_table(index=[nyc.EST.dt.year.rename('year'), nyc.EST.dt.month],
                values=['Max_Humidity', 'Max_Dew_PointF']).plot(figsize=(14,6))
 
 # Fix x-axis with grouper
-nyc.pivot_table(index=pd.Grouper(key='EST', freq='m'), #[nyc.EST.dt.year.rename('year'), nyc.EST.dt.month],
+nyc.pivot_table(index=pd.Grouper(key='EST', freq='ME'), #[nyc.EST.dt.year.rename('year'), nyc.EST.dt.month],
                 aggfunc=[np.max, np.count_nonzero],
                values=['Max_Humidity', 'Max_Dew_PointF']).plot(figsize=(14,6))
 
@@ -527,7 +533,7 @@ nino.pivot_table(index=[nino.date.dt.year, nino.date.dt.month], aggfunc=[np.max,
 
 # fix x-axis
 (nino
- .pivot_table(index=pd.Grouper(key='date', freq='m'), aggfunc=[np.max, 'min', np.mean], values='air_temp')
+ .pivot_table(index=pd.Grouper(key='date', freq='ME'), aggfunc=[np.max, 'min', np.mean], values='air_temp')
  .plot()
 )
 
@@ -0,0 +1,61 @@
+"""Integer date assembly vs. the string round trip on tao-all2.dat.gz
+
+Run from the project root::
+
+    python benchmarks/bench_dates.py
+"""
+import sys
+import timeit
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pdcourse.dates import (two_digit_year, ymd_to_datetime,  # noqa: E402
+                            yymmdd_to_datetime)
+from pdcourse.load import NINO_PATH, nino_csv_kwargs  # noqa: E402
+
+
+def ymd_strings(df):
+    # what parse_dates=[[1,2,3]] does: join with spaces and parse
+    joined = (df.year.astype(str) + ' ' + df.month.astype(str) + ' '
+              + df.day.astype(str))
+    return pd.to_datetime(joined, format='%y %m %d')
+
+
+def ymd_ints(df):
+    return ymd_to_datetime(two_digit_year(df.year), df.month, df.day)
+
+
+def yymmdd_strings(df):
+    return pd.to_datetime(df.date, format='%y%m%d')
+
+
+def yymmdd_ints(df):
+    return yymmdd_to_datetime(df.date)
+
+
+def bench(label, func, df, number=5):
+    best = min(timeit.repeat(lambda: func(df), number=1, repeat=number))
+    print('{:<28} {:8.1f} ms'.format(label, best * 1000))
+    return best
+
+
+def main():
+    df = pd.read_csv(NINO_PATH, **nino_csv_kwargs())
+    print('{} rows'.format(len(df)))
+    assert (ymd_strings(df).to_numpy('datetime64[ns]') ==
+            ymd_ints(df).to_numpy()).all()
+    assert (yymmdd_strings(df).to_numpy('datetime64[ns]') ==
+            yymmdd_ints(df).to_numpy()).all()
+    slow = bench('year/month/day strings', ymd_strings, df)
+    fast = bench('year/month/day integers', ymd_ints, df)
+    print('  speedup {:.1f}x'.format(slow / fast))
+    slow = bench('yymmdd to_datetime(format)', yymmdd_strings, df)
+    fast = bench('yymmdd integers', yymmdd_ints, df)
+    print('  speedup {:.1f}x'.format(slow / fast))
+
+
+if __name__ == '__main__':
+    main()
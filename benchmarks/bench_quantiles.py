@@ -0,0 +1,100 @@
+"""QuantileSketch vs. exact grouped quantiles on the vehicles data
+
+Run from the project root::
+
+    python benchmarks/bench_quantiles.py
+
+For each grouping, prints the exact ``groupby(...).quantile`` time, the
+sketch time for a few ``delta`` values, the largest difference in value
+and the largest rank error (share of the group's values between the
+estimate and the exact answer) over all groups.  ``city08`` is whole mpg
+numbers, which the sketch stores exactly; ``co2TailpipeGpm`` has many
+distinct values per group.  The last lines time sketching partitions of
+the data (repeated ``REPEAT`` times) in a process pool and merging them.
+"""
+import sys
+import timeit
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pdcourse import read_autos  # noqa: E402
+from pdcourse.sketch import QuantileSketch, approx_quantile  # noqa: E402
+
+CASES = [
+    # (column, group columns, q)
+    ('city08', ['year', 'make'], .7),
+    ('co2TailpipeGpm', ['year'], .5),
+    ('co2TailpipeGpm', ['year'], .99),
+    ('co2TailpipeGpm', [], .9),
+]
+DELTAS = [50, 200, 1000]
+REPEAT = 50
+
+
+def best(func, number=5):
+    return min(timeit.repeat(func, number=1, repeat=number))
+
+
+def rank_error(auto, column, by, estimate, exact):
+    """Largest share of a group's values lying strictly between the
+    estimate and the exact quantile"""
+    df = auto[by + [column]].dropna()
+    values = df[column].to_numpy()
+    if by:
+        index = pd.MultiIndex.from_frame(df[by])
+        estimate = estimate.reindex(index).to_numpy()
+        exact = exact.reindex(index).to_numpy()
+    lo = np.minimum(estimate, exact)
+    hi = np.maximum(estimate, exact)
+    between = pd.Series((values > lo) & (values < hi))
+    if not by:
+        return between.mean()
+    return between.groupby([df[c].to_numpy() for c in by]).mean().max()
+
+
+def main():
+    auto = read_autos()
+    print('{} rows'.format(len(auto)))
+    for column, by, q in CASES:
+        keys = [auto[c] for c in by] or None
+        if by:
+            exact = auto.groupby(by)[column].quantile(q)
+            slow = best(lambda: auto.groupby(by)[column].quantile(q))
+        else:
+            exact = auto[column].quantile(q)
+            slow = best(lambda: auto[column].quantile(q))
+        label = '{} by {} q={}'.format(column, by or 'nothing', q)
+        print('\n{}: exact {:.1f} ms'.format(label, slow * 1000))
+        for delta in DELTAS:
+            got = approx_quantile(auto[column], q, by=keys, delta=delta)
+            fast = best(lambda: approx_quantile(auto[column], q, by=keys,
+                                                delta=delta))
+            size = len(QuantileSketch(delta).update(auto[column],
+                                                    keys).means)
+            diff = np.max(np.abs(np.asarray(got) - np.asarray(exact)))
+            print('  delta {:>5}: {:7.1f} ms  {:6} centroids  max diff '
+                  '{:8.4f}  rank error {:.5f} (bound {:.5f})'.format(
+                      delta, fast * 1000, size, diff,
+                      rank_error(auto, column, by, got, exact),
+                      QuantileSketch(delta).rank_error))
+    # partitions sketched in parallel and merged, on the data repeated
+    big = pd.concat([auto[['year', 'make', 'city08']]] * REPEAT,
+                    ignore_index=True)
+    keys = [big.year, big.make]
+    took = best(lambda: big.groupby(['year', 'make']).city08.quantile(.7),
+                number=3)
+    print('\ncity08 by year/make, {} rows: exact {:.0f} ms'.format(
+        len(big), took * 1000))
+    for processes in (1, 4):
+        took = best(lambda: approx_quantile(big.city08, .7, by=keys,
+                                            processes=processes), number=3)
+        print('  sketch, {} process(es): {:.0f} ms'.format(processes,
+                                                         took * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""GridIndex box/decade queries vs. boolean masks on the TAO data
+
+Run from the project root::
+
+    python benchmarks/bench_spatial.py
+"""
+import sys
+import timeit
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pdcourse import load_nino  # noqa: E402
+from pdcourse.spatial import GridIndex  # noqa: E402
+
+QUERIES = [
+    # (label, lat, lon, date)
+    ('1980s, lon > 120, |lat| < 2', (-2, 2), (120, None),
+     ('1980-01-01', '1990-01-01')),
+    ('1990s, lon > 120, |lat| < 2', (-2, 2), (120, None),
+     ('1990-01-01', '2000-01-01')),
+    ('1995, 0-5N 150-170E', (0, 5), (150, 170), ('1995-01-01', '1996-01-01')),
+    ('everything south of 0', (None, 0), None, None),
+]
+
+
+def mask_query(nino, lat, lon, date):
+    mask = np.ones(len(nino), dtype=bool)
+    for col, bounds in (('latitude', lat), ('longitude', lon)):
+        if bounds is None:
+            continue
+        if bounds[0] is not None:
+            mask &= nino[col] > bounds[0]
+        if bounds[1] is not None:
+            mask &= nino[col] < bounds[1]
+    if date is not None:
+        mask &= (nino.date >= date[0]) & (nino.date < date[1])
+    return nino[mask]
+
+
+def best(func, number=20):
+    return min(timeit.repeat(func, number=1, repeat=number))
+
+
+def main():
+    nino = load_nino()
+    build = best(lambda: GridIndex(nino), number=3)
+    grid = GridIndex(nino)
+    print('{} rows, {!r}, build {:.1f} ms'.format(len(nino), grid,
+                                                   build * 1000))
+    # the notebook's year based masks
+    slow = best(lambda: nino[(nino.date.dt.year >= 1980) &
+                             (nino.date.dt.year < 1990) &
+                             (nino.longitude > 120) &
+                             (nino.latitude > -2) & (nino.latitude < 2)])
+    print('{:<32} {:>7.2f} ms (notebook masks)'.format(QUERIES[0][0],
+                                                       slow * 1000))
+    for label, lat, lon, date in QUERIES:
+        expected = mask_query(nino, lat, lon, date)
+        got = grid.select(lat, lon, date)
+        assert expected.index.equals(got.index), label
+        slow = best(lambda: mask_query(nino, lat, lon, date))
+        fast = best(lambda: grid.select(lat, lon, date))
+        print('{:<32} {:>7.2f} ms mask {:>7.2f} ms grid  {:5.1f}x  '
+              '({} rows)'.format(label, slow * 1000, fast * 1000,
+                                 slow / fast, len(got)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,30 @@
+"""Helpers shared by the course notebooks.
+
+The lesson notebooks sit next to the package and import it directly.  The
+ones in ``Solutions/`` and ``Class/`` (``solutions`` and ``class`` in the
+Docker image) live one directory below, so add the parent to the path
+before importing::
+
+    import sys
+    sys.path.insert(0, '..')
+    import pdcourse
+    nino = pdcourse.load_nino()
+"""
+from .append import DailyTable, monthly_mean, year_month_pivot
+from .cache import cached_frame, clear_cache
+from .compact import compact_frame, compact_series, memory_report
+from .encode import EventsEncoder
+from .features import buoy_id, lag_features
+from .impute import impute
+from .lazy import LazyFrame, scan
+from .load import (DATA_DIR, NINO_NAMES, load_nino, load_nyc, read_autos,
+                   read_nino, read_nino_files, read_nyc)
+from .lookup import FrameIndex, nyc_index
+from .missing import MissingProfile
+from .models import ModelStore
+from .plot import decimate, line_plot, scatter_plot
+from .rollup import TimeCube
+from .spatial import GridIndex
+from .stream import GroupAgg, PivotAgg, iter_nino, stream_groupby
+from .tweak import Pipeline, fix_col, fix_nino_col, tweak_nino, tweak_nyc
+from .udf import vectorize
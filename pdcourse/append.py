@@ -0,0 +1,117 @@
+"""Incrementally growing daily tables.
+
+``central-park-raw.csv`` gains a row per day.  A ``DailyTable`` remembers
+how far into the file it has read, so ``refresh()`` parses and tweaks only
+the new lines, and feeds them to the derived results registered with
+``watch`` (anything with an ``update(chunk)`` method, such as
+``stream.GroupAgg`` and ``stream.PivotAgg``)::
+
+    table = DailyTable()
+    table.watch('cloud', monthly_mean('CloudCover'))
+    table.watch('humidity', year_month_pivot())
+    ...
+    table.refresh()
+    table['cloud'].result('mean')
+"""
+import io
+import os
+
+import pandas as pd
+
+from .load import NYC_PATH
+from .stream import GroupAgg, PivotAgg
+from .tweak import tweak_nyc
+
+
+def year_month(df):
+    "``[nyc.EST.dt.year.rename('year'), nyc.EST.dt.month]`` from the notebooks"
+    return [df.EST.dt.year.rename('year'), df.EST.dt.month]
+
+
+def monthly_mean(column='CloudCover'):
+    "Running ``nyc.groupby([year, month])[column]`` aggregates"
+    return GroupAgg(year_month, column)
+
+
+def year_month_pivot(values=('Max_Humidity', 'Max_Dew_PointF')):
+    "Running ``nyc.pivot_table(index=[year, month], values=values)``"
+    return PivotAgg(year_month, list(values))
+
+
+class DailyTable:
+    """A CSV backed table that is read incrementally.
+
+    ``tweak`` is a ``tweak.Pipeline`` applied to every batch of new rows on
+    its own, so it must work row by row (``tweak_nyc`` does).
+    """
+    def __init__(self, path=NYC_PATH, tweak=tweak_nyc, parse_dates=(0,)):
+        self.path = path
+        self.tweak = tweak
+        self.parse_dates = list(parse_dates)
+        self.views = {}
+        self._header = None
+        self._offset = 0
+        self._chunks = []
+        self._frame = None
+        self.refresh()
+
+    def __len__(self):
+        return sum(len(chunk) for chunk in self._chunks)
+
+    def __getitem__(self, name):
+        return self.views[name]
+
+    def __repr__(self):
+        return '<DailyTable {} rows, views={}>'.format(len(self),
+                                                       list(self.views))
+
+    @property
+    def frame(self):
+        "The whole tweaked table"
+        if self._frame is None:
+            if self._chunks:
+                self._chunks = [pd.concat(self._chunks, ignore_index=True)]
+            self._frame = self._chunks[0] if self._chunks else None
+        return self._frame
+
+    def watch(self, name, view):
+        "Register ``view`` and feed it the rows read so far"
+        for chunk in self._chunks:
+            view.update(chunk)
+        self.views[name] = view
+        return view
+
+    def _read_new(self):
+        "Bytes of complete lines added since the last read"
+        if os.path.getsize(self.path) < self._offset:
+            raise ValueError('{} shrank, create a new table'.format(self.path))
+        with open(self.path, 'rb') as fin:
+            if self._header is None:
+                self._header = fin.readline()
+                self._offset = fin.tell()
+            fin.seek(self._offset)
+            data = fin.read()
+        # leave a partially written last line for the next refresh
+        end = data.rfind(b'\n') + 1
+        self._offset += end
+        return data[:end]
+
+    def refresh(self):
+        "Read rows appended to the file since the last call, return them"
+        data = self._read_new()
+        if not data.strip():
+            return None
+        raw = pd.read_csv(io.BytesIO(self._header + data),
+                          parse_dates=self.parse_dates)
+        return self.append(raw)
+
+    def append(self, raw):
+        """Add rows in the raw file format (eg. from another source) and
+        update the views.  Returns the tweaked rows."""
+        rows = self.tweak(raw).reset_index(drop=True)
+        rows.index += len(self)
+        self._chunks.append(rows)
+        self._frame = None
+        for view in self.views.values():
+            view.update(rows)
+        return rows
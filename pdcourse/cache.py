@@ -0,0 +1,236 @@
+"""On-disk columnar cache for parsed data files.
+
+Each cached frame is a directory holding one ``.npy`` file per column plus
+a ``meta.json`` describing the source file (size, mtime, sha1) and how to
+rebuild every column.  A cache entry is served when the source still has
+the same size and mtime, or when the mtime changed but the content hash did
+not (eg. after a ``touch`` or a fresh checkout).
+
+An entry can also hold just some columns.  Asking ``cached_frame`` for
+``columns`` reads only those ``.npy`` files, and builds and adds the ones
+the entry does not have yet, without rebuilding the others.  Added columns
+get files with fresh random names and are merged into the ``meta.json`` on
+disk, so notebooks adding columns to the same entry at once don't overwrite
+each other's files.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import uuid
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+CACHE_DIR = Path(__file__).resolve().parent.parent / 'data' / '.cache'
+FORMAT_VERSION = 3
+
+
+def file_hash(path, blocksize=1 << 20):
+    "sha1 hexdigest of the bytes in ``path``"
+    h = hashlib.sha1()
+    with open(path, 'rb') as fin:
+        for block in iter(lambda: fin.read(blocksize), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def file_stat(path):
+    st = os.stat(path)
+    return {'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+
+def entry_dir(path, tag, cache_dir=None):
+    # the directory hash keeps same-named files (eg. per buoy) apart
+    cache_dir = Path(cache_dir or CACHE_DIR)
+    path = Path(path).resolve()
+    where = hashlib.sha1(str(path.parent).encode()).hexdigest()[:8]
+    return cache_dir / '{}-{}.{}'.format(path.name, where, tag)
+
+
+def _read_meta(entry):
+    try:
+        with open(entry / 'meta.json') as fin:
+            meta = json.load(fin)
+    except (OSError, ValueError):
+        return None
+    if meta.get('version') != FORMAT_VERSION:
+        return None
+    return meta
+
+
+def _is_fresh(meta, path, entry):
+    """Check ``meta`` against the source file.  A matching mtime is trusted,
+    otherwise fall back to the content hash (and refresh the stored mtime on
+    a match so the next check is cheap again)."""
+    stat = file_stat(path)
+    if meta['source']['size'] != stat['size']:
+        return False
+    if meta['source']['mtime_ns'] == stat['mtime_ns']:
+        return True
+    if meta['source']['sha1'] != file_hash(path):
+        return False
+    meta['source'].update(stat)
+    current = _read_meta(entry)
+    if current is not None and current['source']['sha1'] == \
+            meta['source']['sha1']:
+        current['source'].update(stat)
+        try:
+            _write_meta(entry, current)
+        except OSError:
+            pass
+    return True
+
+
+def _write_meta(entry, meta):
+    with tempfile.NamedTemporaryFile('w', dir=entry, prefix='meta.',
+                                     suffix='.tmp', delete=False) as fout:
+        json.dump(meta, fout, indent=1)
+    os.replace(fout.name, entry / 'meta.json')
+
+
+def _save_column(dirname, stem, ser):
+    """Write ``ser`` to ``dirname`` as ``stem.npy`` (and ``stem.cats.npy``)
+    and return its meta description"""
+    dtype = ser.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        np.save(dirname / '{}.npy'.format(stem), ser.cat.codes.to_numpy())
+        np.save(dirname / '{}.cats.npy'.format(stem),
+                np.asarray(dtype.categories, dtype=object), allow_pickle=True)
+        return {'file': stem, 'kind': 'category',
+                'ordered': bool(dtype.ordered)}
+    if isinstance(dtype, np.dtype) and dtype.kind in 'biufcmM':
+        np.save(dirname / '{}.npy'.format(stem), ser.to_numpy())
+        return {'file': stem, 'kind': 'numpy'}
+    # strings/objects: store as codes + uniques and restore the dtype on load
+    codes, uniques = pd.factorize(ser)
+    np.save(dirname / '{}.npy'.format(stem), codes)
+    np.save(dirname / '{}.cats.npy'.format(stem),
+            np.asarray(uniques, dtype=object), allow_pickle=True)
+    return {'file': stem, 'kind': 'factorized', 'dtype': str(dtype)}
+
+
+def _load_column(dirname, col):
+    values = np.load(dirname / '{}.npy'.format(col['file']))
+    if col['kind'] == 'numpy':
+        return values
+    cats = np.load(dirname / '{}.cats.npy'.format(col['file']),
+                   allow_pickle=True)
+    if col['kind'] == 'category':
+        return pd.Categorical.from_codes(values, cats, ordered=col['ordered'])
+    # factorize marks missing values with -1, which picks the trailing NaN
+    out = np.append(cats, np.nan).take(values)
+    return pd.array(out, dtype=col['dtype'])
+
+
+def write_frame(entry, df, source, build_version=0, complete=True):
+    """Store ``df`` in the cache directory ``entry`` (replacing it
+    atomically).  ``complete`` says ``df`` has every column the build can
+    make, not just some."""
+    entry = Path(entry)
+    entry.parent.mkdir(parents=True, exist_ok=True)
+    tmp = Path(tempfile.mkdtemp(dir=entry.parent, prefix=entry.name + '.'))
+    try:
+        columns = [dict(name=name, **_save_column(tmp, str(i), df[name]))
+                   for i, name in enumerate(df.columns)]
+        meta = {'version': FORMAT_VERSION, 'build_version': build_version,
+                'source': source, 'nrows': len(df), 'complete': complete,
+                'columns': columns}
+        _write_meta(tmp, meta)
+        if entry.exists():
+            shutil.rmtree(entry)
+        os.replace(tmp, entry)
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+
+
+def _same_build(a, b):
+    return all(a.get(key) == b.get(key)
+               for key in ('build_version', 'source', 'nrows'))
+
+
+def add_columns(entry, meta, df):
+    """Add the columns of ``df`` to the cache directory ``entry`` (whose
+    ``meta.json`` held ``meta`` when it was read)"""
+    entry = Path(entry)
+    added = [dict(name=name, **_save_column(entry, uuid.uuid4().hex,
+                                            df[name]))
+             for name in df.columns]
+    # the new files are only used once meta.json lists them.  Another
+    # process may have added columns since ``meta`` was read, so merge
+    # into the current meta.json rather than overwrite it.
+    current = _read_meta(entry)
+    if current is None or not _same_build(current, meta):
+        return
+    have = {col['name'] for col in current['columns']}
+    current['columns'] += [col for col in added if col['name'] not in have]
+    _write_meta(entry, current)
+
+
+def read_frame(entry, meta=None, columns=None):
+    "Cached frame in ``entry``, only ``columns`` (in that order) if given"
+    entry = Path(entry)
+    meta = meta or _read_meta(entry)
+    stored = {col['name']: col for col in meta['columns']}
+    names = [col['name'] for col in meta['columns']]
+    if columns is not None:
+        names = list(columns)
+    data = {name: _load_column(entry, stored[name]) for name in names}
+    return pd.DataFrame(data, index=pd.RangeIndex(meta['nrows']))
+
+
+def cached_frame(path, build, tag='raw', cache_dir=None, version=0,
+                 columns=None):
+    """Return ``build(path)``, memoized on disk.
+
+    ``tag`` names the cache entry, use a different tag for each distinct way
+    of building a frame from the same source file, and change ``version``
+    whenever ``build`` starts producing something different.  The cached
+    frame always has a default RangeIndex.
+
+    With ``columns`` return only those, in that order.  Columns missing
+    from the entry are made with ``build(path, columns=missing)`` and added
+    to it.
+    """
+    entry = entry_dir(path, tag, cache_dir)
+    meta = _read_meta(entry)
+    if (meta is not None and meta.get('build_version') == version
+            and _is_fresh(meta, path, entry)):
+        if columns is None:
+            if meta['complete']:
+                return read_frame(entry, meta)
+        else:
+            have = {col['name'] for col in meta['columns']}
+            missing = [name for name in columns if name not in have]
+            if not missing:
+                return read_frame(entry, meta, columns)
+            new = build(path, columns=missing).reset_index(drop=True)
+            if len(new) == meta['nrows']:
+                try:
+                    add_columns(entry, meta, new)
+                except OSError:
+                    pass
+                old = read_frame(entry, meta,
+                                 [name for name in columns if name in have])
+                return pd.concat([old, new], axis=1)[list(columns)]
+    if columns is None:
+        df = build(path).reset_index(drop=True)
+    else:
+        df = build(path, columns=columns).reset_index(drop=True)
+        df = df[list(columns)]
+    source = dict(path=str(Path(path).resolve()), sha1=file_hash(path),
+                  **file_stat(path))
+    try:
+        write_frame(entry, df, source, build_version=version,
+                    complete=columns is None)
+    except OSError:
+        # read-only checkout, serve the parsed frame uncached
+        pass
+    return df
+
+
+def clear_cache(cache_dir=None):
+    shutil.rmtree(Path(cache_dir or CACHE_DIR), ignore_errors=True)
@@ -0,0 +1,85 @@
+"""Shrink frames by using the smallest dtypes that hold the data.
+
+* integer columns are downcast to the smallest int type holding their range
+* float columns become float32 when that loses no digits (values such as
+  26.14 still read back as 26.14 after rounding to the column's decimals)
+* string columns with few distinct values become categoricals
+"""
+import numpy as np
+import pandas as pd
+
+MAX_DECIMALS = 6
+
+
+def _decimals(values):
+    "Number of decimals used by ``values`` (None if more than MAX_DECIMALS)"
+    for d in range(MAX_DECIMALS + 1):
+        if np.array_equal(np.round(values, d), values):
+            return d
+    return None
+
+
+def _float32_safe(ser):
+    values = ser.to_numpy()
+    values = values[~np.isnan(values)]
+    if not len(values):
+        return True
+    if np.abs(values).max() > np.finfo('float32').max:
+        return False
+    d = _decimals(values)
+    if d is None:
+        return False
+    back = values.astype('float32').astype('float64')
+    return np.array_equal(np.round(back, d), values)
+
+
+def _is_stringish(ser):
+    return (pd.api.types.is_object_dtype(ser.dtype)
+            or pd.api.types.is_string_dtype(ser.dtype))
+
+
+def compact_series(ser, category=None, max_cat_ratio=.5):
+    """Return ``ser`` with a smaller dtype if possible.  ``category`` forces
+    (True) or prevents (False) the string to categorical conversion,
+    otherwise strings with at most ``max_cat_ratio * len(ser)`` distinct
+    values are converted."""
+    dtype = ser.dtype
+    if pd.api.types.is_bool_dtype(dtype):
+        return ser
+    if pd.api.types.is_integer_dtype(dtype) and isinstance(dtype, np.dtype):
+        return pd.to_numeric(ser, downcast='integer')
+    if pd.api.types.is_float_dtype(dtype) and isinstance(dtype, np.dtype):
+        if dtype.itemsize > 4 and _float32_safe(ser):
+            return ser.astype('float32')
+        return ser
+    if _is_stringish(ser) and category is not False:
+        if category or ser.nunique() <= max_cat_ratio * len(ser):
+            return ser.astype('category')
+    return ser
+
+
+def memory_report(before, after):
+    """``memory_usage(deep=True)`` of two frames side by side, with a
+    ``Total`` row"""
+    report = pd.DataFrame({'before': before.memory_usage(deep=True),
+                           'after': after.memory_usage(deep=True)})
+    report.loc['Total'] = report.sum()
+    return report.assign(ratio=lambda df_: df_.after / df_.before)
+
+
+def compact_frame(df, categories=(), max_cat_ratio=.5, verbose=False):
+    """Downcast the columns of ``df``.  Columns named in ``categories``
+    always become categoricals.  With ``verbose`` print the memory use
+    before and after."""
+    out = pd.DataFrame(
+        {name: compact_series(df[name],
+                              category=True if name in categories else None,
+                              max_cat_ratio=max_cat_ratio)
+         for name in df.columns},
+        index=df.index)
+    if verbose:
+        report = memory_report(df, out)
+        total = report.loc['Total']
+        print('memory usage: {:,.0f} -> {:,.0f} bytes ({:.0%})'.format(
+            total.before, total.after, total.ratio))
+    return out
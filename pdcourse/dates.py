@@ -0,0 +1,62 @@
+"""Build datetimes from integer date parts without going through strings.
+
+``parse_dates=[[1,2,3]]`` glues the year/month/day columns into strings
+and parses them again, and ``pd.to_datetime(df.date, format='%y%m%d')``
+formats the integers as text first.  The functions here compute days since
+the epoch with integer arithmetic (the "days from civil" algorithm) and
+return ``datetime64[ns]`` values.
+"""
+import numpy as np
+import pandas as pd
+
+
+def two_digit_year(yy, pivot=69):
+    """Four digit year for ``yy``, years below ``pivot`` are 20xx (69 like
+    ``%y`` in ``pd.to_datetime``)"""
+    if not isinstance(yy, pd.Series):
+        yy = np.asarray(yy, dtype='int64')
+    return yy + 1900 + 100 * (yy < pivot)
+
+
+def _days_from_civil(year, month, day):
+    # March based year so the leap day is the last day of the year
+    y = year - (month <= 2)
+    era = y // 400
+    yoe = y - era * 400
+    doy = (153 * ((month + 9) % 12) + 2) // 5 + day - 1
+    doe = yoe * 365 + yoe // 4 - yoe // 100 + doy
+    return era * 146097 + doe - 719468
+
+
+def ymd_to_datetime(year, month, day, name=None):
+    """``datetime64[ns]`` Series from integer year, month and day arrays.
+
+    Raises ``ValueError`` for out of range months or days, like
+    ``pd.to_datetime`` does.
+    """
+    index = year.index if isinstance(year, pd.Series) else None
+    year = np.asarray(year, dtype='int64')
+    month = np.asarray(month, dtype='int64')
+    day = np.asarray(day, dtype='int64')
+    if ((month < 1) | (month > 12)).any():
+        raise ValueError('month must be in 1..12')
+    days = _days_from_civil(year, month, day)
+    month_len = _days_from_civil(year + (month == 12), month % 12 + 1, 1) - \
+        _days_from_civil(year, month, 1)
+    if ((day < 1) | (day > month_len)).any():
+        raise ValueError('day is out of range for month')
+    values = days.astype('datetime64[D]').astype('datetime64[ns]')
+    return pd.Series(values, index=index, name=name)
+
+
+def yymmdd_to_datetime(values, pivot=69, name=None):
+    "``datetime64[ns]`` Series from integers like 800307 (1980-03-07)"
+    index = values.index if isinstance(values, pd.Series) else None
+    name = name if name is not None else getattr(values, 'name', None)
+    values = np.asarray(values, dtype='int64')
+    year, rest = np.divmod(values, 10000)
+    month, day = np.divmod(rest, 100)
+    out = ymd_to_datetime(two_digit_year(year, pivot), month, day, name=name)
+    if index is not None:
+        out.index = index
+    return out
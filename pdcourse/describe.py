@@ -0,0 +1,286 @@
+"""``describe`` in fewer passes, for frames and for streams of chunks.
+
+``nyc.describe()`` works column by column: count, mean, std, min, max and
+then a full sort for the quantiles.  ``describe(nyc)`` gives the same
+table, but takes the quantiles, min and max from one ``np.partition``
+(selection, not a sort) per column and runs the columns in a thread pool
+(NumPy lets go of the GIL while it works)::
+
+    describe(nyc)                       # nyc.describe()
+    describe(nyc, include='all').T      # nyc.describe(include='all').T
+
+For data read a chunk at a time, ``Describe`` keeps count, mean, the sum
+of squared deviations, min and max per column, merging each chunk's in
+with Chan's update of Welford's algorithm (stable where the sum of
+squares is not), plus a ``sketch.QuantileSketch`` for the quantiles::
+
+    desc = Describe()
+    for chunk in iter_nino('big.dat.gz', chunksize=200_000):
+        desc.update(chunk)
+    desc.result()                       # about nino.describe()
+
+Streamed count, mean, std, min and max are exact (up to rounding), and
+quantiles are within the sketch's rank error.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .sketch import QuantileSketch
+
+PERCENTILES = (.25, .5, .75)
+
+
+def _percentiles(percentiles):
+    "Sorted distinct percentiles, the quartiles by default"
+    qs = set(PERCENTILES if percentiles is None else percentiles)
+    if any(q < 0 or q > 1 for q in qs):
+        raise ValueError('percentiles must be between 0 and 1')
+    return sorted(qs)
+
+
+def _label(q):
+    return '{:g}%'.format(round(q * 100, 6))
+
+
+def _kind(ser):
+    if pd.api.types.is_bool_dtype(ser.dtype):
+        return 'other'
+    if pd.api.types.is_numeric_dtype(ser.dtype):
+        return 'number'
+    if pd.api.types.is_datetime64_any_dtype(ser.dtype):
+        return 'datetime'
+    return 'other'
+
+
+def _unit(dtype):
+    "Resolution of a datetime dtype (``'ns'``, ``'us'``, ...)"
+    return getattr(dtype, 'unit', None) or np.datetime_data(dtype)[0]
+
+
+def _ticks(ser):
+    """Datetimes as int64 ticks of their own unit since the epoch (UTC),
+    NaT as the smallest int64"""
+    ticks = ser.to_numpy('datetime64[{}]'.format(_unit(ser.dtype)))
+    return ticks.view('int64')
+
+
+def _floats(ser, kind):
+    "Values as float64 with NaN for missing, datetimes as ``_ticks``"
+    if kind == 'datetime':
+        ticks = _ticks(ser)
+        return np.where(ticks == np.iinfo('int64').min, np.nan, ticks)
+    return ser.to_numpy('float64', na_value=np.nan)
+
+
+def _present(ser, kind):
+    "Values that are not missing, datetimes as int64 ``_ticks``"
+    if kind == 'datetime':
+        ticks = _ticks(ser)
+        return ticks[ticks != np.iinfo('int64').min]
+    values = _floats(ser, kind)
+    return values[~np.isnan(values)]
+
+
+def _lerp(a, b, t):
+    "Linear interpolation the way ``np.quantile`` does it"
+    diff = b - a
+    return np.where(t >= .5, b - diff * (1 - t), a + diff * t)
+
+
+def _number_stats(v, qs):
+    "count, mean, std, min, quantiles and max of the values ``v``"
+    n = len(v)
+    if not n:
+        return n, np.nan, np.nan, np.full(len(qs) + 2, np.nan)
+    pos = np.asarray(qs) * (n - 1)
+    lo = np.floor(pos).astype('int64')
+    hi = np.minimum(lo + 1, n - 1)
+    # sum in row order before partitioning, the way pandas does, so the
+    # rounding matches
+    mean = v.sum(dtype='float64') / n
+    std = np.sqrt(np.square(v - mean).sum() / (n - 1)) if n > 1 else np.nan
+    v = np.partition(v, np.unique(np.concatenate([[0, n - 1], lo, hi])))
+    found = _lerp(v[lo], v[hi], pos - lo)
+    return n, mean, std, np.concatenate([[v[0]], found, [v[n - 1]]])
+
+
+def _other_stats(ser):
+    "count, unique, top and freq of a non-numeric column"
+    codes, uniques = pd.factorize(ser)
+    counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+    top = counts.argmax() if len(uniques) else None
+    return pd.Series({'count': counts.sum(), 'unique': len(uniques),
+                      'top': np.nan if top is None else uniques[top],
+                      'freq': np.nan if top is None else counts[top]},
+                     dtype=object)
+
+
+def _finish(kind, count, mean, std, order_stats, qs, dtype=None):
+    "One column of the describe table, datetimes back in ``dtype``"
+    names = ['min'] + [_label(q) for q in qs] + ['max']
+    if kind == 'datetime':
+        # like pandas, the mean is truncated to a whole tick
+        ticks = pd.Series(np.trunc([mean, *order_stats]))
+        when = pd.to_datetime(ticks, unit=_unit(dtype))
+        tz = getattr(dtype, 'tz', None)
+        if tz is not None:
+            when = when.dt.tz_localize('UTC').dt.tz_convert(tz)
+        else:
+            when = when.astype(dtype)
+        return pd.Series([count, *when], index=['count', 'mean'] + names,
+                         dtype=object)
+    return pd.Series([count, mean, std, *order_stats],
+                     index=['count', 'mean', 'std'] + names,
+                     dtype='float64')
+
+
+def _assemble(columns, qs):
+    """The describe table from per column Series, numeric table as float
+    and rows in the order pandas gives them"""
+    rows = []
+    # pandas takes the row names from the shortest column index first
+    for index in sorted((ser.index for ser in columns.values()), key=len):
+        rows += [name for name in index if name not in rows]
+    out = pd.concat(columns, axis=1, sort=False).reindex(rows)
+    if all(ser.dtype == 'float64' for ser in columns.values()):
+        return out.astype('float64')
+    return out
+
+
+def _select(df, include):
+    if include == 'all':
+        return df
+    if include is not None:
+        return df.select_dtypes(include=include)
+    picked = [name for name in df if _kind(df[name]) != 'other']
+    return df[picked] if picked else df
+
+
+def describe(df, percentiles=None, include=None, threads=None):
+    """``df.describe(percentiles, include)`` with the columns summarized
+    in ``threads`` threads (all CPUs by default)"""
+    qs = _percentiles(percentiles)
+    df = _select(df, include)
+
+    def one(name):
+        ser = df[name]
+        kind = _kind(ser)
+        if kind == 'other':
+            return _other_stats(ser)
+        return _finish(kind, *_number_stats(_present(ser, kind), qs), qs,
+                       ser.dtype)
+
+    names = list(df.columns)
+    threads = threads or os.cpu_count() or 1
+    if threads > 1 and len(names) > 1:
+        with ThreadPoolExecutor(threads) as pool:
+            found = list(pool.map(one, names))
+    else:
+        found = [one(name) for name in names]
+    return _assemble(dict(zip(names, found)), qs)
+
+
+class Describe:
+    """Mergeable running ``describe`` of the numeric and datetime columns
+    of a stream of chunks (the columns of the first chunk)"""
+    def __init__(self, percentiles=None, delta=200):
+        self.qs = _percentiles(percentiles)
+        self.columns = None
+        self.kinds = None
+        self.dtypes = None
+        self.count = None
+        self.sketch = QuantileSketch(delta)
+
+    def __repr__(self):
+        if self.columns is None:
+            return '<Describe empty>'
+        return '<Describe {} columns, {:.0f} rows>'.format(
+            len(self.columns), self.count.max(initial=0))
+
+    def _moments(self, X):
+        valid = ~np.isnan(X)
+        count = valid.sum(axis=0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.where(valid, X, 0).sum(axis=0) / count
+        dev = np.where(valid, X - mean, 0)
+        m2 = np.square(dev).sum(axis=0)
+        low = np.where(valid, X, np.inf).min(axis=0, initial=np.inf)
+        high = np.where(valid, X, -np.inf).max(axis=0, initial=-np.inf)
+        return count.astype('float64'), np.nan_to_num(mean), m2, low, high
+
+    def _add(self, count, mean, m2, low, high):
+        if self.count is None:
+            self.count, self.mean, self.m2 = count, mean, m2
+            self.low, self.high = low, high
+            return
+        total = self.count + count
+        with np.errstate(invalid='ignore', divide='ignore'):
+            delta = mean - self.mean
+            self.mean = np.where(total > 0,
+                                 self.mean + delta * count / total, 0.)
+            self.m2 = self.m2 + m2 + np.where(
+                total > 0, delta ** 2 * self.count * count / total, 0.)
+        self.count = total
+        self.low = np.minimum(self.low, low)
+        self.high = np.maximum(self.high, high)
+
+    def update(self, chunk):
+        "Fold the rows of ``chunk`` into the running statistics"
+        if self.columns is None:
+            picked = _select(chunk, None)
+            self.columns = [name for name in picked
+                            if _kind(picked[name]) != 'other']
+            self.kinds = [_kind(chunk[name]) for name in self.columns]
+            self.dtypes = [chunk[name].dtype for name in self.columns]
+        X = np.column_stack([_floats(chunk[name], kind) for name, kind in
+                             zip(self.columns, self.kinds)]) \
+            if len(chunk) else np.empty((0, len(self.columns)))
+        self._add(*self._moments(X))
+        k = len(self.columns)
+        self.sketch.update_codes(X.ravel(order='F'),
+                                 np.repeat(np.arange(k), len(X)),
+                                 pd.RangeIndex(k))
+        return self
+
+    def merge(self, other):
+        "Fold the statistics of ``other`` (same columns) into this one"
+        if other.columns is None:
+            return self
+        if self.columns is None:
+            self.columns, self.kinds = other.columns, other.kinds
+            self.dtypes = other.dtypes
+        self._add(other.count, other.mean, other.m2, other.low, other.high)
+        self.sketch.merge(other.sketch)
+        return self
+
+    def result(self):
+        "The describe table of everything seen so far"
+        if self.columns is None:
+            raise ValueError('no chunks seen')
+        found = self.sketch.quantile(self.qs)
+        out = {}
+        for i, (name, kind, dtype) in enumerate(zip(
+                self.columns, self.kinds, self.dtypes)):
+            n = self.count[i]
+            if n:
+                order_stats = [self.low[i], *found.loc[i].to_numpy(),
+                               self.high[i]]
+                mean = self.mean[i]
+            else:
+                order_stats = [np.nan] * (len(self.qs) + 2)
+                mean = np.nan
+            std = np.sqrt(self.m2[i] / (n - 1)) if n > 1 else np.nan
+            out[name] = _finish(kind, n, mean, std, order_stats, self.qs,
+                                dtype)
+        return _assemble(out, self.qs)
+
+
+def describe_chunks(chunks, percentiles=None, delta=200):
+    "``Describe`` of every chunk in ``chunks``"
+    desc = Describe(percentiles, delta)
+    for chunk in chunks:
+        desc.update(chunk)
+    return desc.result()
@@ -0,0 +1,119 @@
+"""Multi-hot encoding of ``Events`` with a vocabulary learned once.
+
+``pd.get_dummies(nyc, columns=['Events'])`` builds a dense column per
+distinct string, so ``Fog-Rain`` gets its own column apart from ``Fog`` and
+``Rain``.  It also builds a different set of columns for any frame that
+lacks some value, such as new data.  ``EventsEncoder`` splits the combined
+values into tokens, learns the tokens once, and encodes any later frame
+into the same columns::
+
+    enc = EventsEncoder().fit(nyc.Events)
+    enc.columns                   # ['Events_Fog', 'Events_Rain', ...]
+    block = enc.transform(nyc.Events)     # scipy.sparse CSR, 1 per token
+    X = enc.stack(nyc[numeric_cols], nyc.Events)
+
+``transform`` returns a sparse matrix, or a dense uint8 array with
+``sparse=False`` or when scipy is not installed.  ``stack`` keeps the
+numeric features dense and appends the few token columns to them: the
+numeric block has no zeros to save, so as CSR it would take more memory
+and make ``RandomForestRegressor.fit`` slower.  Tokens not seen by
+``fit`` are dropped.
+"""
+import numpy as np
+import pandas as pd
+
+try:
+    from scipy import sparse as _sparse
+except ImportError:
+    _sparse = None
+
+
+class EventsEncoder:
+    "Learned ``sep``-separated tokens of an Events column"
+    def __init__(self, sep='-', prefix='Events', sparse=True):
+        self.sep = sep
+        self.prefix = prefix
+        self.sparse = sparse and _sparse is not None
+        self.tokens = None
+
+    def __repr__(self):
+        return '<EventsEncoder {}>'.format(
+            'unfitted' if self.tokens is None else self.tokens)
+
+    def _split(self, value):
+        if not isinstance(value, str):
+            return []
+        return [t.strip() for t in value.split(self.sep) if t.strip()]
+
+    @property
+    def columns(self):
+        "Output column names, one per token"
+        self._check()
+        return ['{}_{}'.format(self.prefix, t) for t in self.tokens]
+
+    def _check(self):
+        if self.tokens is None:
+            raise ValueError('EventsEncoder is not fitted, call fit first')
+
+    def fit(self, values):
+        "Learn the sorted tokens of ``values``"
+        uniques = pd.unique(pd.Series(values).dropna())
+        self.tokens = sorted({t for v in uniques for t in self._split(v)})
+        return self
+
+    def _rows_cols(self, values):
+        "Row and token positions of the ones, row major"
+        codes, uniques = pd.factorize(pd.Series(values))
+        lookup = {t: i for i, t in enumerate(self.tokens)}
+        # tokens of each distinct value, found once however many rows
+        per_unique = [sorted({lookup[t] for t in self._split(v)
+                              if t in lookup}) for v in uniques]
+        counts = np.array([len(p) for p in per_unique] + [0])
+        flat = np.array([i for p in per_unique for i in p], dtype='int64')
+        starts = np.concatenate([[0], np.cumsum(counts[:-1])])
+        # NaN rows get code -1, which maps to the empty last entry
+        codes = np.where(codes < 0, len(uniques), codes)
+        nnz = counts[codes]
+        rows = np.repeat(np.arange(len(codes)), nnz)
+        offset = np.arange(nnz.sum()) - np.repeat(np.cumsum(nnz) - nnz, nnz)
+        cols = flat[np.repeat(starts[codes], nnz) + offset]
+        return rows, cols, len(codes)
+
+    def transform(self, values):
+        "``(rows, tokens)`` block with a 1 for each token of each value"
+        self._check()
+        rows, cols, n = self._rows_cols(values)
+        shape = (n, len(self.tokens))
+        if self.sparse:
+            return _sparse.csr_matrix(
+                (np.ones(len(rows), dtype='uint8'), (rows, cols)),
+                shape=shape)
+        out = np.zeros(shape, dtype='uint8')
+        out[rows, cols] = 1
+        return out
+
+    def fit_transform(self, values):
+        return self.fit(values).transform(values)
+
+    def to_frame(self, values):
+        "Dense DataFrame of the encoding, indexed like ``values``"
+        block = self.transform(values)
+        if self.sparse:
+            block = block.toarray()
+        index = getattr(values, 'index', None)
+        return pd.DataFrame(block, index=index, columns=self.columns)
+
+    def stack(self, X, values, dtype='float32'):
+        """The columns of ``X`` followed by the encoding of ``values``, as
+        one dense array"""
+        self._check()
+        rows, cols, n = self._rows_cols(values)
+        X = np.asarray(X, dtype=dtype)
+        out = np.zeros((n, X.shape[1] + len(self.tokens)), dtype=dtype)
+        out[:, :X.shape[1]] = X
+        out[rows, X.shape[1] + cols] = 1
+        return out
+
+    def feature_names(self, X):
+        "Column names matching ``stack(X, ...)``"
+        return [str(c) for c in X.columns] + self.columns
@@ -0,0 +1,212 @@
+"""Lag, rolling window and calendar features for next-step prediction.
+
+04_machine_learning builds targets with ``nyc.Mean_Humidity.shift(1)`` and
+then patches up the misaligned rows with ``.iloc[1:]``, ``.dropna()`` and
+``.fillna(0)``.  ``lag_features`` builds the feature matrix and target in
+one go::
+
+    X, y = lag_features(nyc, 'Mean_Humidity', lags=[1, 2, 7],
+                        windows=[7, 30], date='EST')
+    X, y = lag_features(nino, 'air_temp_F', lags=[1, 2], windows=[5],
+                        date='date', group=buoy_id(nino))
+
+For row ``t`` the features are what is known at ``t``: the target's own
+value ``y[t]`` (column ``{target}``), the lags ``y[t-k]``, and trailing
+means over ``y[t-w+1] .. y[t]``.  ``y`` is the target ``horizon`` steps
+ahead, ``y[t+horizon]``.
+
+Rows are put in (group, date) order once (``GroupedRows``, also used by
+``impute``), every feature is computed with array arithmetic in that order
+into one float32 matrix, and lags/windows never reach across group
+boundaries (so a buoy's first reading never sees the previous buoy's
+last).
+"""
+import numpy as np
+import pandas as pd
+
+from .sketch import group_codes
+
+
+def buoy_id(nino, precision=0):
+    """Station number for TAO rows: the position rounded to ``precision``
+    decimals (buoys drift a little around their nominal site)"""
+    lat = nino.latitude.round(precision)
+    lon = nino.longitude.round(precision)
+    codes, _ = pd.factorize(pd.MultiIndex.from_arrays([lat, lon]))
+    return pd.Series(codes, index=nino.index, name='buoy')
+
+
+def row_groups(df, group):
+    """Integer group of every row of ``df`` (-1 where a key is missing).
+    ``group`` is None (one group), a column name, a list of names or a
+    Series of keys."""
+    if isinstance(group, str):
+        group = df[group]
+    elif isinstance(group, list):
+        group = [df[name] for name in group]
+    return group_codes(group, len(df))[0]
+
+
+class GroupedRows:
+    """Rows in (group, ``when``) order: ``order`` sorts them, ``start`` and
+    ``stop`` are the first and last sorted position of each row's group and
+    ``pos`` its position within the group"""
+    def __init__(self, codes, when=None):
+        n = len(codes)
+        keys = [codes] if when is None else [when, codes]
+        self.order = np.lexsort(keys)
+        self.codes = codes[self.order]
+        self.when = None if when is None else when[self.order]
+        new_group = np.ones(n, dtype=bool)
+        new_group[1:] = self.codes[1:] != self.codes[:-1]
+        at = np.arange(n)
+        self.start = np.maximum.accumulate(np.where(new_group, at, 0))
+        last = np.ones(n, dtype=bool)
+        last[:-1] = new_group[1:]
+        self.stop = np.minimum.accumulate(
+            np.where(last, at, n - 1)[::-1])[::-1]
+        self.pos = at - self.start
+
+    def inverse(self):
+        "Positions that put sorted rows back in the original order"
+        out = np.empty(len(self.order), dtype='int64')
+        out[self.order] = np.arange(len(self.order))
+        return out
+
+    def neighbours(self, valid):
+        """Sorted position of the previous and next ``valid`` row in the
+        same group, -1 where there is none"""
+        n = len(valid)
+        at = np.arange(n)
+        prev = np.maximum.accumulate(np.where(valid, at, -1))
+        prev[prev < self.start] = -1
+        nxt = np.minimum.accumulate(np.where(valid, at, n)[::-1])[::-1]
+        nxt[nxt > self.stop] = -1
+        return prev, nxt
+
+
+def _shift(values, k, pos):
+    "``values`` shifted down ``k`` rows, NaN where it would cross a group"
+    out = np.full(len(values), np.nan)
+    if k < len(values):
+        out[k:] = values[:len(values) - k]
+    out[pos < k] = np.nan
+    return out
+
+
+def _trailing_mean(cumsum, cumcount, window, start):
+    "Mean of the last ``window`` rows up to and including each row"
+    hi = np.arange(1, len(start) + 1)
+    lo = np.maximum(hi - window, start)
+    count = cumcount[hi] - cumcount[lo]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(count > 0, (cumsum[hi] - cumsum[lo]) / count, np.nan)
+
+
+def lag_features(df, target, lags=(1,), windows=(), date=None, group=None,
+                 columns=None, calendar=True, horizon=1, dropna=True,
+                 fill_value=None, dtype='float32'):
+    """Build ``(X, y)`` to predict ``target`` ``horizon`` rows ahead.
+
+    * ``{target}``: the target's value in the row itself
+    * ``lags``: add ``{target}_lag{k}``, the value ``k`` rows back
+    * ``windows``: add ``{target}_mean{w}``, the mean of the last ``w``
+      rows, the row itself included (NaNs skipped)
+    * ``date``: column to sort by within a group, with ``calendar`` also
+      add its month, day of year and day of week
+    * ``group``: column name, list of names or Series of group keys
+    * ``columns``: other columns to include as they are, by default all
+      numeric columns besides the target and group columns
+
+    With ``dropna`` rows with no target, or missing the current value or a
+    lag, are dropped, then
+    other missing values are filled with ``fill_value`` unless it is None.
+    X keeps the index of ``df`` for the remaining rows.
+    """
+    n = len(df)
+    group_cols = [group] if isinstance(group, str) else \
+        group if isinstance(group, list) else []
+    when = None
+    if date is not None:
+        when = df[date].to_numpy('datetime64[ns]').view('int64')
+    grouped = GroupedRows(row_groups(df, group), when)
+    order, start, pos = grouped.order, grouped.start, grouped.pos
+    group_len = grouped.stop - grouped.start + 1
+
+    values = df[target].to_numpy('float64')[order]
+    if columns is None:
+        skip = {target, date, *group_cols}
+        columns = [c for c in df.select_dtypes('number').columns
+                   if c not in skip]
+    names = list(columns) + [target]
+    names += ['{}_lag{}'.format(target, k) for k in lags]
+    names += ['{}_mean{}'.format(target, w) for w in windows]
+    if date is not None and calendar:
+        names += ['month', 'dayofyear', 'dayofweek']
+
+    X = np.empty((n, len(names)), dtype=dtype, order='F')
+    j = 0
+    for col in columns:
+        X[:, j] = df[col].to_numpy('float64')[order]
+        j += 1
+    X[:, j] = values
+    j += 1
+    for k in lags:
+        X[:, j] = _shift(values, k, pos)
+        j += 1
+    if windows:
+        present = ~np.isnan(values)
+        cumsum = np.concatenate([[0], np.cumsum(np.where(present, values,
+                                                         0))])
+        cumcount = np.concatenate([[0], np.cumsum(present)])
+        for w in windows:
+            X[:, j] = _trailing_mean(cumsum, cumcount, w, start)
+            j += 1
+    if date is not None and calendar:
+        when = pd.DatetimeIndex(df[date].to_numpy()[order])
+        for part in (when.month, when.dayofyear, when.dayofweek):
+            X[:, j] = part
+            j += 1
+
+    y = np.full(n, np.nan)
+    ahead = pos + horizon < group_len
+    y[ahead] = values[np.flatnonzero(ahead) + horizon]
+
+    keep = np.ones(n, dtype=bool)
+    if dropna:
+        keep &= ~np.isnan(y)
+        first = len(columns)
+        keep &= ~np.isnan(X[:, first:first + 1 + len(lags)]).any(axis=1)
+    # back to the original row order
+    inverse = grouped.inverse()
+    rows = np.sort(order[keep])
+    X = X[inverse[rows]]
+    if fill_value is not None:
+        X[np.isnan(X)] = fill_value
+    index = df.index[rows]
+    return (pd.DataFrame(X, index=index, columns=names),
+            pd.Series(y[inverse[rows]], index=index,
+                      name='{}_next{}'.format(target, horizon)))
+
+
+def valid(col):
+    "The notebook's filter: no humidity (the target) and no timestamp"
+    return 'Humid' not in col and 'EST' not in col
+
+
+def nyc_features(nyc, lags=(1, 2, 7), windows=(7, 30), **kwargs):
+    """Next day ``Mean_Humidity`` features for the Central Park data,
+    other columns limited to the notebook's ``valid`` ones"""
+    columns = [c for c in nyc.select_dtypes('number').columns if valid(c)]
+    return lag_features(nyc, 'Mean_Humidity', lags=lags, windows=windows,
+                        date='EST', columns=columns, **kwargs)
+
+
+def nino_features(nino, lags=(1, 2), windows=(5,), **kwargs):
+    """Next reading ``air_temp_F`` features per buoy for the TAO data
+    (``air_temp`` is left out, it is the current ``air_temp_F`` in C)"""
+    columns = [c for c in nino.select_dtypes('number').columns
+               if not c.startswith('air_temp')]
+    return lag_features(nino, 'air_temp_F', lags=lags, windows=windows,
+                        date='date', group=buoy_id(nino), columns=columns,
+                        **kwargs)
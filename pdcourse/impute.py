@@ -0,0 +1,116 @@
+"""Fill missing values per buoy (or per any group) in date order.
+
+The NaN section tries ``fillna(mean)``, ``interpolate()``, ``ffill()`` and
+``bfill()`` on one column of the whole frame.  On the TAO data that blends
+readings of different buoys, since consecutive rows are usually different
+buoys on the same day.  ``impute`` sorts the rows by group and date once
+and fills every column named in ``strategies`` in that order::
+
+    filled = impute(nino, {'zon_winds': 'time', 'mer_winds': 'time',
+                           'air_temp': ['time', 'seasonal'],
+                           'humidity': ['ffill', 'median']},
+                    date='date', group=buoy_id(nino), max_gap='5D')
+
+Strategies, tried in turn on what the previous ones left missing:
+
+* ``'time'``: interpolate linearly in time between the group's readings
+  either side (``interpolate(method='time')`` within each group)
+* ``'ffill'`` / ``'bfill'``: the group's previous / next reading
+* ``'seasonal'``: the group's mean for the same month of the year
+* ``'mean'`` / ``'median'``: the group's mean / median
+
+Every strategy works from the real readings, not values filled before it.
+
+``max_gap`` limits the first three: a value is only interpolated when the
+readings either side are at most ``max_gap`` apart, and only carried
+forward or back that far.  Rows whose group key is missing are left as
+they are.  The frame keeps its row order and index.
+"""
+import numpy as np
+import pandas as pd
+
+from .features import GroupedRows, row_groups
+
+STRATEGIES = {'time', 'ffill', 'bfill', 'seasonal', 'mean', 'median'}
+
+
+def _group_stat(codes, values, valid, stat):
+    "Per row, ``stat`` of the valid values of its group (NaN if none)"
+    size = max(codes.max(initial=-1) + 1, 1)
+    if stat == 'median':
+        ser = pd.Series(values[valid])
+        med = ser.groupby(codes[valid]).median()
+        return med.reindex(np.arange(size)).to_numpy()[codes]
+    sums = np.bincount(codes[valid], weights=values[valid], minlength=size)
+    counts = np.bincount(codes[valid], minlength=size)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return (sums / counts)[codes]
+
+
+def _fill(values, out, strategy, rows, max_gap):
+    """``out`` with the gaps ``strategy`` can fill from the readings in
+    ``values`` (both in sorted order)"""
+    # rows with no group key are neither filled nor used to fill
+    keyed = rows.codes >= 0
+    valid = ~np.isnan(values) & keyed
+    missing = np.isnan(out) & keyed
+    out = out.copy()
+    t = rows.when
+    if strategy in ('time', 'ffill', 'bfill'):
+        prev, nxt = rows.neighbours(valid)
+        prev, nxt = prev[missing], nxt[missing]
+        tm = t[missing]
+        if strategy == 'time':
+            ok = (prev >= 0) & (nxt >= 0)
+            if max_gap is not None:
+                ok &= t[nxt] - t[prev] <= max_gap
+            p, q = prev[ok], nxt[ok]
+            span = (t[q] - t[p]).astype('float64')
+            with np.errstate(invalid='ignore', divide='ignore'):
+                frac = np.where(span > 0, (tm[ok] - t[p]) / span, 0.0)
+            fill = np.full(len(tm), np.nan)
+            fill[ok] = values[p] + frac * (values[q] - values[p])
+        else:
+            src = prev if strategy == 'ffill' else nxt
+            ok = src >= 0
+            if max_gap is not None:
+                ok &= np.abs(tm - t[src]) <= max_gap
+            fill = np.where(ok, values[src], np.nan)
+        out[missing] = fill
+    elif strategy == 'seasonal':
+        month = t.astype('datetime64[ns]').astype('datetime64[M]').astype(
+            'int64') % 12
+        keys = rows.codes * 12 + month
+        out[missing] = _group_stat(keys, values, valid, 'mean')[missing]
+    else:
+        out[missing] = _group_stat(rows.codes, values, valid,
+                                   strategy)[missing]
+    return out
+
+
+def impute(df, strategies, date='date', group=None, max_gap=None):
+    """Copy of ``df`` with the columns in ``strategies`` filled within each
+    ``group`` (column name, list of names or Series of keys) in ``date``
+    order.  ``strategies`` maps a column to a strategy name or a list of
+    them; ``max_gap`` is a Timedelta or string like ``'5D'``."""
+    for column, names in strategies.items():
+        names = [names] if isinstance(names, str) else names
+        bad = set(names) - STRATEGIES
+        if bad:
+            raise ValueError('unknown strategy {} for {!r}, pick from '
+                             '{}'.format(sorted(bad), column,
+                                         sorted(STRATEGIES)))
+    when = df[date].to_numpy('datetime64[ns]').view('int64')
+    if max_gap is not None:
+        max_gap = pd.Timedelta(max_gap).value
+    rows = GroupedRows(row_groups(df, group), when)
+    inverse = rows.inverse()
+    out = df.copy()
+    for column, names in strategies.items():
+        names = [names] if isinstance(names, str) else names
+        values = df[column].to_numpy('float64', na_value=np.nan)[rows.order]
+        filled = values
+        for name in names:
+            filled = _fill(values, filled, name, rows, max_gap)
+        out[column] = filled[inverse]
+    return out
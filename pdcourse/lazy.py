@@ -0,0 +1,346 @@
+"""Lazy method chains over the course datasets.
+
+A chain like::
+
+    nyc.set_index('EST').Mean_Humidity.resample('ME').mean().plot()
+
+needs ``nyc`` loaded (every column parsed and tweaked) before the first
+step runs.  ``scan`` records the same chain without loading anything::
+
+    (scan('nyc')
+     .set_index('EST')
+     .Mean_Humidity
+     .resample('ME')
+     .mean()
+     .plot())
+
+and runs it at the terminal call (``plot`` here, or ``collect()`` for the
+result itself, or a reduction such as ``mean``).  Before running it works
+out which columns the chain uses
+up to the point it selects columns (``EST`` and ``Mean_Humidity``) and
+asks the cached loader for only those (see ``load.py``).  ``query`` steps
+at the start of the chain are applied while loading, with ``chunksize``
+one chunk at a time (uncached), so rows they reject are never kept::
+
+    scan('nino', chunksize=200_000).query('latitude > 0').air_temp_F.mean()
+
+Column names are found in attribute and item access, string arguments,
+``query`` strings and functions such as ``lambda d: d.EST.dt.year`` or
+``lambda d: d['Max_TemperatureF'] - 32``.  Anything the chain could use to
+reach other columns loads all of them: a function that uses its frame in
+any other way (``d.select_dtypes(...)``, passing ``d`` on), a ``query``
+with names that are not columns, an argument of another kind, a method
+that could depend on every column before selecting (``dropna()`` without
+``subset``, say), or a chain that never selects columns.  ``explain()``
+shows what would be loaded.
+"""
+import dis
+import re
+
+import numpy as np
+import pandas as pd
+
+from .load import (AUTOS_PATH, NINO_PATH, NYC_PATH, load_nino, load_nyc,
+                   parse_autos, parse_nino, parse_nyc, read_autos, read_nino,
+                   read_nyc)
+from .tweak import tweak_nino, tweak_nyc
+
+SOURCES = {
+    'nyc': (NYC_PATH, parse_nyc, tweak_nyc),
+    'nino': (NINO_PATH, parse_nino, tweak_nino),
+    'autos': (AUTOS_PATH, parse_autos, None),
+}
+# (source, tweaked) -> cached loader
+LOADERS = {
+    ('nyc', False): read_nyc, ('nyc', True): load_nyc,
+    ('nino', False): read_nino, ('nino', True): load_nino,
+    ('autos', False): read_autos,
+}
+
+# methods that only touch the columns they name, so columns can still be
+# projected when they come before the selection
+SAFE = {'set_index', 'reset_index', 'sort_values', 'sort_index', 'rename',
+        'assign', 'query', 'groupby', 'resample', 'rolling', 'head', 'tail',
+        'astype', 'fillna', 'nlargest', 'nsmallest'}
+# methods that need their subset= to be safe
+SAFE_WITH_SUBSET = {'dropna', 'drop_duplicates'}
+# methods that run the chain
+TERMINAL = {'plot', 'hist', 'boxplot', 'to_csv', 'to_excel', 'to_parquet',
+            'to_numpy', 'to_dict', 'to_list', 'tolist', 'describe', 'info',
+            'mean', 'median', 'sum', 'prod', 'min', 'max', 'std', 'var',
+            'sem', 'count', 'nunique', 'unique', 'value_counts', 'quantile',
+            'idxmin', 'idxmax', 'agg', 'aggregate', 'corr', 'cov'}
+# words a query expression may use besides column names
+QUERY_WORDS = {'and', 'or', 'not', 'in', 'is', 'True', 'False', 'None'}
+# argument types that cannot name a column
+SCALARS = (int, float, bool, type(None), np.generic, pd.Timestamp,
+           pd.Timedelta, pd.DateOffset)
+
+_IDENT = re.compile(r'\b[A-Za-z_]\w*')
+_QUOTED = re.compile(r'"[^"]*"|\'[^\']*\'|@\w+')
+_BACKTICK = re.compile(r'`([^`]*)`')
+_LOAD_ARG = {'LOAD_FAST', 'LOAD_FAST_CHECK', 'LOAD_FAST_BORROW'}
+_samples = {}
+
+
+def _sample(source, tweak):
+    "A few parsed (and tweaked) rows of ``source``"
+    key = (source, tweak)
+    if key not in _samples:
+        path, parse, pipeline = SOURCES[source]
+        raw = parse(path, nrows=50)
+        tweaked = pipeline.run(raw) if tweak and pipeline else raw
+        _samples[key] = raw, tweaked
+    return _samples[key]
+
+
+def _expr_names(expr, columns):
+    "Columns in a ``query`` string, None if it uses any other name"
+    found = {name for name in _BACKTICK.findall(expr) if name in columns}
+    expr = _QUOTED.sub(' ', _BACKTICK.sub(' ', expr))
+    for name in _IDENT.findall(expr):
+        if name in columns:
+            found.add(name)
+        elif name not in QUERY_WORDS:
+            return None
+    return found
+
+
+def _is_subscript(op):
+    return op.opname == 'BINARY_SUBSCR' or (op.opname == 'BINARY_OP' and
+                                            '[]' in op.argrepr)
+
+
+def _code_names(func, columns):
+    """Columns a function reads from its (first) argument, None if it uses
+    the argument in any other way"""
+    code = func.__code__
+    if not code.co_argcount:
+        return None
+    arg = code.co_varnames[0]
+    if arg in code.co_cellvars:
+        # a nested function sees the whole frame
+        return None
+    ops = list(dis.get_instructions(code)) + [None, None]
+    found = set()
+    for op, nxt, after in zip(ops, ops[1:], ops[2:]):
+        if op is None:
+            break
+        if op.opname.startswith(('LOAD_FAST', 'STORE_FAST', 'DELETE_FAST')) \
+                and op.opname not in _LOAD_ARG:
+            # stores and fused loads (LOAD_FAST_LOAD_FAST on 3.13)
+            values = op.argval if isinstance(op.argval, tuple) else \
+                (op.argval,)
+            if arg in values:
+                return None
+        if op.opname not in _LOAD_ARG or op.argval != arg:
+            continue
+        if nxt.opname in ('LOAD_ATTR', 'LOAD_METHOD') and \
+                nxt.argval in columns:
+            found.add(nxt.argval)
+        elif (nxt.opname == 'LOAD_CONST' and isinstance(nxt.argval, str) and
+              nxt.argval in columns and after is not None and
+              _is_subscript(after)):
+            found.add(nxt.argval)
+        else:
+            return None
+    return found
+
+
+def _names(obj, columns, expr=False):
+    """Column names ``obj`` uses, looking inside containers and functions,
+    None when it could use columns without naming them.  ``expr`` strings
+    are ``query`` expressions."""
+    if isinstance(obj, str):
+        if expr:
+            return _expr_names(obj, columns)
+        return {obj} if obj in columns else set()
+    if isinstance(obj, SCALARS):
+        return set()
+    if isinstance(obj, pd.Grouper):
+        return {obj.key} if obj.key in columns else set()
+    if isinstance(obj, dict):
+        obj = [*obj.keys(), *obj.values()]
+    if isinstance(obj, (list, tuple, set, pd.Index)):
+        found = set()
+        for item in obj:
+            names = _names(item, columns, expr)
+            if names is None:
+                return None
+            found |= names
+        return found
+    if hasattr(obj, '__code__'):
+        return _code_names(obj, columns)
+    return None
+
+
+def _created(args, kwargs):
+    "Names a call may add: ``assign`` keywords, ``rename`` mapping values"
+    made = {k for k in kwargs if isinstance(k, str)}
+    for arg in list(args) + list(kwargs.values()):
+        if isinstance(arg, dict):
+            made.update(v for v in arg.values() if isinstance(v, str))
+    return made
+
+
+def _selection(key, known):
+    "Column names selected by ``frame[key]``, None if not a selection"
+    if isinstance(key, str):
+        return [key] if key in known else None
+    if isinstance(key, (list, tuple)) and key and all(
+            isinstance(k, str) and k in known for k in key):
+        return list(key)
+    return None
+
+
+class LazyFrame:
+    "A recorded chain of steps on a dataset, run by ``collect``"
+    def __init__(self, source, tweak=True, chunksize=None, steps=()):
+        if source not in SOURCES:
+            raise ValueError('unknown source {!r}, pick one of {}'.format(
+                source, sorted(SOURCES)))
+        self._source = source
+        self._tweak = tweak
+        self._chunksize = chunksize
+        self._steps = tuple(steps)
+
+    def _then(self, step):
+        return LazyFrame(self._source, self._tweak, self._chunksize,
+                         self._steps + (step,))
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        if name in TERMINAL:
+            return lambda *args, **kwargs: getattr(self.collect(), name)(
+                *args, **kwargs)
+        return self._then(('attr', name))
+
+    def __getitem__(self, key):
+        return self._then(('item', key))
+
+    def __call__(self, *args, **kwargs):
+        return self._then(('call', args, kwargs))
+
+    def _filters(self):
+        "Leading ``query`` expressions and the number of steps they use"
+        filters, i = [], 0
+        steps = self._steps
+        while (i + 1 < len(steps) and steps[i] == ('attr', 'query') and
+               steps[i + 1][0] == 'call' and len(steps[i + 1][1]) == 1 and
+               not steps[i + 1][2]):
+            filters.append(steps[i + 1][1][0])
+            i += 2
+        return filters, i
+
+    def columns(self):
+        "Columns the chain needs, None when it needs all of them"
+        columns = list(_sample(self._source, self._tweak)[1].columns)
+        found = set()
+        known = set(columns)
+        steps = self._steps
+        for i, step in enumerate(steps):
+            kind = step[0]
+            if kind == 'attr':
+                if step[1] in known:
+                    found.add(step[1])
+                    break
+                nxt = steps[i + 1] if i + 1 < len(steps) else None
+                if step[1] in SAFE:
+                    continue
+                if (step[1] in SAFE_WITH_SUBSET and nxt is not None and
+                        nxt[0] == 'call' and 'subset' in nxt[2]):
+                    continue
+                return None
+            elif kind == 'item':
+                selected = _selection(step[1], known)
+                if selected is None:
+                    return None
+                found.update(selected)
+                break
+            else:
+                method = steps[i - 1][1] if i else None
+                # keyword names are parameters, only their values count
+                names = _names([step[1], list(step[2].values())], columns,
+                               expr=method in ('query', 'eval'))
+                if names is None:
+                    return None
+                found |= names
+                known |= _created(step[1], step[2])
+        else:
+            return None
+        # nothing from the source named: it could use any column
+        return [name for name in columns if name in found] or None
+
+    def _load(self, columns):
+        path, parse, pipeline = SOURCES[self._source]
+        pipeline = pipeline if self._tweak else None
+        filters, _ = self._filters()
+        if not self._chunksize:
+            # the cached loaders parse (and keep) only these columns
+            chunks = [LOADERS[self._source, pipeline is not None](
+                columns=columns)]
+            pipeline = None
+        else:
+            usecols = columns
+            if columns is not None and pipeline is not None:
+                usecols = pipeline.requires(columns,
+                                            _sample(self._source, True)[0])
+            chunks = parse(path, usecols=usecols,
+                           chunksize=self._chunksize)
+        frames = []
+        for chunk in chunks:
+            if pipeline is not None:
+                chunk = pipeline.run(chunk, outputs=columns)
+            for expr in filters:
+                chunk = chunk.query(expr)
+            frames.append(chunk)
+        return frames[0] if len(frames) == 1 else pd.concat(frames)
+
+    def collect(self):
+        "Load the needed columns and run the chain"
+        obj = self._load(self.columns())
+        _, start = self._filters()
+        for step in self._steps[start:]:
+            if step[0] == 'attr':
+                obj = getattr(obj, step[1])
+            elif step[0] == 'item':
+                obj = obj[step[1]]
+            else:
+                obj = obj(*step[1], **step[2])
+        return obj
+
+    def _chain(self):
+        out = []
+        for step in self._steps:
+            if step[0] == 'attr':
+                out.append('.' + step[1])
+            elif step[0] == 'item':
+                out.append('[{!r}]'.format(step[1]))
+            else:
+                args = [repr(a) for a in step[1]]
+                args += ['{}={!r}'.format(k, v) for k, v in step[2].items()]
+                out.append('({})'.format(', '.join(args)))
+        return ''.join(out)
+
+    def explain(self):
+        "The chain, the columns it will load and the filters applied early"
+        columns = self.columns()
+        filters, _ = self._filters()
+        return '\n'.join([
+            'scan({!r}){}'.format(self._source, self._chain()),
+            'load: {}'.format('all columns' if columns is None
+                              else ', '.join(columns)),
+            'filter while loading: {}'.format(' and '.join(filters)
+                                              or 'nothing'),
+        ])
+
+    def __repr__(self):
+        return '<LazyFrame scan({!r}){}>'.format(self._source, self._chain())
+
+
+def scan(source, tweak=True, chunksize=None):
+    """Start a lazy chain on ``'nyc'``, ``'nino'`` or ``'autos'``, tweaked
+    like ``load_*`` unless ``tweak`` is false, read ``chunksize`` rows at a
+    time if given"""
+    return LazyFrame(source, tweak, chunksize)
@@ -0,0 +1,229 @@
+"""Loaders for the course datasets.
+
+``read_*`` return the same frames as the ``pd.read_csv`` cells in the
+notebooks, ``load_*`` also apply the matching ``tweak_*`` pipeline.  Repeat
+loads are served from the columnar cache in ``cache.py`` (bump
+``PARSE_VERSION`` after changing a parser or pipeline).
+
+Every loader takes ``columns`` for analyses that only use a few of them::
+
+    read_autos(columns=['year', 'make', 'city08'])
+    load_nyc(columns=['EST', 'PrecipitationCm'])
+
+Only those fields are parsed (for ``load_*``, only the raw fields the
+tweaked columns are made from) and the cache entry grows a column at a
+time as later calls ask for more.
+"""
+import glob
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .cache import cached_frame
+from .compact import compact_frame
+from .dates import two_digit_year, ymd_to_datetime
+from .tweak import tweak_nino, tweak_nyc
+
+DATA_DIR = Path(__file__).resolve().parent.parent / 'data'
+NYC_PATH = DATA_DIR / 'central-park-raw.csv'
+NINO_PATH = DATA_DIR / 'tao-all2.dat.gz'
+AUTOS_PATH = DATA_DIR / 'vehicles.csv.zip'
+
+# bump when the parse_* or tweak_* output changes to invalidate the cache
+PARSE_VERSION = 1
+
+# col names in tao-all2.col from website
+NINO_NAMES = '''obs
+year
+month
+day
+date
+latitude
+longitude
+zon.winds
+mer.winds
+humidity
+air temp.
+s.s.temp.'''.split('\n')
+
+
+# explicit dtypes so pandas never builds object columns for the '.' NaNs
+NINO_DTYPES = dict({name: 'float64' for name in NINO_NAMES[5:]},
+                   obs='int64', year='int64', month='int64', day='int64',
+                   date='int64')
+
+
+def nino_csv_kwargs(**kwargs):
+    "``pd.read_csv`` options for TAO ``.dat`` files"
+    return dict(sep=' ', names=NINO_NAMES, na_values='.', dtype=NINO_DTYPES,
+                **kwargs)
+
+
+def fix_nino_dates(df):
+    """Collapse the year/month/day columns into ``year_month_day`` like
+    ``parse_dates=[[1,2,3]]`` does"""
+    order = ['year_month_day', *NINO_NAMES[:1], *NINO_NAMES[4:]]
+    if not {'year', 'month', 'day'} <= set(df.columns):
+        # a projection without the dates
+        return df[[name for name in order if name in df.columns]]
+    year_month_day = ymd_to_datetime(two_digit_year(df.year),
+                                     df.month, df.day)
+    return (df
+            .drop(columns=['year', 'month', 'day'])
+            .assign(year_month_day=year_month_day)
+            [[name for name in order
+              if name in df.columns or name == 'year_month_day']]
+           )
+
+
+def _chunked(reader, kwargs, fix=None):
+    "``reader`` as is or fixed, an iterator of fixed chunks with chunksize"
+    if fix is None:
+        return reader
+    if kwargs.get('chunksize'):
+        return map(fix, reader)
+    return fix(reader)
+
+
+def parse_nino(path=NINO_PATH, usecols=None, **kwargs):
+    """Parse a TAO ``.dat.gz`` file like
+    ``pd.read_csv(..., parse_dates=[[1,2,3]])`` does in the notebooks.
+    ``usecols`` names columns of the result, other keywords go to
+    ``pd.read_csv``."""
+    if usecols is not None:
+        wanted = set(usecols)
+        if 'year_month_day' in wanted:
+            wanted |= {'year', 'month', 'day'}
+        usecols = [name for name in NINO_NAMES if name in wanted]
+    reader = pd.read_csv(path, **nino_csv_kwargs(usecols=usecols, **kwargs))
+    return _chunked(reader, kwargs, fix_nino_dates)
+
+
+def parse_nyc(path=NYC_PATH, usecols=None, **kwargs):
+    if usecols is None:
+        dates = [0]
+    else:
+        dates = ['EST'] if 'EST' in usecols else None
+    return pd.read_csv(path, usecols=usecols, parse_dates=dates, **kwargs)
+
+
+def parse_autos(path=AUTOS_PATH, usecols=None, **kwargs):
+    kwargs.setdefault('low_memory', False)
+    return pd.read_csv(path, usecols=usecols, **kwargs)
+
+
+def _builder(parse, tweak):
+    "``build(path, columns=None)`` for ``cached_frame``"
+    def build(path, columns=None):
+        if columns is None:
+            df = parse(path)
+            return df if tweak is None else tweak(df)
+        if tweak is None:
+            return parse(path, usecols=columns)
+        # parse only the raw columns the wanted outputs are made from
+        usecols = tweak.requires(columns, parse(path, nrows=50))
+        return tweak.run(parse(path, usecols=usecols), outputs=columns)
+    return build
+
+
+def _load(path, parse, tweak=None, cache=True, compact=False,
+          verbose=False, columns=None):
+    build = _builder(parse, tweak)
+    tag = 'raw' if tweak is None else 'tweaked'
+    if columns is not None:
+        columns = list(columns)
+    if cache:
+        df = cached_frame(path, build, tag=tag, version=PARSE_VERSION,
+                          columns=columns)
+    elif columns is None:
+        df = build(path)
+    else:
+        df = build(path, columns=columns)[columns]
+    if compact:
+        df = compact_frame(df, verbose=verbose)
+    return df
+
+
+def read_nino(path=NINO_PATH, cache=True, compact=False, verbose=False,
+              columns=None):
+    """Raw El Nino (TAO buoy) data.  With ``compact`` downcast the columns
+    (see ``compact_frame``), ``verbose`` prints the memory saved.  With
+    ``columns`` only those are parsed and returned (``year_month_day``
+    needs the year/month/day fields)."""
+    return _load(path, parse_nino, cache=cache, compact=compact,
+                 verbose=verbose, columns=columns)
+
+
+def read_nyc(path=NYC_PATH, cache=True, compact=False, verbose=False,
+             columns=None):
+    "Raw Central Park weather data, only ``columns`` if given"
+    return _load(path, parse_nyc, cache=cache, compact=compact,
+                 verbose=verbose, columns=columns)
+
+
+def read_autos(path=AUTOS_PATH, cache=True, compact=False, verbose=False,
+               columns=None):
+    "Raw vehicles (fueleconomy.gov) data, only ``columns`` if given"
+    return _load(path, parse_autos, cache=cache, compact=compact,
+                 verbose=verbose, columns=columns)
+
+
+def load_nino(path=NINO_PATH, cache=True, compact=False, verbose=False,
+              columns=None):
+    """El Nino data after ``tweak_nino``.  With ``columns`` (names after
+    the tweak) only the raw fields they are made from are parsed."""
+    return _load(path, parse_nino, tweak_nino, cache=cache, compact=compact,
+                 verbose=verbose, columns=columns)
+
+
+def load_nyc(path=NYC_PATH, cache=True, compact=False, verbose=False,
+             columns=None):
+    "Central Park data after ``tweak_nyc``, only ``columns`` if given"
+    return _load(path, parse_nyc, tweak_nyc, cache=cache, compact=compact,
+                 verbose=verbose, columns=columns)
+
+
+def _load_nino_file(path, tweak, cache):
+    return _load(path, parse_nino, tweak_nino if tweak else None,
+                 cache=cache)
+
+
+def _glob_root(pattern):
+    "The directory part of ``pattern`` before the first wildcard"
+    parts = Path(pattern).parts
+    for i, part in enumerate(parts):
+        if glob.escape(part) != part:
+            return Path(*parts[:i]) if i else Path('.')
+    return Path(pattern).parent
+
+
+def read_nino_files(pattern, tweak=True, cache=True, compact=False,
+                    processes=None, source=False):
+    """Load every TAO file matching the glob ``pattern`` (eg. per buoy/year
+    ``.dat.gz`` files) in a process pool and concatenate them in file name
+    order.  Each file is parsed (and tweaked) in a worker and cached on its
+    own, so adding a file only parses the new one.  With ``source`` add a
+    categorical ``source`` column holding the path of each row's file
+    relative to the directory before the first wildcard of ``pattern``
+    (``b1/tao.dat.gz`` for ``arch/*/tao.dat.gz``)."""
+    paths = sorted(glob.glob(str(pattern)))
+    if not paths:
+        raise FileNotFoundError('no files match {!r}'.format(str(pattern)))
+    n = len(paths)
+    if processes == 1 or n == 1:
+        frames = list(map(_load_nino_file, paths, [tweak] * n, [cache] * n))
+    else:
+        with ProcessPoolExecutor(processes) as pool:
+            frames = list(pool.map(_load_nino_file, paths, [tweak] * n,
+                                   [cache] * n))
+    df = pd.concat(frames, ignore_index=True)
+    if source:
+        root = _glob_root(str(pattern))
+        names = [Path(p).relative_to(root).as_posix() for p in paths]
+        df['source'] = pd.Categorical.from_codes(
+            np.repeat(np.arange(n), [len(f) for f in frames]), names)
+    if compact:
+        df = compact_frame(df)
+    return df
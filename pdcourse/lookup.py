@@ -0,0 +1,140 @@
+"""Sorted secondary indexes for repeated filtering.
+
+``nyc.set_index('Events').sort_index().loc['Fog']`` sorts the whole frame
+for every lookup and ``nyc.EST.dt.month == 12`` scans every row.  A
+``FrameIndex`` sorts each key once and answers equality and range lookups
+with binary search::
+
+    idx = nyc_index(nyc)   # FrameIndex with year and month keys for EST
+    idx.eq('Events', 'Fog')          # rows with Events == 'Fog'
+    idx.eq('month', 12)              # nyc[nyc.EST.dt.month == 12]
+    idx.select(year=(2000, 2010), Events='Rain')
+
+Rows come back in their original order with their original index.  Keys
+that aren't listed in ``keys`` are taken to be column names.  The sorted
+keys are built on first use and rebuilt when the frame is replaced; call
+``invalidate()`` after modifying the frame in place.
+"""
+import numpy as np
+import pandas as pd
+
+
+class SortedKey:
+    "Row positions of one key sorted by key value (missing keys left out)"
+    def __init__(self, values):
+        values = np.asarray(values)
+        valid = np.flatnonzero(~pd.isna(values))
+        order = np.argsort(values[valid], kind='mergesort')
+        self.order = valid[order]
+        self.keys = values[self.order]
+
+    def _coerce(self, value):
+        if self.keys.dtype.kind in 'mM':
+            return np.asarray(value, dtype=self.keys.dtype)
+        return value
+
+    def _bounds(self, value, side):
+        return np.searchsorted(self.keys, self._coerce(value), side=side)
+
+    def eq(self, value):
+        "Ascending positions of rows equal to ``value``"
+        lo, hi = self._bounds(value, 'left'), self._bounds(value, 'right')
+        # mergesort is stable so equal keys are already in row order
+        return self.order[lo:hi]
+
+    def isin(self, values):
+        "Ascending positions of rows equal to any of ``values``"
+        # each distinct value once, so no row is returned twice
+        return np.sort(np.concatenate([self.eq(v)
+                                       for v in dict.fromkeys(values)]
+                                      or [np.array([], dtype='int64')]))
+
+    def range(self, lo=None, hi=None, closed='left'):
+        """Ascending positions of rows with ``lo <= key < hi`` (``closed``
+        is 'left', 'right', 'both' or 'neither' like ``Series.between``'s
+        ``inclusive``), ``None`` leaves that end open"""
+        start = 0 if lo is None else self._bounds(
+            lo, 'left' if closed in ('left', 'both') else 'right')
+        stop = len(self.keys) if hi is None else self._bounds(
+            hi, 'right' if closed in ('right', 'both') else 'left')
+        return np.sort(self.order[start:max(start, stop)])
+
+
+class FrameIndex:
+    """Lazily built ``SortedKey``s over a frame.  ``source`` is a DataFrame
+    or something with a ``frame`` attribute (eg. ``append.DailyTable``), in
+    which case the index follows the table as it grows."""
+    def __init__(self, source, keys=None):
+        self.source = source
+        self.key_funcs = dict(keys or {})
+        self._sorted = {}
+        self._stamp = None
+
+    @property
+    def df(self):
+        return getattr(self.source, 'frame', self.source)
+
+    def __repr__(self):
+        return '<FrameIndex {} rows, built={}>'.format(
+            len(self.df), sorted(self._sorted))
+
+    def invalidate(self):
+        "Forget the sorted keys (call after changing the frame in place)"
+        self._sorted.clear()
+
+    def _key_values(self, name):
+        func = self.key_funcs.get(name)
+        if func is None:
+            return self.df[name]
+        if callable(func):
+            return func(self.df)
+        return self.df[func]
+
+    def key(self, name):
+        "The ``SortedKey`` for ``name``, (re)built if needed"
+        df = self.df
+        stamp = (id(df), len(df))
+        if stamp != self._stamp:
+            self.invalidate()
+            self._stamp = stamp
+        if name not in self._sorted:
+            self._sorted[name] = SortedKey(self._key_values(name))
+        return self._sorted[name]
+
+    def positions(self, **conditions):
+        """Ascending row positions matching every condition.  A tuple is a
+        ``[lo, hi)`` range, a list means ``isin`` and anything else
+        equality"""
+        result = None
+        for name, cond in conditions.items():
+            key = self.key(name)
+            if isinstance(cond, tuple):
+                pos = key.range(*cond)
+            elif isinstance(cond, list):
+                pos = key.isin(cond)
+            else:
+                pos = key.eq(cond)
+            result = pos if result is None else np.intersect1d(
+                result, pos, assume_unique=True)
+        if result is None:
+            return np.arange(len(self.df))
+        return result
+
+    def select(self, **conditions):
+        "Rows of the frame matching ``positions(**conditions)``"
+        return self.df.iloc[self.positions(**conditions)]
+
+    def eq(self, name, value):
+        return self.df.iloc[self.key(name).eq(value)]
+
+    def isin(self, name, values):
+        return self.df.iloc[self.key(name).isin(values)]
+
+    def between(self, name, lo=None, hi=None, closed='left'):
+        return self.df.iloc[self.key(name).range(lo, hi, closed)]
+
+
+def nyc_index(nyc):
+    "``FrameIndex`` over Events and the year/month of EST"
+    return FrameIndex(nyc, keys={'year': lambda df: df.EST.dt.year,
+                                 'month': lambda df: df.EST.dt.month})
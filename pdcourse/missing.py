@@ -0,0 +1,121 @@
+"""Missing value profile of a frame from one boolean mask.
+
+The NaN section asks ``nyc.isna().any()``, ``nyc.isna().sum()``,
+``nyc.isna().mean().mul(100)``, ``nyc.isna().any(axis=1)`` and
+``nino.isna().corr()`` one after the other, building the full boolean
+frame each time.  ``MissingProfile`` builds the mask once and works out
+all of them from it::
+
+    prof = MissingProfile(nino)
+    prof.counts          # nino.isna().sum()
+    prof.percent         # nino.isna().mean().mul(100)
+    prof.rows            # nino.isna().any(axis=1)
+    prof.corr            # nino.isna().corr()
+    prof.runs            # gaps: number, longest and mean length per column
+    prof.summary()       # counts, percent and runs in one frame
+
+Runs are stretches of consecutive missing rows in the frame's order.  Pass
+``by`` (e.g. ``features.buoy_id(nino)`` on a frame sorted by buoy and date)
+and a run ends where the group changes.
+"""
+import numpy as np
+import pandas as pd
+
+
+def _mask(df):
+    "``df.isna()`` as a column-major bool array, one column at a time"
+    mask = np.empty((len(df), df.shape[1]), dtype=bool, order='F')
+    for i, name in enumerate(df.columns):
+        values = df.iloc[:, i].to_numpy()
+        if values.dtype.kind == 'f':
+            np.isnan(values, out=mask[:, i])
+        else:
+            mask[:, i] = pd.isna(values)
+    return mask
+
+
+def _runs(column, breaks):
+    "Lengths of the runs of True in ``column``, ending at ``breaks`` too"
+    edges = np.diff(np.concatenate([[False], column, [False]]).view('i1'))
+    starts = np.flatnonzero(edges == 1)
+    stops = np.flatnonzero(edges == -1)
+    if breaks is None or not len(starts):
+        return stops - starts
+    # split runs that cross a group boundary
+    cuts = np.flatnonzero(breaks)
+    inside = cuts[column[cuts] & column[cuts - 1]]
+    bounds = np.sort(np.concatenate([starts, stops, inside, inside]))
+    return bounds[1::2] - bounds[::2]
+
+
+class MissingProfile:
+    "Missing value counts, percentages, rows, runs and correlation of ``df``"
+    def __init__(self, df, by=None):
+        self.columns = df.columns
+        self.index = df.index
+        self.mask = _mask(df)
+        self.breaks = None
+        if by is not None:
+            codes = pd.factorize(pd.Series(by).to_numpy())[0]
+            self.breaks = np.concatenate([[False], codes[1:] != codes[:-1]])
+        self.total = self.mask.sum(axis=0)
+
+    def __repr__(self):
+        return '<MissingProfile {} rows, {} of {} columns with NaN>'.format(
+            len(self.index), int((self.total > 0).sum()), len(self.columns))
+
+    @property
+    def counts(self):
+        "Missing values per column"
+        return pd.Series(self.total, index=self.columns)
+
+    @property
+    def percent(self):
+        "Percentage of missing values per column"
+        n = max(len(self.index), 1)
+        return pd.Series(self.total * 100 / n, index=self.columns)
+
+    @property
+    def rows(self):
+        "True for rows missing any value"
+        return pd.Series(self.mask.any(axis=1), index=self.index)
+
+    @property
+    def runs(self):
+        "Number of gaps, longest and mean gap length per column"
+        out = {}
+        for i, name in enumerate(self.columns):
+            lengths = _runs(self.mask[:, i], self.breaks) if \
+                self.total[i] else np.array([], dtype='int64')
+            out[name] = (len(lengths), lengths.max(initial=0),
+                         lengths.mean() if len(lengths) else 0.0)
+        return pd.DataFrame.from_dict(
+            out, orient='index', columns=['gaps', 'longest', 'mean_gap'])
+
+    def run_lengths(self, column):
+        "Length of each gap in ``column``, in row order"
+        i = self.columns.get_loc(column)
+        return pd.Series(_runs(self.mask[:, i], self.breaks), name=column)
+
+    @property
+    def corr(self):
+        """Correlation of the missing masks, like ``df.isna().corr()``
+        (NaN for columns never or always missing)"""
+        n = len(self.index)
+        m = self.mask.astype('float64')
+        both = m.T @ m
+        p = self.total / n
+        cov = both / n - np.outer(p, p)
+        std = np.sqrt(p * (1 - p))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            corr = cov / np.outer(std, std)
+        corr[np.outer(std, std) == 0] = np.nan
+        np.fill_diagonal(corr, np.where(std > 0, 1.0, np.nan))
+        return pd.DataFrame(np.clip(corr, -1, 1), index=self.columns,
+                            columns=self.columns)
+
+    def summary(self):
+        "Counts, percentages and gaps per column"
+        return pd.concat([self.counts.rename('missing'),
+                          self.percent.rename('percent'), self.runs],
+                         axis=1)
@@ -0,0 +1,149 @@
+"""On-disk store of fitted models keyed on what went into them.
+
+Re-running 04_machine_learning retrains the forest even when the data has
+not changed.  ``ModelStore.fit`` hashes the training data, the feature
+column names and the estimator's class and parameters, and loads the
+fitted model from disk when it has seen that combination before::
+
+    store = ModelStore()
+    rf_model = store.fit(RandomForestRegressor(random_state=42),
+                         X_train, y_train)
+    store.importances(rf_model)   # sorted (column, importance) pairs
+
+Entries are pickles in ``data/.cache/models``.  When the directory grows
+past ``max_bytes`` the least recently used entries are removed.  Only load
+stores you wrote yourself, pickles can run code.
+"""
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .cache import CACHE_DIR
+
+MODEL_DIR = CACHE_DIR / 'models'
+
+
+def data_digest(data):
+    "sha1 hexdigest of the values (and labels) of a frame, Series or array"
+    h = hashlib.sha1()
+    if isinstance(data, (pd.DataFrame, pd.Series)):
+        h.update(pd.util.hash_pandas_object(data, index=True)
+                 .to_numpy().tobytes())
+        names = data.columns if isinstance(data, pd.DataFrame) else [data.name]
+        h.update(json.dumps([str(n) for n in names]).encode())
+    else:
+        data = np.ascontiguousarray(data)
+        h.update(str((data.shape, data.dtype.str)).encode())
+        h.update(data.tobytes())
+    return h.hexdigest()
+
+
+def model_key(estimator, X, y):
+    "Cache key for fitting ``estimator`` on ``X``/``y``"
+    params = sorted((name, repr(value))
+                    for name, value in estimator.get_params().items())
+    spec = {
+        'estimator': '{0.__module__}.{0.__qualname__}'.format(
+            type(estimator)),
+        'params': params,
+        'features': [str(c) for c in getattr(X, 'columns', [])],
+        'X': data_digest(X),
+        'y': data_digest(y),
+    }
+    return hashlib.sha1(json.dumps(spec).encode()).hexdigest()
+
+
+class ModelStore:
+    "Fitted models under ``directory``, at most ``max_bytes`` in total"
+    def __init__(self, directory=MODEL_DIR, max_bytes=500 * 2**20):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.last_hit = None
+
+    def __repr__(self):
+        entries = self.entries()
+        return '<ModelStore {} models, {:,} bytes>'.format(
+            len(entries), sum(size for _, size, _ in entries))
+
+    def _path(self, key):
+        return self.directory / '{}.pkl'.format(key)
+
+    def entries(self):
+        "``(path, size, last used)`` for each stored model, oldest first"
+        if not self.directory.exists():
+            return []
+        found = []
+        for path in self.directory.glob('*.pkl'):
+            st = path.stat()
+            found.append((path, st.st_size, st.st_mtime))
+        return sorted(found, key=lambda entry: entry[2])
+
+    def get(self, key):
+        "Stored record for ``key`` or None"
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as fin:
+                record = pickle.load(fin)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+        # mtime doubles as the last used time for eviction
+        os.utime(path)
+        return record
+
+    def put(self, key, model, X):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        record = {
+            'model': model,
+            'features': [str(c) for c in getattr(X, 'columns', [])],
+            'feature_importances': getattr(model, 'feature_importances_',
+                                           None),
+        }
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as fout:
+            pickle.dump(record, fout, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self._path(key))
+        self.evict(keep=key)
+        return record
+
+    def evict(self, keep=None):
+        "Remove least recently used models until under ``max_bytes``"
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            if path.stem == keep:
+                continue
+            path.unlink()
+            total -= size
+
+    def fit(self, estimator, X, y):
+        """Return ``estimator`` fitted on ``X``/``y``, from the store when
+        possible (``last_hit`` says which).  On a miss ``estimator`` itself
+        is fitted and stored."""
+        key = model_key(estimator, X, y)
+        record = self.get(key)
+        self.last_hit = record is not None
+        if record is None:
+            estimator.fit(X, y)
+            record = self.put(key, estimator, X)
+        return record['model']
+
+    def importances(self, model, columns=None):
+        """``sorted(zip(X.columns, model.feature_importances_), ...)`` like
+        the notebook, ``columns`` default to the ones the model saw"""
+        if columns is None:
+            columns = getattr(model, 'feature_names_in_',
+                              range(len(model.feature_importances_)))
+        return sorted(zip(columns, model.feature_importances_),
+                      key=lambda x: x[1], reverse=True)
+
+    def clear(self):
+        for path, _, _ in self.entries():
+            path.unlink()
@@ -0,0 +1,151 @@
+"""Plots whose drawing cost follows the figure width, not the row count.
+
+``nyc.set_index('EST').plot(figsize=(12, 6))`` draws a point for every day
+of every column and ``nino.plot.scatter(x='mer_winds', y='air_temp')`` a
+marker for every buoy reading.  A figure has only so many pixels, so::
+
+    line_plot(nyc.set_index('EST'), figsize=(12, 6))
+    scatter_plot(nino, x='mer_winds', y='air_temp', alpha=.1)
+
+first thin the data.  ``decimate`` splits the rows into one bucket per
+pixel column and keeps the first, last, smallest and largest row of each
+bucket, so spikes and the outline of the line survive.  ``line_plot``
+decimates every plotted column on its own, since the rows holding the
+extremes differ from column to column.
+Above ``threshold`` rows ``scatter_plot`` draws a hexbin density plot (or
+a 2D histogram with ``kind='hist2d'``) instead of one marker per row.
+Below the thresholds both are plain ``DataFrame.plot`` calls.
+
+matplotlib is imported when a plot is drawn, not with the package.
+"""
+import numpy as np
+import pandas as pd
+
+LINE_THRESHOLD = 5_000
+SCATTER_THRESHOLD = 20_000
+DPI = 100
+
+
+def _pixels(figsize=None):
+    "Width in pixels of a figure of ``figsize`` inches (matplotlib default)"
+    if figsize is None:
+        import matplotlib
+        figsize = matplotlib.rcParams['figure.figsize']
+    return int(figsize[0] * DPI)
+
+
+def _extremes(values, buckets):
+    "Positions of the min and max of ``values`` in each of ``buckets``"
+    n = len(values)
+    size = -(-n // buckets)
+    padded = np.full(buckets * size, np.nan)
+    padded[:n] = values
+    padded = padded.reshape(buckets, size)
+    starts = np.arange(buckets) * size
+    # NaN never wins; an all-NaN bucket just keeps its first row
+    low = np.where(np.isnan(padded), np.inf, padded).argmin(axis=1)
+    high = np.where(np.isnan(padded), -np.inf, padded).argmax(axis=1)
+    return np.concatenate([starts + low, starts + high])
+
+
+def decimate(obj, points=1000):
+    """Rows of ``obj`` (Series or DataFrame) keeping, in each of ``points``
+    buckets of consecutive rows, the first, last, min and max of every
+    numeric column.  Rows stay in order and are returned unchanged.  A
+    frame keeps the rows any column needs, so thin a wide frame one
+    column at a time."""
+    n = len(obj)
+    if n <= 4 * points:
+        return obj
+    frame = obj.to_frame() if isinstance(obj, pd.Series) else obj
+    numeric = frame.select_dtypes('number')
+    buckets = min(points, n)
+    bounds = np.arange(buckets) * -(-n // buckets)
+    keep = [bounds[bounds < n], np.minimum(bounds[1:] - 1, n - 1), [n - 1]]
+    for name in numeric:
+        values = numeric[name].to_numpy(dtype='float64', na_value=np.nan)
+        keep.append(_extremes(values, buckets))
+    positions = np.unique(np.concatenate(keep).astype('int64'))
+    return obj.iloc[positions[positions < n]]
+
+
+def _plotted(df, x, y):
+    "Numeric columns ``df.plot(x=x, y=y)`` draws a line for"
+    if y is not None:
+        return [y] if isinstance(y, str) else list(y)
+    return [name for name in df.select_dtypes('number') if name != x]
+
+
+def line_plot(obj, x=None, y=None, threshold=LINE_THRESHOLD, points=None,
+              **kwargs):
+    """``obj.plot(x=x, y=y, **kwargs)`` on at most about four rows per
+    pixel of the figure width once ``obj`` has more than ``threshold``
+    rows, thinning each plotted column on its own.  Rows are bucketed in
+    their current order, so sort by ``x`` first if it is not already
+    sorted."""
+    if len(obj) <= threshold:
+        if x is None and y is None:
+            return obj.plot(**kwargs)
+        return obj.plot(x=x, y=y, **kwargs)
+    if points is None:
+        points = _pixels(kwargs.get('figsize'))
+    if isinstance(obj, pd.Series):
+        return decimate(obj, points).plot(**kwargs)
+    import matplotlib.pyplot as plt
+    names = _plotted(obj, x, y)
+    frame = obj if x is None else obj.set_index(x)
+    legend = kwargs.pop('legend', True)
+    figsize = kwargs.pop('figsize', None)
+    ax = kwargs.pop('ax', None)
+    subplots = kwargs.pop('subplots', False)
+    if ax is None and subplots:
+        _, ax = plt.subplots(len(names), 1, sharex=True, squeeze=False,
+                             figsize=figsize)
+        ax = ax[:, 0]
+    elif ax is None:
+        _, ax = plt.subplots(figsize=figsize)
+    axes = list(ax) if subplots else [ax] * len(names)
+    for name, where in zip(names, axes):
+        decimate(frame[name], points).plot(ax=where, label=str(name),
+                                           **kwargs)
+    if legend:
+        for where in dict.fromkeys(axes):
+            where.legend()
+    return ax
+
+
+def scatter_plot(df, x, y, threshold=SCATTER_THRESHOLD, kind='hexbin',
+                 gridsize=100, **kwargs):
+    """``df.plot.scatter(x=x, y=y, **kwargs)``, or with more than
+    ``threshold`` rows a density plot of the same columns: a hexbin with
+    ``gridsize`` hexagons across, or a ``kind='hist2d'`` histogram with
+    ``gridsize`` bins a side.  Counts are log scaled."""
+    if len(df) <= threshold:
+        return df.plot.scatter(x=x, y=y, **kwargs)
+    # marker settings have no meaning for bins
+    for key in ('alpha', 's', 'c', 'marker'):
+        kwargs.pop(key, None)
+    if kind == 'hexbin':
+        kwargs.setdefault('bins', 'log')
+        kwargs.setdefault('mincnt', 1)
+        return df.plot.hexbin(x=x, y=y, gridsize=gridsize, **kwargs)
+    if kind != 'hist2d':
+        raise ValueError('kind must be hexbin or hist2d, not {!r}'.format(
+            kind))
+    import matplotlib.colors
+    import matplotlib.pyplot as plt
+    both = df[[x, y]].dropna()
+    counts, xedges, yedges = np.histogram2d(both[x], both[y],
+                                            bins=gridsize)
+    ax = kwargs.pop('ax', None)
+    if ax is None:
+        _, ax = plt.subplots(figsize=kwargs.pop('figsize', None))
+    kwargs.pop('figsize', None)
+    mesh = ax.pcolormesh(xedges, yedges,
+                         np.ma.masked_equal(counts, 0).T,
+                         norm=matplotlib.colors.LogNorm(),
+                         cmap=kwargs.pop('cmap', 'viridis'), **kwargs)
+    ax.figure.colorbar(mesh, ax=ax, label='count')
+    ax.set_xlabel(x)
+    ax.set_ylabel(y)
+    return ax
@@ -0,0 +1,171 @@
+"""Pre-aggregated day/week/month/year rollups of a time series frame.
+
+Build once, then answer resample style questions from the stored partial
+aggregates instead of the raw rows::
+
+    cube = TimeCube(nyc, key='EST')
+    cube.agg('ME', 'mean', 'Mean_Humidity')
+    # same as nyc.set_index('EST').Mean_Humidity.resample('ME').mean()
+    cube.agg('ME', ['mean', 'max', 'count'])
+    # same as nyc.groupby(pd.Grouper(key='EST', freq='ME'))
+    #             .agg(['mean', 'max', 'count']) for the numeric columns
+
+Every level stores count/sum/sum of squares/min/max per column (mean, var
+and std come from those) plus the number of rows.  A query uses the
+coarsest level whose bins fit inside the requested bins, so ``'ME'`` and
+``'QE'`` read the month level, ``'YE'`` the year level and ``'2W'`` the
+week level.  ``freq`` is any pandas frequency of a day or more, so month,
+quarter and year ends are ``'ME'``, ``'QE'`` and ``'YE'`` (pandas no longer
+takes ``'M'``, ``'Q'`` or ``'Y'``).  Times are bucketed by day, so
+fixed frequencies that are not a whole number of days (``'6h'``,
+``'36h'``) raise ValueError.
+"""
+import numpy as np
+import pandas as pd
+
+from .stream import finish_moments
+
+LEVELS = ['day', 'week', 'month', 'year']
+MOMENTS = ['count', 'sum', 'sumsq', 'min', 'max']
+
+
+def _level_keys(days, level):
+    "Bucket number of each day (days since the epoch) for ``level``"
+    if level == 'day':
+        return days
+    if level == 'week':
+        # 1970-01-01 was a Thursday, weeks run Monday to Sunday like 'W'
+        return (days + 3) // 7
+    unit = {'month': 'M', 'year': 'Y'}[level]
+    return days.astype('datetime64[D]').astype(
+        'datetime64[{}]'.format(unit)).astype('int64')
+
+
+def _combine(parts, keys):
+    "Fold ``parts`` rows sharing a key together"
+    out = {}
+    for stat, frame in parts.items():
+        grouped = frame.groupby(keys)
+        if stat in ('min', 'max'):
+            out[stat] = getattr(grouped, stat)()
+        else:
+            out[stat] = grouped.sum()
+    return out
+
+
+class TimeCube:
+    """Rollups of the numeric ``columns`` of ``df`` keyed on the datetime
+    column ``key`` (or the index when ``key`` is None)."""
+    def __init__(self, df, key=None, columns=None):
+        times = df.index if key is None else df[key]
+        self.name = key if key is not None else df.index.name
+        if columns is None:
+            columns = [c for c in df.select_dtypes('number').columns
+                       if c != key]
+        self.columns = list(columns)
+        self.levels = {}
+        self._build(df[self.columns], times)
+
+    def _build(self, values, times):
+        self._dtype = np.asarray(times).dtype
+        days = np.asarray(times, dtype='datetime64[D]')
+        ok = ~np.isnat(days)
+        values = values[ok].astype('float64')
+        days = days[ok].astype('int64')
+        grouped = values.groupby(days)
+        parts = {
+            'count': grouped.count(),
+            'sum': grouped.sum(),
+            'sumsq': (values * values).groupby(days).sum(),
+            'min': grouped.min(),
+            'max': grouped.max(),
+            'size': grouped.size(),
+        }
+        index = parts['count'].index.to_numpy()
+        self.levels['day'] = dict(parts, first=index, last=index)
+        for level in LEVELS[1:]:
+            day = self.levels['day']
+            keys = _level_keys(day['first'], level)
+            parts = _combine({stat: day[stat] for stat in
+                              MOMENTS + ['size']}, keys)
+            self.levels[level] = dict(
+                parts,
+                first=pd.Series(day['first']).groupby(keys).min().to_numpy(),
+                last=pd.Series(day['last']).groupby(keys).max().to_numpy())
+
+    def __repr__(self):
+        return '<TimeCube {} columns, {} days>'.format(
+            len(self.columns), len(self.levels['day']['first']))
+
+    def _bins(self, freq):
+        "Labels and side for ``freq`` bins over the cube's days"
+        offset = pd.tseries.frequencies.to_offset(freq)
+        if isinstance(offset, pd.offsets.Tick) and \
+                offset.nanos % pd.Timedelta(days=1).value:
+            raise ValueError('frequency {!r} is not a whole number of '
+                             'days'.format(freq))
+        day = self.levels['day']
+        span = pd.DatetimeIndex(
+            np.array([day['first'][0], day['last'][-1]], dtype='datetime64[D]')
+            .astype(self._dtype), name=self.name)
+        labels = pd.Series(0, index=span).resample(freq).size().index
+        closed = pd.Grouper(freq=freq).closed or 'left'
+        return labels, closed
+
+    def _assign(self, labels, closed, days):
+        edges = labels.to_numpy()
+        times = np.asarray(days, dtype='datetime64[D]').astype(edges.dtype)
+        if closed == 'right':
+            return np.searchsorted(edges, times, side='left')
+        return np.searchsorted(edges, times, side='right') - 1
+
+    def _parts(self, freq):
+        labels, closed = self._bins(freq)
+        for level in reversed(LEVELS):
+            stored = self.levels[level]
+            first = self._assign(labels, closed, stored['first'])
+            last = self._assign(labels, closed, stored['last'])
+            # the day level always fits
+            if (first == last).all():
+                break
+        parts = _combine({stat: stored[stat] for stat in MOMENTS + ['size']},
+                         first)
+        positions = pd.RangeIndex(len(labels))
+        for stat, frame in parts.items():
+            if stat in ('min', 'max'):
+                frame = frame.reindex(positions)
+            else:
+                frame = frame.reindex(positions, fill_value=0)
+            frame.index = labels
+            parts[stat] = frame
+        return parts, level
+
+    def agg(self, freq, aggs='mean', columns=None):
+        """Resample to ``freq`` and aggregate, ``aggs`` are names from
+        ``stream.STATS``.  Returns a Series for a single column name and a
+        single agg, otherwise a DataFrame (with (column, agg) columns when
+        both are lists)."""
+        parts, _ = self._parts(freq)
+        single_col = isinstance(columns, str)
+        cols = [columns] if single_col else list(columns or self.columns)
+        single_agg = isinstance(aggs, str)
+        names = [aggs] if single_agg else list(aggs)
+
+        def stat(name):
+            if name == 'size':
+                return pd.DataFrame({c: parts['size'] for c in cols})
+            return finish_moments(name, {s: parts[s][cols] for s in MOMENTS})
+
+        results = {name: stat(name) for name in names}
+        if single_agg:
+            out = results[aggs]
+            return out[columns] if single_col else out
+        if single_col:
+            return pd.DataFrame({name: results[name][columns]
+                                 for name in names})
+        return pd.concat({(c, name): results[name][c]
+                          for c in cols for name in names}, axis=1)
+
+    def level_for(self, freq):
+        "Name of the stored level used to answer ``freq``"
+        return self._parts(freq)[1]
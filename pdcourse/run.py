@@ -0,0 +1,255 @@
+"""Execute the course notebooks headless, in parallel, reusing cell outputs.
+
+The nightly job runs the lesson notebooks and ``Solutions/*.ipynb`` one
+after the other, top to bottom.  From the project root::
+
+    python -m pdcourse.run --jobs 4 --allow-errors *.ipynb Solutions/*.ipynb
+
+runs each notebook in its own kernel, ``--jobs`` at a time (``make run``
+does the same).  The outputs of every code cell are stored in
+``data/.cache/cells`` under a key made from the cell's source and the key
+of the code cell above it, so a key changes when the cell or anything
+before it changes.  The data files' sizes and mtimes, a digest of the
+``pdcourse`` sources and ``requirements.txt``, and the kernel name go into
+the first key, so new data, a changed helper or new package pins rerun
+everything.
+
+A notebook whose cells all have stored outputs gets them back without
+starting a kernel.  Otherwise the cells are run from the top: a kernel
+has to rebuild the state the changed cell sees, but the cells before it
+are quick to repeat because loads and model fits come from their own
+caches (``cache.py``, ``models.py``).  Cells whose output is an error are
+never stored, so they run again next time.
+
+Executed notebooks go to ``--output-dir`` (``executed`` by default) under
+their path relative to the current directory (``Solutions/begpandas.ipynb``
+and ``Class/begpandas.ipynb`` don't overwrite each other), so the lesson
+notebooks and their exercise cells are left alone; ``--in-place``
+overwrites the originals.  ``--allow-errors`` keeps going past failing
+cells (the unfinished exercises) and lists them in the report.  Needs
+``nbformat``, ``nbclient`` and a Jupyter kernel, all part of the course's
+Jupyter image.
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from .cache import CACHE_DIR
+from .load import DATA_DIR
+
+CELL_DIR = CACHE_DIR / 'cells'
+PACKAGE_DIR = Path(__file__).resolve().parent
+REQUIREMENTS = PACKAGE_DIR.parent / 'requirements.txt'
+OUTPUT_DIR = Path('executed')
+FORMAT_VERSION = 1
+
+
+def data_stamp(data_dir=DATA_DIR):
+    "Digest of the names, sizes and mtimes of the files in ``data_dir``"
+    h = hashlib.sha1()
+    for path in sorted(Path(data_dir).iterdir()):
+        if path.is_file():
+            st = path.stat()
+            h.update('{}:{}:{}\n'.format(path.name, st.st_size,
+                                         st.st_mtime_ns).encode())
+    return h.hexdigest()
+
+
+def code_stamp(package_dir=PACKAGE_DIR, requirements=REQUIREMENTS):
+    "Digest of the ``pdcourse`` sources and the pinned requirements"
+    h = hashlib.sha1()
+    for path in sorted(Path(package_dir).glob('*.py')) + [Path(requirements)]:
+        try:
+            data = path.read_bytes()
+        except OSError:
+            continue
+        h.update('{}:{}\n'.format(path.name, len(data)).encode())
+        h.update(data)
+    return h.hexdigest()
+
+
+def stamp():
+    "Salt for ``cell_keys``: the data files, helper code and pins"
+    return '{}:{}'.format(data_stamp(), code_stamp())
+
+
+def cell_keys(sources, salt=''):
+    "Key of each code cell: its source chained to the key of the one above"
+    key = hashlib.sha1('{}:{}'.format(FORMAT_VERSION, salt).encode())
+    key = key.hexdigest()
+    keys = []
+    for source in sources:
+        key = hashlib.sha1('{}\0{}'.format(key, source).encode()).hexdigest()
+        keys.append(key)
+    return keys
+
+
+def read_cell(key, cell_dir=None):
+    "Stored ``{'outputs', 'execution_count'}`` for ``key``, or None"
+    try:
+        with open(Path(cell_dir or CELL_DIR) / (key + '.json')) as fin:
+            return json.load(fin)
+    except (OSError, ValueError):
+        return None
+
+
+def cell_error(cell):
+    "``'ename: evalue'`` of the first error in the outputs of ``cell``"
+    for out in cell.get('outputs', []):
+        if out.get('output_type') == 'error':
+            return '{}: {}'.format(out.get('ename'), out.get('evalue'))
+    return None
+
+
+def write_cell(key, cell, cell_dir=None):
+    cell_dir = Path(cell_dir or CELL_DIR)
+    cell_dir.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=cell_dir, suffix='.tmp')
+    with os.fdopen(fd, 'w') as fout:
+        json.dump({'outputs': cell.outputs,
+                   'execution_count': cell.execution_count}, fout)
+    os.replace(tmp, cell_dir / (key + '.json'))
+
+
+def run_notebook(path, output=None, kernel=None, timeout=600, force=False,
+                 allow_errors=False, cell_dir=None, salt=None):
+    """Execute the notebook at ``path`` (reusing stored cell outputs unless
+    ``force``), write it to ``output`` (default ``path``) and return a
+    summary dict.  A failing cell stops the run unless ``allow_errors``,
+    a timeout or dead kernel always does."""
+    import nbformat
+    from nbclient import NotebookClient
+    from nbclient.exceptions import (CellExecutionError, CellTimeoutError,
+                                     DeadKernelError)
+
+    path = Path(path)
+    start = time.perf_counter()
+    nb = nbformat.read(path, as_version=4)
+    kernel = kernel or nb.metadata.get('kernelspec', {}).get('name', '')
+    code = [(i, cell) for i, cell in enumerate(nb.cells)
+            if cell.cell_type == 'code']
+    salt = stamp() if salt is None else salt
+    keys = cell_keys([cell.source for _, cell in code],
+                     '{}:{}'.format(kernel, salt))
+    stored = [None if force else read_cell(key, cell_dir) for key in keys]
+    summary = {'path': str(path), 'cells': len(code), 'cached': 0, 'ran': 0,
+               'failed': [], 'error': None}
+    if all(found is not None for found in stored):
+        for (_, cell), found in zip(code, stored):
+            cell.outputs = nbformat.from_dict(found['outputs'])
+            cell.execution_count = found['execution_count']
+        summary['cached'] = len(code)
+    else:
+        where = {'metadata': {'path': str(path.parent.resolve())}}
+        client = NotebookClient(nb, timeout=timeout, kernel_name=kernel,
+                                allow_errors=allow_errors, resources=where)
+        try:
+            with client.setup_kernel():
+                for (i, cell), key, found in zip(code, keys, stored):
+                    try:
+                        client.execute_cell(cell, i)
+                    except CellExecutionError as exc:
+                        summary['error'] = 'cell {}: {}: {}'.format(
+                            i, exc.ename, exc.evalue)
+                        break
+                    error = cell_error(cell)
+                    if error is not None:
+                        # not stored, so it runs again once fixed
+                        summary['failed'].append('cell {}: {}'.format(
+                            i, error))
+                    elif found is None:
+                        write_cell(key, cell, cell_dir)
+                    if found is None:
+                        summary['ran'] += 1
+                    else:
+                        summary['cached'] += 1
+        except (CellTimeoutError, DeadKernelError, RuntimeError) as exc:
+            summary['error'] = '{}: {}'.format(
+                type(exc).__name__, str(exc).strip().split('\n')[0])
+    nbformat.write(nb, Path(output or path))
+    summary['seconds'] = time.perf_counter() - start
+    return summary
+
+
+def output_path(output_dir, path):
+    """Where ``--output-dir`` puts the notebook at ``path``: its path
+    relative to the current directory, or its full path for notebooks
+    outside it"""
+    path = Path(path).resolve()
+    try:
+        rel = path.relative_to(Path.cwd())
+    except ValueError:
+        rel = path.relative_to(path.anchor)
+    return Path(output_dir) / rel
+
+
+def _report(summary):
+    how = 'FAILED at {}'.format(summary['error']) if summary['error'] else \
+        'ok'
+    if summary['failed'] and not summary['error']:
+        how = '{} failing cell(s)'.format(len(summary['failed']))
+    lines = ['{path}: {cells} code cells, {ran} changed, {cached} unchanged, '
+             '{seconds:.1f} s, {how}'.format(how=how, **summary)]
+    lines += ['    ' + failed for failed in summary['failed']]
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m pdcourse.run',
+        description='Execute notebooks in parallel, reusing the outputs of '
+                    'cells that have not changed.')
+    parser.add_argument('notebooks', nargs='+', type=Path)
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(),
+                        help='notebooks run at once (default: CPUs)')
+    parser.add_argument('--timeout', type=int, default=600,
+                        help='seconds allowed per cell')
+    parser.add_argument('--kernel', help="kernel name (default: the "
+                                         "notebook's own)")
+    parser.add_argument('--output-dir', type=Path, default=OUTPUT_DIR,
+                        help='write executed notebooks here (default: '
+                             '{})'.format(OUTPUT_DIR))
+    parser.add_argument('--in-place', action='store_true',
+                        help='overwrite the notebooks instead')
+    parser.add_argument('--force', action='store_true',
+                        help='ignore stored outputs and run every cell')
+    parser.add_argument('--allow-errors', action='store_true',
+                        help='keep going past failing cells (the exercise '
+                             'cells of the lesson notebooks)')
+    args = parser.parse_args(argv)
+
+    outputs = [None] * len(args.notebooks)
+    if not args.in_place:
+        outputs = [output_path(args.output_dir, nb) for nb in args.notebooks]
+        for out in outputs:
+            out.parent.mkdir(parents=True, exist_ok=True)
+    salt = stamp()
+    count = len(args.notebooks)
+    with ProcessPoolExecutor(max(1, min(args.jobs or 1, count))) as pool:
+        futures = [pool.submit(run_notebook, nb, out, args.kernel,
+                               args.timeout, args.force, args.allow_errors,
+                               None, salt)
+                   for nb, out in zip(args.notebooks, outputs)]
+        summaries = []
+        for nb, future in zip(args.notebooks, futures):
+            try:
+                summaries.append(future.result())
+            except Exception as exc:
+                # one broken notebook must not hide the others' reports
+                summaries.append({'path': str(nb), 'cells': 0, 'cached': 0,
+                                  'ran': 0, 'failed': [], 'seconds': 0.,
+                                  'error': '{}: {}'.format(
+                                      type(exc).__name__, exc)})
+    for summary in summaries:
+        print(_report(summary))
+    return 1 if any(s['error'] for s in summaries) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,328 @@
+"""Score new Central Park rows or TAO readings with a trained forest.
+
+Train and save a model (the 04_machine_learning setup: tweak, dummies for
+Events, drop the humidity/timestamp columns, predict the next reading)::
+
+    python -m pdcourse.score train nyc nyc_model.pkl
+
+then score raw rows in micro-batches from stdin or a file, writing CSV
+predictions to stdout::
+
+    tail -n 0 -f data.csv | python -m pdcourse.score stream nyc_model.pkl
+
+The input may start with the CSV header or not (``tail -f`` only sends the
+new rows), the model file keeps the raw header of the training data for
+input without one.
+
+or over HTTP (POST raw rows to ``/score``, GET ``/metrics``)::
+
+    python -m pdcourse.score http nyc_model.pkl --port 8000
+    curl --data-binary @new_rows.csv localhost:8000/score
+
+The model file stores the frozen feature columns, so new data with fewer
+(or extra) Events values lines up with what the model was trained on.
+Throughput and latency percentiles (from when a row is read to its
+prediction) are printed to stderr after streaming and served by
+``/metrics``.
+"""
+import argparse
+import collections
+import io
+import itertools
+import json
+import pickle
+import queue
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+from .features import buoy_id, valid
+from .load import fix_nino_dates, nino_csv_kwargs, parse_nino, parse_nyc
+from .tweak import tweak_nino, tweak_nyc
+
+
+def _read_nyc(text):
+    return pd.read_csv(io.StringIO(text), parse_dates=[0])
+
+
+def _read_nino(text):
+    return fix_nino_dates(pd.read_csv(io.StringIO(text), **nino_csv_kwargs()))
+
+
+# how each dataset is parsed, tweaked and turned into features
+DATASETS = {
+    'nyc': dict(parse=parse_nyc, read=_read_nyc, tweak=tweak_nyc,
+                header=True, dummies=['Events'], target='Mean_Humidity',
+                valid=valid),
+    'nino': dict(parse=parse_nino, read=_read_nino, tweak=tweak_nino,
+                 header=False, dummies=[], target='air_temp_F',
+                 valid=lambda col: not col.startswith('air_temp')),
+}
+
+
+class Schema:
+    """Frozen raw rows to feature matrix transform for one dataset.
+    ``header`` is the raw CSV header line of the training data, if the
+    dataset has one."""
+    def __init__(self, dataset, columns, header=''):
+        self.dataset = dataset
+        self.columns = list(columns)
+        self.header = header or ''
+
+    @property
+    def spec(self):
+        return DATASETS[self.dataset]
+
+    def is_header(self, line):
+        "Whether ``line`` is the raw header (always, when none was saved)"
+        return not self.header or line.strip() == self.header.strip()
+
+    def with_header(self, text):
+        "Raw rows ``text`` starting with a header line"
+        if not self.spec['header'] or \
+                self.is_header(text.partition('\n')[0]):
+            return text
+        return self.header + text
+
+    def features(self, tweaked):
+        "Dummies plus numeric columns of a tweaked frame, not yet frozen"
+        spec = self.spec
+        df = pd.get_dummies(tweaked, columns=spec['dummies'])
+        return df[[c for c in df.select_dtypes(['number', 'bool']).columns
+                   if spec['valid'](c)]]
+
+    def transform(self, raw):
+        "Feature matrix for raw rows in the frozen column order"
+        X = self.features(self.spec['tweak'](raw))
+        return (X.reindex(columns=self.columns, fill_value=0)
+                .astype('float32').fillna(0))
+
+
+def train(dataset, path, n_estimators=100, random_state=42, store=None):
+    "Fit the notebook model for ``dataset`` and save it with its schema"
+    from sklearn.ensemble import RandomForestRegressor
+
+    spec = DATASETS[dataset]
+    raw = spec['parse']()
+    tweaked = spec['tweak'](raw)
+    if dataset == 'nino':
+        y = tweaked.groupby(buoy_id(tweaked))[spec['target']].shift(-1)
+    else:
+        y = tweaked[spec['target']].shift(-1)
+    X = Schema(dataset, []).features(tweaked)
+    header = ','.join(raw.columns) + '\n' if spec['header'] else ''
+    schema = Schema(dataset, X.columns, header)
+    keep = y.notna()
+    X = X[keep].astype('float32').fillna(0)
+    y = y[keep]
+    model = RandomForestRegressor(n_estimators=n_estimators,
+                                  random_state=random_state, n_jobs=-1)
+    model = store.fit(model, X, y) if store is not None else model.fit(X, y)
+    with open(path, 'wb') as fout:
+        pickle.dump({'model': model, 'dataset': dataset,
+                     'columns': schema.columns, 'header': schema.header},
+                    fout)
+    return model
+
+
+class Scorer:
+    """A loaded model plus its schema, recording the latency of every row
+    from when it was received to its prediction"""
+    def __init__(self, model, schema, window=10000):
+        self.model = model
+        self.schema = schema
+        self.latencies = collections.deque(maxlen=window)
+        self.rows = 0
+        self.batches = 0
+        self.busy = 0.
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as fin:
+            saved = pickle.load(fin)
+        return cls(saved['model'], Schema(saved['dataset'], saved['columns'],
+                                          saved.get('header')))
+
+    def score(self, raw, received=None):
+        """Predictions for a frame of raw rows, received at ``received``
+        (``time.perf_counter()`` per row or one for all, default now)"""
+        start = time.perf_counter()
+        X = self.schema.transform(raw)
+        pred = pd.Series(self.model.predict(X), index=raw.index,
+                         name='prediction')
+        done = time.perf_counter()
+        elapsed = done - start
+        received = start if received is None else received
+        waited = done - np.broadcast_to(received, len(raw))
+        with self._lock:
+            self.latencies.extend(waited.tolist())
+            self.busy += elapsed
+            self.rows += len(raw)
+            self.batches += 1
+        return pred
+
+    def score_text(self, text, received=None):
+        """Predictions for raw rows given as text in the dataset's file
+        format, with or without the header line"""
+        return self.score(self.schema.spec['read'](
+            self.schema.with_header(text)), received)
+
+    def metrics(self):
+        """Batches and rows scored, rows per second spent scoring and p50/p99
+        ms from receiving a row to its prediction"""
+        with self._lock:
+            lat = np.array(self.latencies) * 1000
+        pct = (np.percentile(lat, [50, 99]) if len(lat)
+               else [np.nan, np.nan])
+        return {
+            'batches': self.batches,
+            'rows': self.rows,
+            'rows_per_second': self.rows / self.busy if self.busy else 0.,
+            'uptime_seconds': time.perf_counter() - self.started,
+            'p50_ms': float(pct[0]),
+            'p99_ms': float(pct[1]),
+        }
+
+
+def _read(lines, pending):
+    "Put ``(time received, line)`` for every line of ``lines``, then None"
+    try:
+        for line in lines:
+            pending.put((time.perf_counter(), line))
+    finally:
+        pending.put(None)
+
+
+def _batches(lines, batch_size, max_wait):
+    """Lists of ``(time received, line)``, cut at ``batch_size`` lines or
+    ``max_wait`` seconds after the first of them arrived.  Lines are read
+    on their own thread, so a partial batch goes out on time even while
+    the input is quiet."""
+    pending = queue.Queue()
+    threading.Thread(target=_read, args=(lines, pending), daemon=True).start()
+    batch = []
+    while True:
+        timeout = None
+        if batch:
+            timeout = max(batch[0][0] + max_wait - time.perf_counter(), 0.)
+        try:
+            item = pending.get(timeout=timeout)
+        except queue.Empty:
+            yield batch
+            batch = []
+            continue
+        if item is None:
+            break
+        if not item[1].strip():
+            continue
+        batch.append(item)
+        if (len(batch) >= batch_size or
+                time.perf_counter() - batch[0][0] >= max_wait):
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def serve_stream(scorer, infile, outfile, batch_size=256, max_wait=1.):
+    """Score raw rows read line by line from ``infile``, writing
+    ``prediction`` CSV lines to ``outfile``.  A first line that isn't the
+    saved header is scored as a row."""
+    schema = scorer.schema
+    lines = iter(infile)
+    header = ''
+    if schema.spec['header']:
+        first = next(lines, '')
+        if schema.is_header(first):
+            header = first
+        else:
+            header = schema.header
+            lines = itertools.chain([first], lines)
+    outfile.write('prediction\n')
+    for batch in _batches(lines, batch_size, max_wait):
+        received = np.array([when for when, _ in batch])
+        text = header + ''.join(line for _, line in batch)
+        pred = scorer.score(schema.spec['read'](text), received)
+        outfile.write(''.join('{}\n'.format(p) for p in pred))
+        outfile.flush()
+
+
+def serve_http(scorer, host='127.0.0.1', port=8000):
+    "Serve POST /score (raw rows as the request body) and GET /metrics"
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, code, payload):
+            body = json.dumps(payload).encode()
+            self.send_response(code)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path != '/metrics':
+                return self._send(404, {'error': 'not found'})
+            self._send(200, scorer.metrics())
+
+        def do_POST(self):
+            if self.path != '/score':
+                return self._send(404, {'error': 'not found'})
+            length = int(self.headers.get('Content-Length', 0))
+            text = self.rfile.read(length).decode()
+            try:
+                pred = scorer.score_text(text)
+            except (ValueError, KeyError, AttributeError) as e:
+                return self._send(400, {'error': str(e)})
+            self._send(200, {'predictions': pred.tolist()})
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m pdcourse.score',
+                                     description=__doc__.split('\n')[0])
+    sub = parser.add_subparsers(dest='command', required=True)
+    p = sub.add_parser('train', help='fit and save a model')
+    p.add_argument('dataset', choices=sorted(DATASETS))
+    p.add_argument('model')
+    p.add_argument('--n-estimators', type=int, default=100)
+    p = sub.add_parser('stream', help='score rows from a file or stdin')
+    p.add_argument('model')
+    p.add_argument('input', nargs='?', type=argparse.FileType('r'),
+                   default=sys.stdin)
+    p.add_argument('--batch-size', type=int, default=256)
+    p.add_argument('--max-wait', type=float, default=1.)
+    p = sub.add_parser('http', help='score rows POSTed to /score')
+    p.add_argument('model')
+    p.add_argument('--host', default='127.0.0.1')
+    p.add_argument('--port', type=int, default=8000)
+    args = parser.parse_args(argv)
+
+    if args.command == 'train':
+        train(args.dataset, args.model, n_estimators=args.n_estimators)
+        return
+    scorer = Scorer.load(args.model)
+    if args.command == 'stream':
+        serve_stream(scorer, args.input, sys.stdout, args.batch_size,
+                     args.max_wait)
+        print(json.dumps(scorer.metrics()), file=sys.stderr)
+    else:
+        serve_http(scorer, args.host, args.port)
+
+
+if __name__ == '__main__':
+    main()
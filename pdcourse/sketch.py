@@ -0,0 +1,312 @@
+"""Mergeable approximate quantiles per group.
+
+``auto.groupby(['year', 'make'])['city08'].quantile(.7)`` needs every value
+of a group at once.  ``QuantileSketch`` keeps a summary of at most about
+``delta`` weighted centroids per group instead.  Centroids are small in the
+tails and larger near the median, in the style of t-digest::
+
+    sketch = QuantileSketch()
+    for chunk in chunks:
+        sketch.update(chunk.city08, [chunk.year, chunk.make])
+    sketch.quantile(.7)
+
+Sketches of different chunks can be merged in any order.  Repeated values
+are stored once with a count, so groups with at most ``delta`` distinct
+values (whole number data like mpg, say) give exact quantiles, and the
+smallest and largest value of every group are always exact.  Quantiles
+interpolate linearly between centroids, the way pandas interpolates
+between values.
+All groups are handled together with array operations, so thousands of
+small groups cost about the same as one large one.
+
+``delta`` sets the size/accuracy trade off: a quantile is off by at most
+about ``rank_error = pi / (4 * delta)`` in rank (0.4% at the default 200),
+usually far less.  ``QuantileSketch(error=.001)`` picks ``delta`` for a
+target rank error instead.  ``approx_quantile`` is the one call version of
+``groupby(...).quantile``, optionally sketching partitions of the data in a
+process pool and merging the results::
+
+    approx_quantile(nyc.Max_Humidity, [.2, .3])
+    approx_quantile(auto.city08, .7, by=[auto.year, auto.make],
+                    processes=4).unstack('make')
+"""
+import math
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+
+def group_codes(keys, n):
+    """``(codes, labels)`` for ``n`` rows grouped by ``keys`` (a Series, a
+    list of them or None for one group): codes index into the sorted
+    labels, -1 where a key is missing"""
+    if keys is None:
+        return np.zeros(n, dtype='int64'), pd.Index([0])
+    if not isinstance(keys, (list, tuple)):
+        keys = [keys]
+    names = [getattr(k, 'name', None) for k in keys]
+    if len(keys) == 1:
+        codes, labels = pd.factorize(np.asarray(keys[0]), sort=True)
+        return codes.astype('int64'), pd.Index(labels, name=names[0])
+    # factorize each level, then the combined integer codes, instead of
+    # hashing a tuple per row
+    level_codes, levels = zip(*(pd.factorize(np.asarray(k), sort=True)
+                                for k in keys))
+    missing = np.logical_or.reduce([c < 0 for c in level_codes])
+    shape = [max(len(lev), 1) for lev in levels]
+    flat = np.ravel_multi_index([np.maximum(c, 0) for c in level_codes],
+                                shape)
+    used, codes = np.unique(flat[~missing], return_inverse=True)
+    out = np.full(n, -1, dtype='int64')
+    out[~missing] = codes.ravel()
+    labels = pd.MultiIndex(levels=[pd.Index(lev) for lev in levels],
+                           codes=np.unravel_index(used, shape), names=names)
+    return out, labels
+
+
+def _group_order(codes, means):
+    "``np.lexsort((means, codes))``, in two stable passes"
+    order = np.argsort(means, kind='stable')
+    # numpy radix sorts 16 bit integers, much faster than lexsort
+    small = np.min_scalar_type(max(int(codes.max(initial=0)), 0))
+    return order[np.argsort(codes[order].astype(small), kind='stable')]
+
+
+def delta_for_error(error):
+    "Smallest ``delta`` whose rank error bound is at most ``error``"
+    if not 0 < error < 1:
+        raise ValueError('error must be between 0 and 1')
+    return math.ceil(math.pi / (4 * error))
+
+
+class QuantileSketch:
+    "Approximate per group quantiles with at most ~``delta`` centroids each"
+    def __init__(self, delta=200, error=None):
+        if error is not None:
+            delta = delta_for_error(error)
+        self.delta = delta
+        self.grouped = True
+        self.labels = None     # sorted group labels
+        self.codes = None      # group of each centroid, sorted by group
+        self.means = None      # centroid values, sorted within group
+        self.weights = None
+        self.exact = None      # centroids that hold a single value
+
+    def __repr__(self):
+        if self.labels is None:
+            return '<QuantileSketch empty>'
+        return '<QuantileSketch {} groups, {} centroids>'.format(
+            len(self.labels), len(self.means))
+
+    @property
+    def rank_error(self):
+        "Bound on the rank error of a quantile, as a fraction of the count"
+        return math.pi / (4 * self.delta)
+
+    def update(self, values, keys=None):
+        """Add ``values`` grouped by ``keys`` (a Series, list of Series or
+        None for one group); rows missing a value or key are skipped"""
+        values = np.asarray(values, dtype='float64')
+        self.grouped = keys is not None
+        codes, labels = group_codes(keys, len(values))
+        return self.update_codes(values, codes, labels)
+
+    def update_codes(self, values, codes, labels):
+        "``update`` with the keys already factorized by ``group_codes``"
+        keep = ~np.isnan(values) & (codes >= 0)
+        n = keep.sum()
+        self._add(labels, codes[keep], values[keep], np.ones(n),
+                  np.ones(n, dtype=bool))
+        return self
+
+    def merge(self, other):
+        "Fold the centroids of ``other`` into this sketch"
+        if other.labels is not None:
+            self.grouped = other.grouped
+            self._add(other.labels, other.codes, other.means,
+                      other.weights, other.exact)
+        return self
+
+    def _add(self, labels, codes, means, weights, exact):
+        if self.labels is not None:
+            # the union of both label sets, and where each old one went
+            both = self.labels.append(labels)
+            where, labels = pd.factorize(both, sort=True)
+            old = where[:len(self.labels)]
+            new = where[len(self.labels):]
+            codes = np.concatenate([old[self.codes], new[codes]])
+            means = np.concatenate([self.means, means])
+            weights = np.concatenate([self.weights, weights])
+            exact = np.concatenate([self.exact, exact])
+            labels.names = both.names
+        # drop groups that have no values at all
+        used = np.bincount(codes, minlength=len(labels)) > 0
+        if not used.all():
+            codes = (np.cumsum(used) - 1)[codes]
+            labels = labels[used]
+        self.labels = labels
+        order = _group_order(codes, means)
+        self._set(codes[order], means[order], weights[order], exact[order])
+        self._compress()
+
+    def _set(self, codes, means, weights, exact):
+        self.codes, self.means = codes, means
+        self.weights, self.exact = weights, exact
+
+    def _merge_runs(self, start):
+        "Merge each run of centroids beginning where ``start`` is True"
+        seg = np.cumsum(start) - 1
+        first = np.flatnonzero(start)
+        weights = np.bincount(seg, weights=self.weights)
+        means = np.bincount(seg, weights=self.weights * self.means) / weights
+        same = (np.minimum.reduceat(self.means, first) ==
+                np.maximum.reduceat(self.means, first))
+        exact = same & np.logical_and.reduceat(self.exact, first)
+        # runs of one identical value keep it as it was, no rounding
+        means = np.where(exact, self.means[first], means)
+        self._set(self.codes[first], means, weights, exact)
+
+    def _new_group(self):
+        new_group = np.ones(len(self.codes), dtype=bool)
+        new_group[1:] = self.codes[1:] != self.codes[:-1]
+        return new_group
+
+    def _compress(self):
+        if not len(self.codes):
+            return
+        # identical values collapse without any loss
+        start = self._new_group() | ~self.exact
+        start[1:] |= (self.means[1:] != self.means[:-1]) | ~self.exact[:-1]
+        self._merge_runs(start)
+        codes, weights = self.codes, self.weights
+        n = len(codes)
+        new_group = self._new_group()
+        last = np.ones(n, dtype=bool)
+        last[:-1] = new_group[1:]
+        ngroups = len(self.labels)
+        total = np.bincount(codes, weights=weights, minlength=ngroups)
+        before = np.concatenate([[0], np.cumsum(total)[:-1]])
+        q = (np.cumsum(weights) - weights / 2 - before[codes]) / total[codes]
+        # arcsine scale: narrow buckets in the tails, wide at the median
+        bucket = np.floor(self.delta * (np.arcsin(2 * q - 1) / np.pi + .5))
+        bucket = np.clip(bucket, 0, self.delta)
+        # groups with few distinct centroids are left as they are
+        small = np.bincount(codes, minlength=ngroups) <= self.delta + 2
+        bucket = np.where(small[codes], -2. - np.arange(n), bucket)
+        # keep each group's min and max as their own centroids
+        bucket[last] = self.delta + 1
+        bucket[new_group] = -1
+        start = new_group.copy()
+        start[1:] |= bucket[1:] != bucket[:-1]
+        if not start.all():
+            self._merge_runs(start)
+
+    def count(self):
+        "Number of values seen per group"
+        self._check()
+        total = np.bincount(self.codes, weights=self.weights,
+                            minlength=len(self.labels))
+        return pd.Series(total, index=self.labels)
+
+    def _check(self):
+        if self.labels is None:
+            raise ValueError('no values seen')
+
+    def _quantiles(self, q):
+        "``(groups, len(q))`` array of quantiles"
+        ngroups = len(self.labels)
+        weights = self.weights
+        total = np.bincount(self.codes, weights=weights, minlength=ngroups)
+        before = np.concatenate([[0], np.cumsum(total)[:-1]])
+        # interpolation knots at 0 based global ranks: the first and last
+        # rank of a run of one value, the center of mass of other centroids
+        rank = np.cumsum(weights) - weights
+        two = self.exact & (weights > 1)
+        reps = np.where(two, 2, 1)
+        codes = np.repeat(self.codes, reps)
+        means = np.repeat(self.means, reps)
+        pos = np.repeat(np.where(two, rank, rank + (weights - 1) / 2), reps)
+        second = np.cumsum(reps) - 1
+        pos[second[two]] += weights[two] - 1
+        first = np.searchsorted(codes, np.arange(ngroups), side='left')
+        last = np.searchsorted(codes, np.arange(ngroups), side='right') - 1
+        target = before[:, None] + np.asarray(q)[None, :] * (total - 1)[:,
+                                                                     None]
+        j = np.searchsorted(pos, target, side='right')
+        lo = np.clip(j - 1, first[:, None], last[:, None])
+        hi = np.clip(j, first[:, None], last[:, None])
+        span = pos[hi] - pos[lo]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            frac = np.where(span > 0, (target - pos[lo]) / span, 0.)
+        return means[lo] + (means[hi] - means[lo]) * np.clip(frac, 0, 1)
+
+    def quantile(self, q=.5):
+        """Quantile(s) ``q`` like ``Series.quantile`` (one group) or
+        ``groupby(...).quantile`` (grouped)"""
+        self._check()
+        scalar = np.ndim(q) == 0
+        qs = np.atleast_1d(np.asarray(q, dtype='float64'))
+        if ((qs < 0) | (qs > 1)).any():
+            raise ValueError('quantiles must be between 0 and 1')
+        found = self._quantiles(qs)
+        if not self.grouped:
+            return found[0, 0] if scalar else pd.Series(found[0], index=qs)
+        if scalar:
+            return pd.Series(found[:, 0], index=self.labels)
+        labels = self.labels
+        if not isinstance(labels, pd.MultiIndex):
+            labels = pd.MultiIndex.from_arrays([labels])
+        arrays = [labels.get_level_values(i).repeat(len(qs))
+                  for i in range(labels.nlevels)]
+        index = pd.MultiIndex.from_arrays(
+            arrays + [np.tile(qs, len(labels))],
+            names=list(labels.names) + [None])
+        return pd.Series(found.ravel(), index=index)
+
+
+def merge_all(sketches):
+    "Merge sketches pairwise (a balanced tree) into one"
+    sketches = list(sketches)
+    if not sketches:
+        raise ValueError('no sketches to merge')
+    while len(sketches) > 1:
+        paired = [a.merge(b) for a, b in zip(sketches[::2], sketches[1::2])]
+        if len(sketches) % 2:
+            paired.append(sketches[-1])
+        sketches = paired
+    return sketches[0]
+
+
+def _sketch_part(values, codes, ngroups, delta):
+    return QuantileSketch(delta).update_codes(values, codes,
+                                              pd.RangeIndex(ngroups))
+
+
+def approx_quantile(values, q=.5, by=None, delta=200, error=None,
+                    processes=None):
+    """``values.quantile(q)`` or ``values.groupby(by).quantile(q)`` from a
+    ``QuantileSketch``.  ``by`` is a Series or list of Series aligned with
+    ``values``.  With ``processes`` > 1 the rows are split into that many
+    partitions, sketched in a process pool and merged."""
+    if error is not None:
+        delta = delta_for_error(error)
+    array = np.asarray(values, dtype='float64')
+    codes, labels = group_codes(by, len(array))
+    if processes is None or processes == 1:
+        sketch = QuantileSketch(delta).update_codes(array, codes, labels)
+    else:
+        # workers only see integer group codes, the labels stay here
+        bounds = np.linspace(0, len(array), processes + 1).astype('int64')
+        parts = [slice(lo, hi) for lo, hi in zip(bounds[:-1], bounds[1:])]
+        with ProcessPoolExecutor(processes) as pool:
+            sketch = merge_all(pool.map(
+                _sketch_part, [array[p] for p in parts],
+                [codes[p] for p in parts], [len(labels)] * processes,
+                [delta] * processes))
+        sketch.labels = labels.take(np.asarray(sketch.labels))
+    sketch.grouped = by is not None
+    found = sketch.quantile(q)
+    if isinstance(found, pd.Series):
+        found.name = getattr(values, 'name', None)
+    return found
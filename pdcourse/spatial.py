@@ -0,0 +1,110 @@
+"""Grid index for latitude/longitude box and date range queries.
+
+The filtering exercise builds full length masks::
+
+    nino[(nino.date.dt.year >= 1980) & (nino.date.dt.year < 1990) &
+         (nino.longitude > 120) & (nino.latitude > -2) & (nino.latitude < 2)]
+
+``GridIndex`` buckets the rows into lat/lon grid cells and sorts each cell
+by date, so the same question only touches the cells overlapping the box
+and, inside them, the rows in the date range::
+
+    grid = GridIndex(nino)
+    grid.select(lat=(-2, 2), lon=(120, None),
+                date=('1980-01-01', '1990-01-01'))
+
+Like ``lookup.FrameIndex`` rows come back in their original order.  The
+lat/lon bounds are exclusive and the date range is ``[start, end)``;
+``None`` leaves an end open.  Rows missing a coordinate or date are never
+returned.
+"""
+import numpy as np
+import pandas as pd
+
+
+def _concat_ranges(starts, stops):
+    "Concatenation of ``arange(start, stop)`` for each pair, vectorized"
+    lengths = np.maximum(stops - starts, 0)
+    total = lengths.sum()
+    if not total:
+        return np.array([], dtype='int64')
+    offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    return offsets + np.arange(total)
+
+
+class GridIndex:
+    def __init__(self, df, lat='latitude', lon='longitude', date='date',
+                 cell=1.0):
+        self.df = df
+        self.names = {'lat': lat, 'lon': lon, 'date': date}
+        self.cell = cell
+        lats = df[lat].to_numpy('float64')
+        lons = df[lon].to_numpy('float64')
+        dates = df[date].to_numpy('datetime64[ns]').view('int64')
+        valid = np.flatnonzero(~(np.isnan(lats) | np.isnan(lons) |
+                                 (dates == np.iinfo('int64').min)))
+        lats, lons, dates = lats[valid], lons[valid], dates[valid]
+        self.lat0 = lats.min() if len(lats) else 0.
+        self.lon0 = lons.min() if len(lons) else 0.
+        iy = self._cell_of(lats, self.lat0)
+        ix = self._cell_of(lons, self.lon0)
+        self.ny = iy.max() + 1 if len(iy) else 0
+        self.nx = ix.max() + 1 if len(ix) else 0
+        self.times, rank = np.unique(dates, return_inverse=True)
+        self.ntimes = len(self.times)
+        # one sort key: cell first, then date
+        key = (iy * self.nx + ix) * self.ntimes + rank.ravel()
+        order = np.argsort(key, kind='mergesort')
+        self.key = key[order]
+        self.order = valid[order]
+        self.lats = lats[order]
+        self.lons = lons[order]
+
+    def __repr__(self):
+        return '<GridIndex {} rows, {}x{} cells of {} degrees>'.format(
+            len(self.order), self.ny, self.nx, self.cell)
+
+    def _cell_of(self, values, origin):
+        return np.floor((values - origin) / self.cell).astype('int64')
+
+    def _cell_span(self, bounds, origin, n):
+        lo, hi = bounds if bounds is not None else (None, None)
+        first = 0 if lo is None else max(self._cell_of(lo, origin), 0)
+        last = n - 1 if hi is None else min(self._cell_of(hi, origin), n - 1)
+        return np.arange(first, last + 1)
+
+    def _time_span(self, bounds):
+        lo, hi = bounds if bounds is not None else (None, None)
+        start = 0 if lo is None else np.searchsorted(
+            self.times, pd.Timestamp(lo).value, side='left')
+        stop = self.ntimes if hi is None else np.searchsorted(
+            self.times, pd.Timestamp(hi).value, side='left')
+        return start, stop
+
+    def positions(self, lat=None, lon=None, date=None):
+        """Ascending row positions inside the ``lat``/``lon`` boxes (each a
+        ``(lo, hi)`` pair, exclusive) and ``date`` range ``[start, end)``"""
+        rows = self._cell_span(lat, self.lat0, self.ny)
+        cols = self._cell_span(lon, self.lon0, self.nx)
+        start, stop = self._time_span(date)
+        if not len(rows) or not len(cols) or start >= stop:
+            return np.array([], dtype='int64')
+        cells = (rows[:, None] * self.nx + cols[None, :]).ravel()
+        lo = np.searchsorted(self.key, cells * self.ntimes + start)
+        hi = np.searchsorted(self.key, cells * self.ntimes + stop)
+        hits = _concat_ranges(lo, hi)
+        # cells on the edge of the box can hold rows outside of it
+        keep = np.ones(len(hits), dtype=bool)
+        for values, bounds in ((self.lats, lat), (self.lons, lon)):
+            if bounds is None:
+                continue
+            found = values[hits]
+            if bounds[0] is not None:
+                keep &= found > bounds[0]
+            if bounds[1] is not None:
+                keep &= found < bounds[1]
+        return np.sort(self.order[hits[keep]])
+
+    def select(self, lat=None, lon=None, date=None):
+        "Rows of the frame matching ``positions``"
+        return self.df.iloc[self.positions(lat, lon, date)]
@@ -0,0 +1,256 @@
+"""Chunked reading and incremental group aggregation.
+
+For buoy archives too big to load at once::
+
+    agg = GroupAgg(by=lambda df: df.date.dt.year, column='air_temp')
+    for chunk in iter_nino('big.dat.gz', chunksize=200_000):
+        agg.update(chunk)
+    agg.result(['mean', 'max', 'size'])
+
+gives the same answer as
+``nino.groupby(nino.date.dt.year).air_temp.agg(['mean', 'max', 'size'])``
+while holding only one chunk (plus one row per group) in memory.  The
+zipped vehicles CSV streams the same way, quantiles come from a mergeable
+``sketch.QuantileSketch`` and ``unstack`` lays the result out like the
+05_grouping_pivoting_revisited cells::
+
+    stream_groupby(iter_autos(usecols=['year', 'make', 'drive', 'city08']),
+                   ['year', 'make', 'drive'], 'city08', 'mean',
+                   unstack=['drive', 'make'])
+    stream_groupby(iter_autos(), ['year', 'make'], 'city08', .7,
+                   unstack='make')
+"""
+import numpy as np
+import pandas as pd
+
+from .load import AUTOS_PATH, NINO_PATH, fix_nino_dates, nino_csv_kwargs
+from .sketch import QuantileSketch
+from .tweak import tweak_nino
+
+
+def iter_nino(path=NINO_PATH, chunksize=100_000, tweak=True):
+    """Yield typed chunks of a TAO file, run through ``tweak_nino`` unless
+    ``tweak`` is false.  Chunks keep their row positions in the file as
+    index."""
+    with pd.read_csv(path, **nino_csv_kwargs(chunksize=chunksize)) as reader:
+        for chunk in reader:
+            chunk = fix_nino_dates(chunk)
+            if tweak:
+                chunk = tweak_nino(chunk)
+            yield chunk
+
+
+def iter_autos(path=AUTOS_PATH, chunksize=100_000, usecols=None, **kwargs):
+    """Yield chunks of the vehicles CSV (zipped or not), only ``usecols``
+    if given, without reading the whole file"""
+    kwargs.setdefault('low_memory', False)
+    with pd.read_csv(path, chunksize=chunksize, usecols=usecols,
+                     **kwargs) as reader:
+        yield from reader
+
+
+STATS = ['count', 'sum', 'mean', 'var', 'std', 'min', 'max', 'size']
+
+
+def finish_moments(stat, parts):
+    """Compute ``stat`` (one of ``STATS``) from partial aggregates.
+    ``parts`` maps count/sum/sumsq/min/max/size to Series or DataFrames"""
+    if stat in ('count', 'sum', 'min', 'max', 'size'):
+        return parts[stat]
+    count = parts['count'].where(parts['count'] > 0)
+    if stat == 'mean':
+        return parts['sum'] / count
+    var = ((parts['sumsq'] - parts['sum'] ** 2 / count) / (count - 1))
+    var = var.clip(lower=0)
+    if stat == 'var':
+        return var
+    if stat == 'std':
+        return np.sqrt(var)
+    raise ValueError('unknown stat {!r}'.format(stat))
+
+
+# how partial aggregates of the same group are folded together
+FOLD = {'count': 'sum', 'sum': 'sum', 'sumsq': 'sum', 'min': 'min',
+        'max': 'max', 'size': 'sum', 'nonzero': 'sum'}
+
+
+def group_keys(chunk, by):
+    "Keys for ``chunk.groupby``: ``by`` is a name, list of names or function"
+    if callable(by):
+        return by(chunk)
+    if isinstance(by, (list, tuple)):
+        return [chunk[name] for name in by]
+    return chunk[by]
+
+
+def is_quantile(agg):
+    "Aggregations given as a number are quantiles"
+    return isinstance(agg, (float, int)) and not isinstance(agg, bool)
+
+
+def fold_parts(frames):
+    """Combine partial aggregate frames (indexed by group, columns named
+    by stat or (stat, column)) into one row per group"""
+    both = pd.concat(frames)
+    levels = list(range(both.index.nlevels))
+    out = {}
+    for i, col in enumerate(both.columns):
+        stat = col[0] if isinstance(col, tuple) else col
+        grouped = both.iloc[:, i].groupby(level=levels)
+        out[col] = getattr(grouped, FOLD[stat])()
+    return pd.DataFrame(out, columns=both.columns)
+
+
+class GroupAgg:
+    """Mergeable running group aggregation of one column.
+
+    Keeps count/sum/sum of squares/min/max/size per group, enough for
+    ``count``, ``sum``, ``mean``, ``std``, ``var``, ``min``, ``max`` and
+    ``size``.  With ``sketch`` it also keeps a ``QuantileSketch`` (of
+    ``delta`` centroids per group) and a number ``q`` in the aggregations
+    asks for that quantile.  ``by`` is a column name, a list of names or a
+    function of a chunk returning the group keys.
+    """
+    def __init__(self, by, column, sketch=False, delta=200):
+        self.by = by
+        self.column = column
+        self.parts = None
+        self.sketch = QuantileSketch(delta) if sketch else None
+
+    def update(self, chunk):
+        values = chunk[self.column]
+        keys = group_keys(chunk, self.by)
+        if self.sketch is not None:
+            self.sketch.update(values, keys)
+        grouped = (pd.DataFrame({'value': values,
+                                 'sq': values * values})
+                   .groupby(keys))
+        parts = pd.DataFrame({
+            'count': grouped.value.count(),
+            'sum': grouped.value.sum(),
+            'sumsq': grouped.sq.sum(),
+            'min': grouped.value.min(),
+            'max': grouped.value.max(),
+            'size': grouped.size(),
+        })
+        self._combine(parts)
+        return self
+
+    def merge(self, other):
+        "Fold the partial results of ``other`` into this one"
+        if other.parts is not None:
+            self._combine(other.parts)
+        if self.sketch is not None and other.sketch is not None:
+            self.sketch.merge(other.sketch)
+        return self
+
+    def _combine(self, parts):
+        if self.parts is None:
+            self.parts = parts
+        else:
+            self.parts = fold_parts([self.parts, parts])
+
+    def _quantile(self, sketch, q):
+        if sketch is None:
+            raise ValueError('quantiles need sketch=True')
+        return sketch.quantile(q).reindex(self.parts.index)
+
+    def _finish(self, name):
+        if is_quantile(name):
+            return self._quantile(self.sketch, name)
+        return finish_moments(name, self.parts)
+
+    def result(self, aggs=('mean',)):
+        """Finished aggregates, a Series for a single agg name (or
+        quantile) or a DataFrame with one column per name"""
+        if self.parts is None:
+            raise ValueError('no chunks seen')
+        if isinstance(aggs, str) or is_quantile(aggs):
+            return self._finish(aggs).rename(self.column)
+        return pd.DataFrame({name: self._finish(name) for name in aggs})
+
+
+class PivotAgg(GroupAgg):
+    """Mergeable running ``pivot_table`` over several ``values`` columns.
+
+    Besides the ``STATS`` it supports ``count_nonzero`` (like
+    ``np.count_nonzero``, NaN counts as non zero).  ``result`` returns the
+    frame ``pivot_table(index=by, values=values, aggfunc=aggs)`` would: one
+    column per value for a single agg name (the default ``'mean'``), with
+    plain agg names on an outer column level for a list of them.
+    """
+    def __init__(self, by, values, sketch=False, delta=200):
+        values = [values] if isinstance(values, str) else list(values)
+        super().__init__(by, values)
+        self.values = values
+        self.sketches = ({col: QuantileSketch(delta) for col in values}
+                         if sketch else None)
+
+    def update(self, chunk):
+        values = chunk[self.values].astype('float64')
+        keys = group_keys(chunk, self.by)
+        if self.sketches is not None:
+            for col in self.values:
+                self.sketches[col].update(values[col], keys)
+        grouped = values.groupby(keys)
+        stats = {
+            'count': grouped.count(),
+            'sum': grouped.sum(),
+            'sumsq': (values * values).groupby(keys).sum(),
+            'min': grouped.min(),
+            'max': grouped.max(),
+            'nonzero': (values != 0).groupby(keys).sum(),
+        }
+        size = grouped.size()
+        parts = pd.concat(stats, axis=1)
+        parts[('size', '')] = size
+        self._combine(parts)
+        return self
+
+    def merge(self, other):
+        if other.parts is not None:
+            self._combine(other.parts)
+        if self.sketches is not None and other.sketches is not None:
+            for col in self.values:
+                self.sketches[col].merge(other.sketches[col])
+        return self
+
+    def _stat(self, name):
+        if is_quantile(name):
+            sketches = self.sketches or {}
+            return pd.DataFrame({col: self._quantile(sketches.get(col),
+                                                     name)
+                                 for col in self.values})
+        if name == 'count_nonzero':
+            return self.parts['nonzero']
+        if name == 'size':
+            size = self.parts[('size', '')]
+            return pd.DataFrame({col: size for col in self.values})
+        parts = {stat: self.parts[stat] for stat in FOLD
+                 if stat not in ('size', 'nonzero')}
+        return finish_moments(name, parts)
+
+    def result(self, aggs='mean'):
+        if self.parts is None:
+            raise ValueError('no chunks seen')
+        # pivot_table sorts the value columns
+        values = sorted(self.values)
+        if isinstance(aggs, str) or is_quantile(aggs):
+            return self._stat(aggs)[values]
+        return pd.concat({name: self._stat(name)[values] for name in aggs},
+                         axis=1)
+
+
+def stream_groupby(chunks, by, column, aggs=('mean',), unstack=(),
+                   delta=200):
+    """Aggregate ``column`` grouped by ``by`` over an iterable of chunks,
+    then ``unstack`` the given index levels in order"""
+    listed = [aggs] if isinstance(aggs, str) or is_quantile(aggs) else aggs
+    agg = GroupAgg(by, column, sketch=any(map(is_quantile, listed)),
+                   delta=delta)
+    for chunk in chunks:
+        agg.update(chunk)
+    result = agg.result(aggs)
+    for level in [unstack] if isinstance(unstack, str) else unstack:
+        result = result.unstack(level)
+    return result
@@ -0,0 +1,153 @@
+"""Grid search with time ordered cross validation for the random forests.
+
+04_machine_learning fits one default ``RandomForestRegressor`` on a single
+shuffled ``train_test_split``.  ``run_grid`` scores every combination of
+forest parameters on expanding window folds (train on the past, test on
+the block that follows) and fans the fits out over a process pool::
+
+    from pdcourse.features import nyc_features
+    from pdcourse.tuning import run_grid
+    X, y = nyc_features(nyc, fill_value=0)
+    run_grid(X, y, {'n_estimators': [50, 100], 'max_depth': [None, 10]},
+             time=nyc.EST[X.index])
+
+The feature matrix and target are copied once into shared memory and the
+workers map them instead of receiving a pickled copy per task.  Needs
+scikit-learn.
+"""
+import itertools
+import os
+import sys
+import time as _time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.metrics import r2_score
+
+try:
+    import resource
+except ImportError:  # windows
+    resource = None
+
+
+def param_grid(grid):
+    "List of parameter dicts for every combination in ``grid``"
+    names = sorted(grid)
+    return [dict(zip(names, values))
+            for values in itertools.product(*(grid[n] for n in names))]
+
+
+def time_folds(n, n_splits=5, time=None, min_train=None):
+    """Expanding window ``(train, test)`` position arrays.
+
+    Rows are ordered by ``time`` (row order if None) and split into
+    ``n_splits + 1`` blocks, fold ``i`` trains on blocks ``0..i`` and tests
+    on block ``i + 1``, so no fold sees the future.
+    """
+    if time is None:
+        order = np.arange(n)
+    else:
+        order = np.argsort(np.asarray(time), kind='mergesort')
+    bounds = np.linspace(0, n, n_splits + 2).astype('int64')
+    if min_train is not None:
+        bounds[1] = max(bounds[1], min_train)
+    return [(order[:bounds[i + 1]], order[bounds[i + 1]:bounds[i + 2]])
+            for i in range(n_splits)]
+
+
+def peak_rss_mb():
+    "Peak resident set size of this process in MB (None if unknown)"
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, kilobytes elsewhere
+    return peak / 2**20 if sys.platform == 'darwin' else peak / 2**10
+
+
+class SharedArray:
+    "A numpy array copied into a named shared memory block"
+    def __init__(self, array):
+        array = np.ascontiguousarray(array)
+        self.shm = shared_memory.SharedMemory(create=True,
+                                              size=max(array.nbytes, 1))
+        self.spec = (self.shm.name, array.shape, array.dtype.str)
+        np.ndarray(array.shape, array.dtype, buffer=self.shm.buf)[...] = array
+
+    def release(self):
+        self.shm.close()
+        self.shm.unlink()
+
+
+_worker = {}
+
+
+def _attach(X_spec, y_spec):
+    for key, (name, shape, dtype) in (('X', X_spec), ('y', y_spec)):
+        shm = shared_memory.SharedMemory(name=name)
+        _worker[key + '_shm'] = shm
+        _worker[key] = np.ndarray(shape, np.dtype(dtype), buffer=shm.buf)
+
+
+def _fit_fold(params, train, test, seed):
+    X, y = _worker['X'], _worker['y']
+    start = _time.perf_counter()
+    model = RandomForestRegressor(random_state=seed, n_jobs=1, **params)
+    model.fit(X[train], y[train])
+    score = r2_score(y[test], model.predict(X[test]))
+    return score, _time.perf_counter() - start, peak_rss_mb(), _time.time()
+
+
+def run_grid(X, y, grid, time=None, n_splits=5, processes=None, seed=42):
+    """Score every parameter combination in ``grid`` on ``time_folds``.
+
+    Returns one row per combination with the parameters, mean/std/per fold
+    R², the summed fit time, the wall time from the start of the run until
+    its last fold finished and the peak RSS (MB) of the workers that ran
+    it.
+    """
+    X = np.asarray(X, dtype='float32')
+    y = np.asarray(y, dtype='float64')
+    folds = time_folds(len(y), n_splits, time)
+    configs = param_grid(grid) if isinstance(grid, dict) else list(grid)
+    shared = [SharedArray(X), SharedArray(y)]
+    specs = (shared[0].spec, shared[1].spec)
+    tasks = [(params, train, test, seed)
+             for params in configs for train, test in folds]
+    pool = None
+    try:
+        started = _time.time()
+        if processes == 1:
+            _attach(*specs)
+            done = [_fit_fold(*task) for task in tasks]
+        else:
+            pool = ProcessPoolExecutor(processes or os.cpu_count(),
+                                       initializer=_attach, initargs=specs)
+            jobs = [pool.submit(_fit_fold, *task) for task in tasks]
+            done = [job.result() for job in jobs]
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        # drop the array views before closing the blocks they point into
+        attached = [_worker.get(name) for name in ('X_shm', 'y_shm')]
+        _worker.clear()
+        for shm in filter(None, attached):
+            shm.close()
+        for arr in shared:
+            arr.release()
+    results = []
+    for i, params in enumerate(configs):
+        fold_done = done[i * len(folds):(i + 1) * len(folds)]
+        scores = [d[0] for d in fold_done]
+        rss = [d[2] for d in fold_done if d[2] is not None]
+        results.append(dict(
+            params,
+            r2_mean=np.mean(scores), r2_std=np.std(scores), r2_folds=scores,
+            fit_seconds=sum(d[1] for d in fold_done),
+            wall_seconds=max(d[3] for d in fold_done) - started,
+            peak_rss_mb=max(rss) if rss else None))
+    return (pd.DataFrame(results)
+            .sort_values('r2_mean', ascending=False)
+            .reset_index(drop=True))
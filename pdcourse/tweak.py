@@ -0,0 +1,179 @@
+"""The ``tweak_nyc``/``tweak_nino`` cleanups from the notebooks.
+
+In the notebooks these are chains like::
+
+    (df_
+     .rename(columns=fix_col)
+     .assign(...)
+     .drop(columns=...))
+
+where every step builds a new DataFrame.  Here the chain is described by a
+``Pipeline`` (rename, then assignments in order, then drops).  Running it
+collects the input columns into a dict, evaluates the assignments against
+that dict and builds the result frame once at the end.
+
+A pipeline can also be asked for only some of its ``outputs``: it works out
+which input columns those need (by watching the assignments run on a few
+sample rows), so loaders can skip parsing the rest::
+
+    tweak_nyc.requires(['PrecipitationCm'], sample)   # ['PrecipitationIn']
+    tweak_nyc.run(df, outputs=['PrecipitationCm'])
+"""
+import pandas as pd
+
+from .dates import yymmdd_to_datetime
+
+
+def fix_col(colname):
+    return colname.strip().replace(' ', '_')
+
+
+def fix_nino_col(name):
+    return name.rstrip('.').replace('.', '_').replace(' ', '_')
+
+
+class Columns:
+    """Read-only view of the columns of a pipeline in progress.  Supports
+    ``cols.name`` and ``cols['name']`` like a DataFrame does in an
+    ``.assign`` lambda."""
+    def __init__(self, data):
+        self._data = data
+
+    def __getitem__(self, name):
+        return self._data[name]
+
+    def __getattr__(self, name):
+        try:
+            return self._data[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __contains__(self, name):
+        return name in self._data
+
+
+class _Recorder(Columns):
+    "``Columns`` noting every name looked up"
+    def __init__(self, data):
+        super().__init__(data)
+        self.seen = set()
+
+    def __getitem__(self, name):
+        self.seen.add(name)
+        return super().__getitem__(name)
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        self.seen.add(name)
+        return super().__getattr__(name)
+
+
+class Pipeline:
+    """Declarative ``.rename(columns=...).assign(...).drop(columns=...)``.
+
+    ``assign`` is a list of ``(name, func)`` pairs, each ``func`` is called
+    with a ``Columns`` of everything renamed/assigned so far, so later
+    assignments see earlier ones (just like ``DataFrame.assign``).
+    """
+    def __init__(self, name, rename=None, assign=(), drop=()):
+        self.name = name
+        self.rename = rename
+        self.assign = list(assign)
+        self.drop = list(drop)
+
+    def __repr__(self):
+        return '<Pipeline {} assign={} drop={}>'.format(
+            self.name, [name for name, _ in self.assign], self.drop)
+
+    def _rename(self, name):
+        if self.rename is None:
+            return name
+        if callable(self.rename):
+            return self.rename(name)
+        return self.rename.get(name, name)
+
+    def _trace(self, sample):
+        """Names each assignment reads, None for those that can't run on
+        the columns of ``sample``"""
+        data = {self._rename(name): sample[name] for name in sample.columns}
+        reads = []
+        for name, func in self.assign:
+            cols = _Recorder(data)
+            try:
+                data[name] = func(cols)
+            except (KeyError, AttributeError):
+                reads.append(None)
+                continue
+            reads.append(cols.seen)
+        return reads
+
+    def _plan(self, outputs, sample):
+        "Renamed inputs and assignment positions needed for ``outputs``"
+        reads = self._trace(sample)
+        made = {self._rename(name) for name in sample.columns}
+        made |= {name for (name, _), r in zip(self.assign, reads)
+                 if r is not None}
+        missing = [name for name in outputs
+                   if name not in made or name in self.drop]
+        if missing:
+            raise KeyError('{} cannot make {}'.format(self, missing))
+        needed, use = set(outputs), set()
+        for i in reversed(range(len(self.assign))):
+            name = self.assign[i][0]
+            if name in needed:
+                use.add(i)
+                needed.discard(name)
+                needed |= reads[i]
+        return needed, use
+
+    def requires(self, outputs, sample):
+        """Columns of ``sample`` (a few raw rows) needed to make
+        ``outputs``, in ``sample`` order"""
+        needed, _ = self._plan(outputs, sample)
+        return [name for name in sample.columns
+                if self._rename(name) in needed]
+
+    def run(self, df, outputs=None):
+        """Apply the pipeline to ``df``.  With ``outputs`` only make those
+        columns, ``df`` need only hold their inputs."""
+        data = {self._rename(name): df[name] for name in df.columns}
+        cols = Columns(data)
+        if outputs is None:
+            use = range(len(self.assign))
+        else:
+            _, use = self._plan(outputs, df.head())
+        for i, (name, func) in enumerate(self.assign):
+            if i in use:
+                data[name] = func(cols)
+        for name in self.drop:
+            data.pop(name, None)
+        if outputs is not None:
+            data = {name: data[name] for name in data if name in outputs}
+        return pd.DataFrame(data, index=df.index, copy=False)
+
+    def __call__(self, df, outputs=None):
+        return self.run(df, outputs)
+
+
+tweak_nyc = Pipeline(
+    'nyc',
+    rename=fix_col,
+    assign=[
+        ('PrecipitationIn',
+         lambda c: pd.to_numeric(c.PrecipitationIn.replace('T', '0.001'))),
+        ('Events', lambda c: c.Events.fillna('')),
+        ('PrecipitationCm', lambda c: c.PrecipitationIn * 2.54),
+    ])
+
+
+tweak_nino = Pipeline(
+    'nino',
+    rename=fix_nino_col,
+    assign=[
+        ('air_temp_F', lambda c: c.air_temp*9/5+32),
+        ('zon_winds_mph', lambda c: c.zon_winds / 2.237),
+        ('mer_winds_mph', lambda c: c.mer_winds / 2.237),
+        ('date', lambda c: yymmdd_to_datetime(c.date)),
+    ],
+    drop=['obs'])
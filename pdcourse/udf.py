@@ -0,0 +1,273 @@
+"""Run simple elementwise Python functions at array speed.
+
+The notebooks time ``nyc.PrecipitationIn.map(to_cm)`` against
+``nyc.PrecipitationIn * 2.54`` and filter with ``nino.year.apply(lt1990)``.
+``vectorize`` takes such a function and, where it can, rewrites it into
+NumPy calls that take whole arrays::
+
+    def lt1990(v):
+        return v >= 1980 and v < 1990
+
+    fast = vectorize(lt1990)
+    nino[fast(nino.year)]          # same as nino[nino.year.apply(lt1990)]
+    vectorize(to_cm)(nyc2)         # like nyc2.map(to_cm), column by column
+
+The rewrite turns ``and``/``or``/``not`` into ``np.logical_*``, chained
+comparisons into ``&``, ``x if c else y`` and ``if``/``return`` into
+``np.where``, ``math.*`` into ``np.*`` and ``abs``, one argument ``round``
+and two argument ``min``/``max`` into their ufuncs (``round(v, 1)`` is left
+alone, Python rounds the decimal value and ``np.round`` does not).  The
+rewritten function is checked against the original on a sample of the
+values before it is trusted.
+
+Functions that can't be rewritten (string methods, say), and object or
+categorical columns, fall back to calling the function once per distinct
+value and spreading the results, so ``vectorize(type)(nyc.Events)`` calls
+``type`` a handful of times instead of once per row.  Like ``Series.map``
+the function sees ``Timestamp``s for datetime columns.  ``.mode`` tells
+which path was used last.
+"""
+import ast
+import inspect
+import math
+import textwrap
+
+import numpy as np
+import pandas as pd
+
+_NP = '__np'
+
+# math module and builtin names with a NumPy equivalent
+MATH = {name: name for name in (
+    'sqrt', 'exp', 'log', 'log10', 'log2', 'log1p', 'expm1', 'sin', 'cos',
+    'tan', 'arcsin', 'arccos', 'arctan', 'sinh', 'cosh', 'tanh', 'floor',
+    'ceil', 'trunc', 'isnan', 'isinf', 'isfinite', 'hypot', 'degrees',
+    'radians', 'copysign', 'fabs')}
+MATH.update(asin='arcsin', acos='arccos', atan='arctan', atan2='arctan2',
+            pow='power')
+BUILTINS = {'abs': 'abs'}
+PAIRWISE = {'min': 'minimum', 'max': 'maximum'}
+
+
+def _np(attr):
+    return ast.Attribute(value=ast.Name(id=_NP, ctx=ast.Load()), attr=attr,
+                         ctx=ast.Load())
+
+
+def _call(attr, *args):
+    return ast.Call(func=_np(attr), args=list(args), keywords=[])
+
+
+def _fold(attr, values):
+    out = values[0]
+    for value in values[1:]:
+        out = _call(attr, out, value)
+    return out
+
+
+class _Rewrite(ast.NodeTransformer):
+    "Python scalar expressions to NumPy array expressions"
+    def __init__(self, math_names):
+        self.math_names = math_names
+
+    def visit_BoolOp(self, node):
+        self.generic_visit(node)
+        attr = 'logical_and' if isinstance(node.op, ast.And) else \
+            'logical_or'
+        return _fold(attr, node.values)
+
+    def visit_UnaryOp(self, node):
+        self.generic_visit(node)
+        if isinstance(node.op, ast.Not):
+            return _call('logical_not', node.operand)
+        return node
+
+    def visit_Compare(self, node):
+        self.generic_visit(node)
+        if any(isinstance(op, (ast.In, ast.NotIn, ast.Is, ast.IsNot))
+               for op in node.ops):
+            raise ValueError('membership/identity tests are not elementwise')
+        if len(node.ops) == 1:
+            return node
+        lefts = [node.left] + node.comparators[:-1]
+        parts = [ast.Compare(left=left, ops=[op], comparators=[right])
+                 for left, op, right in zip(lefts, node.ops,
+                                            node.comparators)]
+        return _fold('logical_and', parts)
+
+    def visit_IfExp(self, node):
+        self.generic_visit(node)
+        return _call('where', node.test, node.body, node.orelse)
+
+    def visit_Call(self, node):
+        self.generic_visit(node)
+        func = node.func
+        if node.keywords:
+            return node
+        if (isinstance(func, ast.Attribute) and
+                isinstance(func.value, ast.Name) and
+                func.value.id in self.math_names and func.attr in MATH):
+            return _call(MATH[func.attr], *node.args)
+        if isinstance(func, ast.Name):
+            if func.id in BUILTINS:
+                return _call(BUILTINS[func.id], *node.args)
+            if func.id == 'round' and len(node.args) == 1:
+                return _call('round', *node.args)
+            if func.id in PAIRWISE and len(node.args) == 2:
+                return _call(PAIRWISE[func.id], *node.args)
+        return node
+
+
+def _branch(body, rest):
+    "The value of an if branch, ``rest`` if it falls through"
+    head, value = _returns(body, rest)
+    if head:
+        raise ValueError('statements inside if branches')
+    return value
+
+
+def _returns(body, rest=None):
+    """Collapse the ``if``/``return`` statements at the end of ``body``
+    into one ``np.where`` expression, ``rest`` being the value when the
+    end is reached without a return"""
+    head, value = list(body), rest
+    while head and isinstance(head[-1], (ast.Return, ast.If)):
+        last = head.pop()
+        if isinstance(last, ast.Return):
+            value = last.value
+        else:
+            value = _call('where', last.test, _branch(last.body, value),
+                          _branch(last.orelse, value))
+    if value is None:
+        raise ValueError('function must end in return or if/return')
+    return head, value
+
+
+def _rewrite(func):
+    "Array version of ``func`` with a NumPy body, or raise ValueError"
+    try:
+        source = textwrap.dedent(inspect.getsource(func))
+    except (OSError, TypeError):
+        raise ValueError('no source for {!r}'.format(func))
+    tree = ast.parse(source)
+    node = tree.body[0]
+    if isinstance(node, ast.Assign) and isinstance(node.value, ast.Lambda):
+        node = node.value
+    elif isinstance(node, ast.Expr):
+        node = node.value
+    lambdas = [n for n in ast.walk(node) if isinstance(n, ast.Lambda)]
+    if isinstance(node, ast.FunctionDef):
+        args = node.args
+        head, value = _returns(node.body)
+        if not all(isinstance(stmt, ast.Assign) for stmt in head):
+            raise ValueError('only assignments before the return')
+    elif len(lambdas) == 1:
+        args, head, value = lambdas[0].args, [], lambdas[0].body
+    else:
+        raise ValueError('cannot find the function body')
+    if len(args.args) != 1 or args.vararg or args.kwarg:
+        raise ValueError('function must take one argument')
+    scope = dict(func.__globals__)
+    if func.__closure__:
+        scope.update(zip(func.__code__.co_freevars,
+                         (cell.cell_contents for cell in func.__closure__)))
+    math_names = {name for name, value in scope.items() if value is math}
+    body = head + [ast.Return(value=value)]
+    new = ast.FunctionDef(name='_vectorized', args=args, body=body,
+                          decorator_list=[], returns=None, type_params=[])
+    module = _Rewrite(math_names).visit(ast.Module(body=[new],
+                                                   type_ignores=[]))
+    ast.fix_missing_locations(module)
+    scope[_NP] = np
+    exec(compile(module, '<vectorize {}>'.format(func.__name__), 'exec'),
+         scope)
+    return scope['_vectorized']
+
+
+def _same(a, b):
+    a, b = np.asarray(a), np.asarray(b)
+    if a.shape != b.shape:
+        return False
+    try:
+        return bool(np.all((a == b) | (pd.isna(a) & pd.isna(b))))
+    except TypeError:
+        return False
+
+
+def _by_uniques(func, values):
+    "``func`` applied to each distinct value, spread back to every row"
+    codes, uniques = pd.factorize(values, use_na_sentinel=False)
+    results = pd.Series([func(u) for u in uniques])
+    return results.to_numpy().take(codes) if len(codes) else \
+        results.to_numpy()
+
+
+class vectorize:
+    """Elementwise ``func`` applied to whole Series, frames and arrays.
+
+    ``sample`` values are checked against plain calls of ``func`` before
+    the NumPy version is used on a column.
+    """
+    def __init__(self, func, sample=64):
+        self.func = func
+        self.sample = sample
+        try:
+            self.array_func = _rewrite(func)
+        except (ValueError, SyntaxError):
+            self.array_func = None
+        self.mode = None
+        self.__name__ = getattr(func, '__name__', 'udf')
+        self.__doc__ = func.__doc__
+
+    def __repr__(self):
+        return '<vectorize {} ({})>'.format(
+            self.__name__, 'numpy' if self.array_func else 'per value')
+
+    def _checked(self, values):
+        "The NumPy result for ``values`` if it agrees with ``func``"
+        if self.array_func is None or values.dtype.kind not in 'biufcmM':
+            return None
+        picks = np.unique(np.linspace(0, len(values) - 1,
+                                      min(self.sample, len(values)))
+                          .astype('int64'))
+        sample = values[picks]
+        try:
+            with np.errstate(all='ignore'):
+                # the scalars Series.map would pass (Timestamp, not
+                # np.datetime64)
+                expected = [self.func(v) for v in pd.Series(sample)]
+                got = self.array_func(sample)
+        except Exception:
+            return None
+        if not _same(np.broadcast_to(got, sample.shape), expected):
+            return None
+        with np.errstate(all='ignore'):
+            out = self.array_func(values)
+        return np.broadcast_to(out, values.shape).copy()
+
+    def _values(self, values, series=None):
+        "``series`` is the Series ``values`` came from, if any"
+        values = np.asarray(values)
+        out = self._checked(values) if len(values) else None
+        if out is not None:
+            self.mode = 'numpy'
+            return out
+        self.mode = 'per value'
+        return _by_uniques(self.func,
+                           pd.Series(values) if series is None else series)
+
+    def __call__(self, obj):
+        if isinstance(obj, pd.DataFrame):
+            return pd.DataFrame({name: self(obj[name]) for name in obj},
+                                index=obj.index)
+        if isinstance(obj, pd.Series):
+            if isinstance(obj.dtype, pd.CategoricalDtype) or \
+                    obj.dtype == object or obj.dtype == 'str':
+                self.mode = 'per value'
+                out = _by_uniques(self.func, obj)
+            else:
+                out = self._values(obj.to_numpy(), obj)
+            return pd.Series(out, index=obj.index, name=obj.name)
+        if np.ndim(obj) == 0:
+            return self.func(obj)
+        return self._values(obj)
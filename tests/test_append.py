@@ -0,0 +1,64 @@
+import pandas as pd
+import pytest
+
+from pdcourse.append import DailyTable, monthly_mean, year_month, \
+    year_month_pivot
+from pdcourse.load import NYC_PATH
+from pdcourse.tweak import tweak_nyc
+
+
+@pytest.fixture
+def lines():
+    with open(NYC_PATH, 'rb') as fin:
+        return fin.readlines()[:400]
+
+
+def expected(lines, path):
+    path.write_bytes(b''.join(lines))
+    nyc = tweak_nyc(pd.read_csv(path, parse_dates=[0]))
+    return nyc, year_month(nyc)
+
+
+def test_grows_with_the_file(lines, tmp_path):
+    path = tmp_path / 'nyc.csv'
+    path.write_bytes(b''.join(lines[:100]) + lines[100][:20])
+    table = DailyTable(path)
+    table.watch('cloud', monthly_mean('CloudCover'))
+    table.watch('humidity', year_month_pivot())
+    assert len(table) == 99
+    # the rest of the partial line and some more rows arrive
+    with open(path, 'ab') as fout:
+        fout.write(lines[100][20:] + b''.join(lines[101:]))
+    new = table.refresh()
+    assert len(new) == 300
+    assert table.refresh() is None
+
+    nyc, by = expected(lines, tmp_path / 'all.csv')
+    pd.testing.assert_frame_equal(table.frame, nyc)
+    pd.testing.assert_frame_equal(
+        table['humidity'].result(),
+        nyc.pivot_table(index=by, values=['Max_Humidity', 'Max_Dew_PointF']),
+        check_dtype=False)
+    pd.testing.assert_frame_equal(
+        table['humidity'].result(['mean', 'max']),
+        nyc.pivot_table(index=by, values=['Max_Humidity', 'Max_Dew_PointF'],
+                        aggfunc=['mean', 'max']),
+        check_dtype=False)
+    pd.testing.assert_series_equal(
+        table['cloud'].result('mean'),
+        nyc.groupby(by).CloudCover.mean(), check_dtype=False)
+
+
+def test_watch_late_and_append(lines, tmp_path):
+    path = tmp_path / 'nyc.csv'
+    path.write_bytes(b''.join(lines[:200]))
+    table = DailyTable(path)
+    # rows from elsewhere in the raw file format
+    raw = pd.read_csv(NYC_PATH, parse_dates=[0], skiprows=range(1, 200),
+                      nrows=200)
+    table.append(raw)
+    view = table.watch('humidity', year_month_pivot(['Max_Humidity']))
+    nyc, by = expected(lines, tmp_path / 'all.csv')
+    pd.testing.assert_frame_equal(
+        view.result(), nyc.pivot_table(index=by, values=['Max_Humidity']),
+        check_dtype=False)
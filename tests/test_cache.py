@@ -0,0 +1,91 @@
+import os
+
+import pandas as pd
+import pytest
+
+from pdcourse.cache import (_read_meta, add_columns, cached_frame, entry_dir,
+                            read_frame)
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / 'data.csv'
+    pd.DataFrame({
+        'n': [1, 2, 3, 4],
+        'x': [.5, None, 2.25, 3.],
+        'when': ['2000-01-01', '2000-01-02', None, '2000-01-04'],
+        'text': ['a', None, 'b', 'a'],
+    }).to_csv(path, index=False)
+    return path
+
+
+class Build:
+    "``pd.read_csv`` counting its calls and the columns asked for"
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, path, columns=None):
+        self.calls.append(columns)
+        df = pd.read_csv(path, usecols=columns, parse_dates=[
+            name for name in ['when'] if columns is None or name in columns])
+        return df if columns is None else df[columns]
+
+
+def test_roundtrip(source, tmp_path):
+    build = Build()
+    first = cached_frame(source, build, cache_dir=tmp_path / 'cache')
+    again = cached_frame(source, build, cache_dir=tmp_path / 'cache')
+    pd.testing.assert_frame_equal(first, Build()(source))
+    pd.testing.assert_frame_equal(again, first)
+    assert build.calls == [None]
+
+
+def test_freshness(source, tmp_path):
+    build = Build()
+    cache = tmp_path / 'cache'
+    cached_frame(source, build, cache_dir=cache)
+    # a new mtime with the same bytes is still fresh
+    st = os.stat(source)
+    os.utime(source, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    cached_frame(source, build, cache_dir=cache)
+    assert build.calls == [None]
+    # new contents are not
+    source.write_text(source.read_text().replace('2.25', '9.5'))
+    df = cached_frame(source, build, cache_dir=cache)
+    assert build.calls == [None, None]
+    assert df.x[2] == 9.5
+    # nor is a new build version
+    cached_frame(source, build, cache_dir=cache, version=1)
+    assert len(build.calls) == 3
+
+
+def test_columns_grow(source, tmp_path):
+    build = Build()
+    cache = tmp_path / 'cache'
+    full = Build()(source)
+    got = cached_frame(source, build, cache_dir=cache, columns=['x'])
+    pd.testing.assert_frame_equal(got, full[['x']])
+    got = cached_frame(source, build, cache_dir=cache,
+                       columns=['text', 'x', 'when'])
+    pd.testing.assert_frame_equal(got, full[['text', 'x', 'when']])
+    assert build.calls == [['x'], ['text', 'when']]
+    got = cached_frame(source, build, cache_dir=cache, columns=['when', 'x'])
+    pd.testing.assert_frame_equal(got, full[['when', 'x']])
+    assert len(build.calls) == 2
+    # a partial entry doesn't answer for the whole frame
+    pd.testing.assert_frame_equal(
+        cached_frame(source, build, cache_dir=cache), full)
+
+
+def test_concurrent_add_columns(source, tmp_path):
+    cache = tmp_path / 'cache'
+    full = Build()(source)
+    cached_frame(source, Build(), cache_dir=cache, columns=['n'])
+    entry = entry_dir(source, 'raw', cache)
+    # two writers read the same meta.json, then each adds a column
+    meta_a, meta_b = _read_meta(entry), _read_meta(entry)
+    add_columns(entry, meta_a, full[['x']])
+    add_columns(entry, meta_b, full[['text']])
+    pd.testing.assert_frame_equal(
+        read_frame(entry, columns=['n', 'x', 'text']),
+        full[['n', 'x', 'text']])
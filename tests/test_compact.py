@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+
+from pdcourse.compact import compact_frame, compact_series, memory_report
+
+
+def frame():
+    rng = np.random.default_rng(11)
+    n = 1000
+    return pd.DataFrame({
+        'small': rng.integers(0, 100, n),
+        'wide': rng.integers(-2**40, 2**40, n),
+        'temp': np.where(rng.random(n) < .1, np.nan,
+                         np.round(rng.normal(26, 2, n), 2)),
+        'precise': rng.normal(size=n),
+        'huge': np.full(n, 1e300),
+        'events': rng.choice(['', 'Rain', 'Fog'], n).astype(object),
+        'ids': np.array(['id{}'.format(i) for i in range(n)], dtype=object),
+        'flag': rng.random(n) < .5,
+    }, index=np.arange(n) * 2)
+
+
+def test_values_survive():
+    df = frame()
+    out = compact_frame(df)
+    assert out.small.dtype == 'int8'
+    assert out.wide.dtype == 'int64'
+    assert out.temp.dtype == 'float32'
+    assert out.precise.dtype == 'float64'
+    assert out.huge.dtype == 'float64'
+    assert isinstance(out.events.dtype, pd.CategoricalDtype)
+    assert out.ids.dtype == df.ids.dtype
+    assert out.flag.dtype == bool
+    pd.testing.assert_index_equal(out.index, df.index)
+    for name in ['small', 'wide', 'precise', 'huge', 'flag']:
+        pd.testing.assert_series_equal(out[name].astype(df[name].dtype),
+                                       df[name])
+    # float32 reads back as the same decimals
+    pd.testing.assert_series_equal(out.temp.astype('float64').round(2),
+                                   df.temp)
+    pd.testing.assert_series_equal(out.events.astype(df.events.dtype),
+                                   df.events)
+
+
+def test_forced_categories_and_report():
+    df = frame()
+    out = compact_frame(df, categories=['ids'])
+    assert isinstance(out.ids.dtype, pd.CategoricalDtype)
+    report = memory_report(df, out)
+    pd.testing.assert_series_equal(report.before.drop('Total'),
+                                   df.memory_usage(deep=True),
+                                   check_names=False)
+    # forcing unique ids into a categorical costs a little
+    assert (report.after <= report.before).drop('ids').all()
+    assert report.loc['Total', 'ratio'] < .8
+
+
+def test_no_categories():
+    ser = pd.Series(['a', 'b'] * 50, dtype=object)
+    assert compact_series(ser, category=False).dtype == ser.dtype
@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from pdcourse.dates import two_digit_year, ymd_to_datetime, \
+    yymmdd_to_datetime
+
+
+def test_every_day_matches_to_datetime():
+    days = pd.Series(pd.date_range('1700-01-01', '2260-12-31', freq='D'))
+    got = ymd_to_datetime(days.dt.year, days.dt.month, days.dt.day)
+    pd.testing.assert_series_equal(got, days.astype('datetime64[ns]'))
+
+
+def test_yymmdd_matches_format():
+    values = pd.Series([800307, 991231, 101, 681231, 690101, 960229],
+                       index=[5, 3, 1, 0, 2, 4], name='date')
+    got = yymmdd_to_datetime(values)
+    expected = pd.to_datetime(values.astype(str).str.zfill(6),
+                              format='%y%m%d')
+    pd.testing.assert_series_equal(got, expected.astype('datetime64[ns]'))
+
+
+def test_two_digit_year():
+    np.testing.assert_array_equal(two_digit_year([0, 68, 69, 99]),
+                                  [2000, 2068, 1969, 1999])
+    pd.testing.assert_series_equal(
+        two_digit_year(pd.Series([80, 10], name='year')),
+        pd.Series([1980, 2010], name='year'))
+
+
+@pytest.mark.parametrize('ymd', [(1999, 13, 1), (1999, 0, 1), (1999, 2, 29),
+                                 (2000, 2, 30), (2000, 4, 31), (2000, 1, 0)])
+def test_out_of_range_raises_like_pandas(ymd):
+    year, month, day = ([v] for v in ymd)
+    with pytest.raises(ValueError):
+        pd.to_datetime(pd.DataFrame({'year': year, 'month': month,
+                                     'day': day}))
+    with pytest.raises(ValueError):
+        ymd_to_datetime(year, month, day)
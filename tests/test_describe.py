@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from pdcourse.describe import Describe, describe, describe_chunks
+
+
+@pytest.fixture
+def df():
+    rng = np.random.default_rng(4)
+    n = 1001
+    return pd.DataFrame({
+        'x': rng.normal(size=n),
+        'gappy': np.where(rng.random(n) < .3, np.nan, rng.exponential(size=n)),
+        'count': rng.integers(0, 50, n),
+        'when': pd.Series(pd.date_range('2000', periods=n, freq='h')).where(
+            rng.random(n) < .95),
+        'kind': rng.choice(['a', 'b', 'c'], n),
+        'flag': rng.random(n) < .4,
+    })
+
+
+@pytest.mark.parametrize('threads', [1, 4])
+def test_numeric(df, threads):
+    pd.testing.assert_frame_equal(describe(df, threads=threads),
+                                  df.describe())
+
+
+def test_percentiles(df):
+    qs = [.05, .1, .9, .99]
+    pd.testing.assert_frame_equal(describe(df, percentiles=qs),
+                                  df.describe(percentiles=qs))
+
+
+def test_include(df):
+    pd.testing.assert_frame_equal(describe(df, include='all'),
+                                  df.describe(include='all'))
+    for include in ['str', ['number', 'datetime']]:
+        pd.testing.assert_frame_equal(describe(df, include=include),
+                                      df.describe(include=include))
+
+
+@pytest.mark.parametrize('dtype', ['datetime64[ns]', 'datetime64[s]',
+                                   'datetime64[us, US/Eastern]'])
+def test_datetime_units(df, dtype):
+    stamps = df.when.dt.tz_localize('UTC') if 'US' in dtype else df.when
+    when = stamps.astype(dtype).to_frame()
+    pd.testing.assert_frame_equal(describe(when), when.describe())
+    got = describe_chunks([when.iloc[:500], when.iloc[500:]])
+    assert got.loc['min', 'when'] == when.when.min()
+    assert got.loc['max', 'when'] == when.when.max()
+
+
+def test_streamed_moments_are_exact(df):
+    chunks = [df.iloc[i:i + 97] for i in range(0, len(df), 97)]
+    got = describe_chunks(chunks)
+    expected = df.describe()
+    for row in ['count', 'mean', 'std', 'min', 'max']:
+        pd.testing.assert_series_equal(got.loc[row, ['x', 'gappy', 'count']],
+                                       expected.loc[row, ['x', 'gappy',
+                                                          'count']],
+                                       check_dtype=False)
+    assert got.loc['mean', 'when'] - expected.loc['mean', 'when'] < \
+        pd.Timedelta('1ms')
+
+
+def test_streamed_quantiles_within_rank_error(df):
+    desc = Describe(percentiles=[.1, .5, .9])
+    for part in np.array_split(np.arange(len(df)), 7):
+        desc.merge(Describe(percentiles=[.1, .5, .9]).update(df.iloc[part]))
+    got = desc.result()
+    for name in ['x', 'gappy']:
+        values = df[name].dropna()
+        for q in [.1, .5, .9]:
+            found = got.loc['{:g}%'.format(q * 100), name]
+            assert values.quantile(q - .01) <= found <= values.quantile(
+                q + .01)
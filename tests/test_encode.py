@@ -0,0 +1,19 @@
+import numpy as np
+import pandas as pd
+
+from pdcourse.encode import EventsEncoder
+
+
+def test_stack_keeps_numeric_features_dense():
+    events = pd.Series(['Fog-Rain', None, 'Rain', 'Snow', 'Hail'])
+    X = pd.DataFrame({'a': [1., 2, 3, 4, 5], 'b': [0., 0, 1, 0, 2]})
+    enc = EventsEncoder().fit(events.iloc[:4])
+    out = enc.stack(X, events)
+    assert isinstance(out, np.ndarray)
+    assert enc.feature_names(X) == ['a', 'b', 'Events_Fog', 'Events_Rain',
+                                    'Events_Snow']
+    np.testing.assert_array_equal(out, [[1, 0, 1, 1, 0],
+                                        [2, 0, 0, 0, 0],
+                                        [3, 1, 0, 1, 0],
+                                        [4, 0, 0, 0, 1],
+                                        [5, 2, 0, 0, 0]])
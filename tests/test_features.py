@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from pdcourse.features import lag_features
+
+
+@pytest.fixture
+def readings():
+    rng = np.random.default_rng(0)
+    n = 400
+    df = pd.DataFrame({
+        'buoy': rng.integers(0, 4, n),
+        'date': pd.Timestamp('1990-01-01') +
+        pd.to_timedelta(rng.permutation(n), unit='D'),
+        'temp': rng.normal(25, 2, n).round(2),
+        'wind': rng.normal(0, 3, n),
+    })
+    df.loc[rng.choice(n, 30, replace=False), 'temp'] = np.nan
+    return df
+
+
+def test_features_known_at_t_predict_t_plus_horizon(readings):
+    X, y = lag_features(readings, 'temp', lags=[1, 3], windows=[4],
+                        date='date', group='buoy', horizon=2,
+                        calendar=False)
+    srt = readings.sort_values(['buoy', 'date'])
+    by = srt.groupby('buoy').temp
+    expected = pd.DataFrame({
+        'wind': srt.wind,
+        'temp': srt.temp,
+        'temp_lag1': by.shift(1),
+        'temp_lag3': by.shift(3),
+        'temp_mean4': by.transform(
+            lambda s: s.rolling(4, min_periods=1).mean()),
+    }).loc[X.index]
+    pd.testing.assert_frame_equal(X, expected.astype('float32'),
+                                  check_exact=False, rtol=1e-6)
+    pd.testing.assert_series_equal(y, by.shift(-2).loc[X.index],
+                                   check_names=False)
+    assert not X[['temp', 'temp_lag1', 'temp_lag3']].isna().any().any()
+    assert not y.isna().any()
+
+
+def test_rows_keep_original_order(readings):
+    X, _ = lag_features(readings, 'temp', date='date', group='buoy')
+    assert X.index.is_monotonic_increasing
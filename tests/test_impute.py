@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from pdcourse.impute import impute
+
+
+@pytest.fixture
+def readings():
+    "Two buoys, interleaved by date, with gaps, in shuffled row order"
+    rng = np.random.default_rng(1)
+    dates = pd.date_range('2000-01-01', periods=120, freq='D')
+    frames = []
+    for buoy in ('a', 'b'):
+        days = np.sort(rng.choice(len(dates), 80, replace=False))
+        value = rng.normal(size=80).cumsum()
+        value[rng.random(80) < .3] = np.nan
+        frames.append(pd.DataFrame({'buoy': buoy, 'date': dates[days],
+                                    'value': value}))
+    df = pd.concat(frames, ignore_index=True)
+    return df.sample(frac=1, random_state=2)
+
+
+def by_buoy(df, func):
+    "``func`` of each buoy's date sorted values, in ``df``'s row order"
+    ordered = df.sort_values(['buoy', 'date'])
+    filled = ordered.groupby('buoy', group_keys=False).value.apply(func)
+    return filled.reindex(df.index)
+
+
+def check(df, strategy, expected, **kwargs):
+    got = impute(df, {'value': strategy}, group='buoy', **kwargs)
+    pd.testing.assert_series_equal(got.value, expected)
+    pd.testing.assert_frame_equal(got.drop(columns='value'),
+                                  df.drop(columns='value'))
+
+
+def test_time(readings):
+    expected = by_buoy(readings, lambda s: s.set_axis(
+        readings.date[s.index]).interpolate(method='time',
+                                            limit_area='inside')
+        .set_axis(s.index))
+    check(readings, 'time', expected)
+
+
+def test_ffill_bfill(readings):
+    check(readings, 'ffill', by_buoy(readings, lambda s: s.ffill()))
+    check(readings, 'bfill', by_buoy(readings, lambda s: s.bfill()))
+
+
+def test_max_gap(readings):
+    ordered = readings.sort_values(['buoy', 'date'])
+    seen = ordered.date.where(ordered.value.notna())
+    last = seen.groupby(ordered.buoy).ffill()
+    ffilled = ordered.groupby('buoy').value.ffill()
+    expected = ffilled.where(ordered.date - last <= pd.Timedelta('3D'))
+    check(readings, 'ffill', expected.reindex(readings.index),
+          max_gap='3D')
+
+
+@pytest.mark.parametrize('stat', ['mean', 'median'])
+def test_group_stat(readings, stat):
+    expected = readings.value.fillna(
+        readings.groupby('buoy').value.transform(stat))
+    check(readings, stat, expected)
+
+
+def test_strategies_use_the_readings(readings):
+    got = impute(readings, {'value': ['ffill', 'mean']}, group='buoy')
+    expected = by_buoy(readings, lambda s: s.ffill()).fillna(
+        readings.groupby('buoy').value.transform('mean'))
+    pd.testing.assert_series_equal(got.value, expected)
+
+
+def test_rows_without_a_group_are_left_alone(readings):
+    df = readings.copy()
+    df.loc[df.index[:10], 'buoy'] = None
+    got = impute(df, {'value': 'mean'}, group='buoy')
+    pd.testing.assert_series_equal(got.value[:10], df.value[:10])
+    assert got.value[10:].notna().all()
+
+
+def test_seasonal(readings):
+    month = readings.date.dt.month
+    expected = readings.value.fillna(
+        readings.groupby(['buoy', month]).value.transform('mean'))
+    check(readings, 'seasonal', expected)
@@ -0,0 +1,68 @@
+import pandas as pd
+import pytest
+
+import pdcourse
+from pdcourse.lazy import scan
+
+
+@pytest.fixture(scope='module')
+def nyc():
+    return pdcourse.load_nyc()
+
+
+def check(lazy, eager):
+    got = lazy.collect() if isinstance(lazy, pdcourse.LazyFrame) else lazy
+    if isinstance(eager, pd.DataFrame):
+        pd.testing.assert_frame_equal(got, eager)
+    elif isinstance(eager, pd.Series):
+        pd.testing.assert_series_equal(got, eager)
+    else:
+        assert got == pytest.approx(eager)
+
+
+def test_projection_of_plain_names(nyc):
+    lazy = scan('nyc').set_index('EST').Mean_Humidity
+    assert lazy.columns() == ['EST', 'Mean_Humidity']
+    check(lazy.resample('ME').mean(),
+          nyc.set_index('EST').Mean_Humidity.resample('ME').mean())
+
+
+def test_lambda_reading_columns(nyc):
+    lazy = scan('nyc').assign(
+        x=lambda d: d.Max_TemperatureF - d['Min_TemperatureF'])[['EST', 'x']]
+    assert lazy.columns() == ['EST', 'Max_TemperatureF', 'Min_TemperatureF']
+    check(lazy, nyc.assign(
+        x=lambda d: d.Max_TemperatureF - d['Min_TemperatureF'])[['EST', 'x']])
+
+
+@pytest.mark.parametrize('chain', [
+    lambda df: df.assign(x=lambda d: d.select_dtypes('number').sum(axis=1)).x,
+    lambda df: df.assign(x=lambda d: d.Max_TemperatureF.pipe(abs))
+    .assign(y=lambda d: len(d.columns)).y,
+    lambda df: df.query('EST.dt.year > 2010').Mean_Humidity,
+    lambda df: df.assign(z=lambda d: 1).z,
+])
+def test_unknown_use_loads_everything(nyc, chain):
+    lazy = chain(scan('nyc'))
+    assert lazy.columns() is None
+    check(lazy, chain(nyc))
+
+
+def test_query_with_strings(nyc):
+    expr = 'Events == "Rain" and Max_TemperatureF > 80'
+    lazy = scan('nyc').query(expr).Mean_Humidity
+    assert lazy.columns() == ['Max_TemperatureF', 'Mean_Humidity', 'Events']
+    check(lazy, nyc.query(expr).Mean_Humidity)
+
+
+def test_grouper_key(nyc):
+    grouper = pd.Grouper(key='EST', freq='ME')
+    check(scan('nyc').groupby(grouper).Mean_Humidity.mean(),
+          nyc.groupby(grouper).Mean_Humidity.mean())
+
+
+def test_reduction_is_terminal():
+    got = scan('nino', chunksize=50_000).query('latitude > 0') \
+        .air_temp_F.mean()
+    nino = pdcourse.load_nino()
+    check(got, nino.query('latitude > 0').air_temp_F.mean())
@@ -0,0 +1,27 @@
+import gzip
+
+import pandas as pd
+
+from pdcourse.load import NINO_PATH, read_nino, read_nino_files
+
+
+def write_tao(path, lines):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with gzip.open(path, 'wt') as f:
+        f.writelines(lines)
+
+
+def test_read_nino_files_same_names(tmp_path):
+    with gzip.open(NINO_PATH, 'rt') as f:
+        lines = [next(f) for _ in range(30)]
+    write_tao(tmp_path / 'arch' / 'b1' / 'tao.dat.gz', lines[:10])
+    write_tao(tmp_path / 'arch' / 'b2' / 'tao.dat.gz', lines[10:])
+    write_tao(tmp_path / 'all.dat.gz', lines)
+    df = read_nino_files(tmp_path / 'arch' / '*' / 'tao.dat.gz',
+                         tweak=False, cache=False, processes=1, source=True)
+    assert list(df.source.cat.categories) == ['b1/tao.dat.gz',
+                                              'b2/tao.dat.gz']
+    assert df.source.value_counts().sort_index().tolist() == [10, 20]
+    pd.testing.assert_frame_equal(
+        df.drop(columns='source'),
+        read_nino(tmp_path / 'all.dat.gz', cache=False))
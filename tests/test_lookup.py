@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from pdcourse.lookup import FrameIndex, nyc_index
+
+
+@pytest.fixture
+def nyc():
+    rng = np.random.default_rng(9)
+    n = 2000
+    events = pd.Series(rng.choice(['', 'Fog', 'Rain', 'Fog-Rain', 'Snow'], n),
+                       dtype=object)
+    events[rng.random(n) < .05] = None
+    return pd.DataFrame({
+        'EST': pd.date_range('1997-01-01', periods=n, freq='D'),
+        'Events': events,
+        'Max_TemperatureF': rng.integers(0, 100, n).astype('float64'),
+    }, index=np.arange(n) * 3 + 1)
+
+
+def test_eq(nyc):
+    idx = nyc_index(nyc)
+    pd.testing.assert_frame_equal(idx.eq('Events', 'Fog'),
+                                  nyc[nyc.Events == 'Fog'])
+    pd.testing.assert_frame_equal(idx.eq('month', 12),
+                                  nyc[nyc.EST.dt.month == 12])
+    assert idx.eq('Events', 'Hail').empty
+
+
+@pytest.mark.parametrize('values', [
+    ['Fog'], ['Fog', 'Fog'], ['Rain', 'Fog', 'Rain'], [], ['Hail']])
+def test_isin(nyc, values):
+    idx = nyc_index(nyc)
+    pd.testing.assert_frame_equal(idx.isin('Events', values),
+                                  nyc[nyc.Events.isin(values)])
+
+
+@pytest.mark.parametrize('closed', ['left', 'right', 'both', 'neither'])
+def test_between(nyc, closed):
+    idx = FrameIndex(nyc)
+    got = idx.between('Max_TemperatureF', 20, 40, closed)
+    pd.testing.assert_frame_equal(
+        got, nyc[nyc.Max_TemperatureF.between(20, 40, inclusive=closed)])
+    pd.testing.assert_frame_equal(
+        idx.between('EST', '2000-02-01', '2000-03-01'),
+        nyc[(nyc.EST >= '2000-02-01') & (nyc.EST < '2000-03-01')])
+
+
+def test_select(nyc):
+    idx = nyc_index(nyc)
+    year = nyc.EST.dt.year
+    for events in (['Fog', 'Fog'], ['Fog', 'Rain'], 'Snow'):
+        mask = (nyc.Events.isin(events) if isinstance(events, list)
+                else nyc.Events == events)
+        pd.testing.assert_frame_equal(
+            idx.select(Events=events, year=(1998, 2000)),
+            nyc[mask & (year >= 1998) & (year < 2000)])
+    pd.testing.assert_frame_equal(idx.select(), nyc)
+
+
+def test_follows_replaced_frame(nyc):
+    class Table:
+        frame = nyc
+    table = Table()
+    idx = FrameIndex(table)
+    assert len(idx.eq('Events', 'Fog')) == (nyc.Events == 'Fog').sum()
+    table.frame = pd.concat([nyc, nyc.iloc[:10]])
+    pd.testing.assert_frame_equal(idx.eq('Events', 'Fog'),
+                                  table.frame[table.frame.Events == 'Fog'])
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from pdcourse.missing import MissingProfile
+
+
+@pytest.fixture
+def df():
+    rng = np.random.default_rng(3)
+    n = 500
+    out = pd.DataFrame({
+        'a': np.where(rng.random(n) < .2, np.nan, rng.normal(size=n)),
+        'b': np.where(rng.random(n) < .5, np.nan, 1.),
+        'full': np.arange(n, dtype='float64'),
+        'empty': np.full(n, np.nan),
+        'when': pd.Series(pd.date_range('2000', periods=n)).where(
+            rng.random(n) < .9),
+        'text': pd.Series(rng.choice(['x', 'y', None], n), dtype=object),
+    })
+    out.index = out.index * 2
+    return out
+
+
+def gaps(mask, group):
+    "Lengths of the runs of True in ``mask`` that do not cross ``group``"
+    run = (mask.ne(mask.shift()) | group.ne(group.shift())).cumsum()
+    return mask.groupby(run).sum()[mask.groupby(run).first()].to_numpy()
+
+
+def test_counts_percent_rows(df):
+    prof = MissingProfile(df)
+    pd.testing.assert_series_equal(prof.counts, df.isna().sum())
+    pd.testing.assert_series_equal(prof.percent, df.isna().mean().mul(100))
+    pd.testing.assert_series_equal(prof.rows, df.isna().any(axis=1))
+
+
+def test_corr(df):
+    prof = MissingProfile(df)
+    pd.testing.assert_frame_equal(prof.corr, df.isna().corr())
+
+
+@pytest.mark.parametrize('by', [None, 'groups'])
+def test_runs(df, by):
+    group = pd.Series(np.arange(len(df)) // 7, index=df.index)
+    prof = MissingProfile(df, by=group if by else None)
+    key = group if by else pd.Series(0, index=df.index)
+    for name in df:
+        expected = gaps(df[name].isna(), key)
+        np.testing.assert_array_equal(prof.run_lengths(name), expected)
+        row = prof.runs.loc[name]
+        assert row.gaps == len(expected)
+        assert row.longest == expected.max(initial=0)
+    assert prof.runs.loc['empty', 'longest'] == (7 if by else len(df))
@@ -0,0 +1,83 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pdcourse.models import ModelStore, data_digest
+
+pytest.importorskip('sklearn')
+from sklearn.ensemble import RandomForestRegressor  # noqa: E402
+from sklearn.linear_model import LinearRegression  # noqa: E402
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(2)
+    X = pd.DataFrame(rng.normal(size=(200, 3)), columns=['a', 'b', 'c'])
+    y = X.a * 2 + X.b + rng.normal(size=200) * .1
+    return X, y
+
+
+def forest():
+    return RandomForestRegressor(n_estimators=5, random_state=42)
+
+
+def test_fit_matches_plain_fit(data, tmp_path):
+    X, y = data
+    store = ModelStore(tmp_path)
+    first = store.fit(forest(), X, y)
+    assert not store.last_hit
+    again = store.fit(forest(), X, y)
+    assert store.last_hit
+    plain = forest().fit(X, y)
+    np.testing.assert_array_equal(again.predict(X), plain.predict(X))
+    np.testing.assert_array_equal(first.predict(X), plain.predict(X))
+    assert store.importances(again) == sorted(
+        zip(X.columns, plain.feature_importances_), key=lambda x: x[1],
+        reverse=True)
+
+
+def test_misses(data, tmp_path):
+    X, y = data
+    store = ModelStore(tmp_path)
+    store.fit(forest(), X, y)
+    store.fit(RandomForestRegressor(n_estimators=6, random_state=42), X, y)
+    assert not store.last_hit
+    store.fit(forest(), X.rename(columns={'c': 'd'}), y)
+    assert not store.last_hit
+    store.fit(forest(), X, y + 1)
+    assert not store.last_hit
+    assert len(store.entries()) == 4
+
+
+def test_digest():
+    X = pd.DataFrame({'a': [1., 2.]})
+    assert data_digest(X) == data_digest(X.copy())
+    assert data_digest(X) != data_digest(X.set_axis([1, 0]))
+    assert data_digest(X.to_numpy()) != data_digest(X.to_numpy().T)
+
+
+def test_eviction_is_least_recently_used(data, tmp_path):
+    X, y = data
+    store = ModelStore(tmp_path)
+    for i in range(3):
+        store.fit(LinearRegression(), X, y + i)
+    paths = [path for path, _, _ in store.entries()]
+    size = max(s for _, s, _ in store.entries())
+    # oldest first: 0, 1, 2, then using 0 makes 1 the least recent
+    for age, path in enumerate(paths):
+        os.utime(path, (1000 + age, 1000 + age))
+    store.fit(LinearRegression(), X, y)
+    assert store.last_hit
+    store.max_bytes = 3 * size
+    store.fit(LinearRegression(), X, y + 3)
+    left = {path for path, _, _ in store.entries()}
+    assert paths[1] not in left
+    assert {paths[0], paths[2]} <= left and len(left) == 3
+    # the model just stored stays even when it alone is over the limit
+    store.max_bytes = 1
+    store.fit(LinearRegression(), X, y + 4)
+    assert len(store.entries()) == 1
+    store.fit(LinearRegression(), X, y + 4)
+    assert store.last_hit
@@ -0,0 +1,47 @@
+import matplotlib
+import numpy as np
+import pandas as pd
+import pytest
+
+from pdcourse.plot import decimate, line_plot
+
+matplotlib.use('Agg')
+
+
+@pytest.fixture
+def wide():
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(rng.normal(size=(100_000, 20)).cumsum(axis=0),
+                        columns=['c{}'.format(i) for i in range(20)])
+
+
+def test_decimate_keeps_the_extremes(wide):
+    ser = wide.c3
+    thin = decimate(ser, 100)
+    assert len(thin) <= 4 * 100 + 2
+    assert thin.min() == ser.min() and thin.max() == ser.max()
+    assert thin.index.is_monotonic_increasing
+
+
+def test_line_plot_thins_each_column_on_its_own(wide):
+    ax = line_plot(wide, points=100)
+    lines = ax.get_lines()
+    assert [line.get_label() for line in lines] == list(wide.columns)
+    for line, name in zip(lines, wide.columns):
+        ys = line.get_ydata()
+        assert len(ys) <= 4 * 100 + 2
+        assert ys.min() == wide[name].min()
+        assert ys.max() == wide[name].max()
+    matplotlib.pyplot.close('all')
+
+
+def test_line_plot_x_and_subplots(wide):
+    df = wide.assign(t=np.arange(len(wide)) * .5)
+    axes = line_plot(df, x='t', y=['c0', 'c1'], points=50, subplots=True)
+    assert len(axes) == 2
+    for ax, name in zip(axes, ['c0', 'c1']):
+        (line,) = ax.get_lines()
+        assert len(line.get_xdata()) <= 4 * 50 + 2
+        assert line.get_ydata().max() == df[name].max()
+        assert ax.get_xlabel() == 't'
+    matplotlib.pyplot.close('all')
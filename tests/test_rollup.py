@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from pdcourse.rollup import TimeCube
+
+
+@pytest.fixture(scope='module')
+def daily():
+    "Three years of days with a few missing days and values"
+    rng = np.random.default_rng(6)
+    days = pd.date_range('1999-12-30', '2002-12-31', freq='D')
+    days = days[rng.random(len(days)) < .9]
+    n = len(days)
+    return pd.DataFrame({
+        'EST': days,
+        'temp': rng.normal(50, 10, n).round(1),
+        'rain': np.where(rng.random(n) < .2, np.nan, rng.exponential(size=n)),
+    })
+
+
+@pytest.mark.parametrize('freq, level', [('D', 'day'), ('3D', 'day'),
+                                         ('W', 'week'), ('2W', 'week'),
+                                         ('ME', 'month'), ('MS', 'month'),
+                                         ('QE', 'month'), ('YE', 'year')])
+def test_agg_matches_grouper(daily, freq, level):
+    cube = TimeCube(daily, key='EST')
+    aggs = ['mean', 'std', 'sum', 'min', 'max', 'count']
+    expected = daily.groupby(pd.Grouper(key='EST', freq=freq))[
+        ['temp', 'rain']].agg(aggs)
+    pd.testing.assert_frame_equal(cube.agg(freq, aggs), expected,
+                                  check_dtype=False, check_freq=False)
+    assert cube.level_for(freq) == level
+
+
+def test_single_column_matches_resample(daily):
+    cube = TimeCube(daily, key='EST')
+    expected = daily.set_index('EST').temp.resample('ME').mean()
+    pd.testing.assert_series_equal(cube.agg('ME', 'mean', 'temp'), expected,
+                                   check_freq=False)
+
+
+@pytest.mark.parametrize('freq', ['6h', '36h'])
+def test_part_day_frequencies_raise(daily, freq):
+    with pytest.raises(ValueError):
+        TimeCube(daily, key='EST').agg(freq)
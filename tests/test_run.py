@@ -0,0 +1,39 @@
+import os
+
+from pdcourse.run import cell_keys, code_stamp, output_path
+
+
+def test_cell_keys_chain():
+    keys = cell_keys(['a = 1', 'b = a + 1', 'b'], 'salt')
+    assert len(set(keys)) == 3
+    # a change invalidates that cell and everything below it
+    edited = cell_keys(['a = 1', 'b = a + 2', 'b'], 'salt')
+    assert edited[0] == keys[0] and edited[1:] != keys[1:]
+    assert edited[2] != keys[2]
+    assert cell_keys(['a = 1'], 'other')[0] != keys[0]
+
+
+def test_code_stamp(tmp_path):
+    pkg = tmp_path / 'pkg'
+    pkg.mkdir()
+    (pkg / 'load.py').write_text('x = 1\n')
+    reqs = tmp_path / 'requirements.txt'
+    reqs.write_text('pandas==2.2.3\n')
+    before = code_stamp(pkg, reqs)
+    assert code_stamp(pkg, reqs) == before
+    (pkg / 'load.py').write_text('x = 2\n')
+    after_code = code_stamp(pkg, reqs)
+    reqs.write_text('pandas==3.0.0\n')
+    assert len({before, after_code, code_stamp(pkg, reqs)}) == 3
+
+
+def test_output_path_keeps_directories(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    out = tmp_path / 'executed'
+    assert output_path(out, 'Solutions/begpandas.ipynb') != \
+        output_path(out, 'Class/begpandas.ipynb')
+    assert output_path(out, 'Class/begpandas.ipynb') == \
+        out / 'Class' / 'begpandas.ipynb'
+    outside = tmp_path.parent / 'elsewhere' / 'x.ipynb'
+    assert str(output_path(out, outside)).endswith(
+        os.path.join('elsewhere', 'x.ipynb'))
@@ -0,0 +1,71 @@
+import io
+import time
+
+import pandas as pd
+import pytest
+
+from pdcourse.load import NYC_PATH
+from pdcourse.score import Schema, Scorer, _batches, serve_stream
+
+
+def slow_lines():
+    yield 'a\n'
+    time.sleep(1)
+    yield 'b\n'
+
+
+def test_partial_batch_flushed_while_input_is_quiet():
+    start = time.perf_counter()
+    flushed = []
+    for batch in _batches(slow_lines(), batch_size=100, max_wait=.2):
+        flushed.append((time.perf_counter() - start,
+                        [line for _, line in batch]))
+    assert [lines for _, lines in flushed] == [['a\n'], ['b\n']]
+    # the first line goes out after max_wait, not when 'b' arrives
+    assert flushed[0][0] < .8
+
+
+def test_batches_cut_at_batch_size():
+    lines = ['{}\n'.format(i) for i in range(10)] + ['\n']
+    sizes = [len(batch) for batch in _batches(iter(lines), 4, 60.)]
+    assert sizes == [4, 4, 2]
+
+
+class SumModel:
+    "Stands in for a fitted forest"
+    def predict(self, X):
+        return X.sum(axis=1).to_numpy()
+
+
+@pytest.fixture
+def nyc_lines():
+    with open(NYC_PATH) as fin:
+        return [next(fin) for _ in range(21)]
+
+
+def nyc_scorer(header):
+    columns = ['Max_TemperatureF', 'PrecipitationCm', 'Events_Rain']
+    return Scorer(SumModel(), Schema('nyc', columns, header))
+
+
+@pytest.mark.parametrize('saved', [True, False])
+def test_stream_with_header(nyc_lines, saved):
+    scorer = nyc_scorer(nyc_lines[0] if saved else '')
+    out = io.StringIO()
+    serve_stream(scorer, iter(nyc_lines), out, batch_size=8)
+    expected = scorer.score(pd.read_csv(io.StringIO(''.join(nyc_lines)),
+                                        parse_dates=[0]))
+    assert out.getvalue() == 'prediction\n' + ''.join(
+        '{}\n'.format(p) for p in expected)
+
+
+def test_stream_without_header(nyc_lines):
+    scorer = nyc_scorer(nyc_lines[0])
+    with_header, without = io.StringIO(), io.StringIO()
+    serve_stream(scorer, iter(nyc_lines), with_header, batch_size=8)
+    serve_stream(scorer, iter(nyc_lines[1:]), without, batch_size=8)
+    assert without.getvalue() == with_header.getvalue()
+    assert len(without.getvalue().splitlines()) == 21
+    pd.testing.assert_series_equal(
+        scorer.score_text(''.join(nyc_lines[1:])),
+        scorer.score_text(''.join(nyc_lines)))
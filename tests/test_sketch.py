@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from pdcourse.sketch import QuantileSketch, approx_quantile, merge_all
+
+
+@pytest.fixture
+def autos():
+    rng = np.random.default_rng(8)
+    n = 20000
+    df = pd.DataFrame({
+        'year': rng.integers(1990, 2000, n),
+        'make': rng.choice(['Ford', 'Honda', 'Tesla', 'Saab'], n),
+        'city08': rng.integers(10, 40, n).astype('float64'),
+        'speed': rng.lognormal(3, 1, n),
+    })
+    df.loc[::37, 'city08'] = np.nan
+    # a make only seen in the last rows
+    df.loc[df.index[-50:], 'make'] = 'Kia'
+    return df
+
+
+def sketch_chunks(df, column, size, order=None, delta=200):
+    parts = [df.iloc[i:i + size] for i in range(0, len(df), size)]
+    if order is not None:
+        parts = [parts[i] for i in order(len(parts))]
+    return merge_all(QuantileSketch(delta).update(p[column],
+                                                  [p.year, p.make])
+                     for p in parts)
+
+
+@pytest.mark.parametrize('q', [0, .1, .5, .7, .99, 1])
+def test_merged_integers_are_exact(autos, q):
+    expected = autos.groupby(['year', 'make']).city08.quantile(q)
+    for order in (None, lambda n: range(n - 1, -1, -1)):
+        got = sketch_chunks(autos, 'city08', 1500, order).quantile(q)
+        pd.testing.assert_series_equal(got, expected, check_names=False)
+    assert set(got.index.get_level_values('make')) >= {'Kia'}
+
+
+def test_merged_counts(autos):
+    got = sketch_chunks(autos, 'city08', 999).count()
+    expected = autos.groupby(['year', 'make']).city08.count()
+    pd.testing.assert_series_equal(got, expected.astype('float64'),
+                                   check_names=False)
+
+
+@pytest.mark.parametrize('delta', [50, 200])
+def test_merged_within_rank_error(autos, delta):
+    sketch = sketch_chunks(autos, 'speed', 700, delta=delta)
+    qs = [.01, .25, .5, .9, .999]
+    got = sketch.quantile(qs)
+    for (year, make), group in autos.groupby(['year', 'make']).speed:
+        values = np.sort(group.to_numpy())
+        for q in qs:
+            found = got[(year, make, q)]
+            # the 0 based rank of ``found``, interpolated like pandas
+            rank = np.interp(found, values, np.arange(len(values)))
+            assert abs(rank / (len(values) - 1) - q) <= \
+                sketch.rank_error + 1 / len(values)
+        assert got[(year, make, qs[0])] >= values[0]
+    lows = sketch.quantile(0)
+    highs = sketch.quantile(1)
+    grouped = autos.groupby(['year', 'make']).speed
+    pd.testing.assert_series_equal(lows, grouped.min(), check_names=False)
+    pd.testing.assert_series_equal(highs, grouped.max(), check_names=False)
+
+
+def test_approx_quantile_processes(autos):
+    by = [autos.year, autos.make]
+    expected = autos.groupby(by).city08.quantile(.7)
+    for processes in (None, 3):
+        got = approx_quantile(autos.city08, .7, by=by, processes=processes)
+        pd.testing.assert_series_equal(got, expected)
+    assert approx_quantile(autos.city08, .3) == autos.city08.quantile(.3)
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from pdcourse.spatial import GridIndex
+
+
+@pytest.fixture
+def nino():
+    rng = np.random.default_rng(4)
+    n = 5000
+    df = pd.DataFrame({
+        'latitude': np.round(rng.uniform(-9, 9, n), 2),
+        'longitude': np.round(rng.uniform(-180, 180, n), 2),
+        'date': pd.Timestamp('1980-01-01') + pd.to_timedelta(
+            rng.integers(0, 20 * 365, n), unit='D'),
+        'air_temp': rng.normal(26, 2, n),
+    }, index=np.arange(n) * 7)
+    df.loc[df.index[::50], 'latitude'] = np.nan
+    df.loc[df.index[3::97], 'date'] = pd.NaT
+    # points right on cell borders and query bounds
+    df.loc[df.index[1:40:3], 'latitude'] = 2.
+    df.loc[df.index[2:40:3], 'longitude'] = 120.
+    return df
+
+
+def mask(df, lat=None, lon=None, date=None):
+    keep = df.latitude.notna() & df.longitude.notna() & df.date.notna()
+    for name, bounds in (('latitude', lat), ('longitude', lon)):
+        lo, hi = bounds or (None, None)
+        if lo is not None:
+            keep &= df[name] > lo
+        if hi is not None:
+            keep &= df[name] < hi
+    lo, hi = date or (None, None)
+    if lo is not None:
+        keep &= df.date >= lo
+    if hi is not None:
+        keep &= df.date < hi
+    return df[keep]
+
+
+@pytest.mark.parametrize('query', [
+    dict(lat=(-2, 2), lon=(120, None), date=('1980-01-01', '1990-01-01')),
+    dict(lat=(-2.5, 2.5)),
+    dict(lon=(None, -100.3), date=(None, '1985-06-15')),
+    dict(date=('1991-02-03', None)),
+    dict(lat=(2, 2)),
+    dict(lat=(50, 60)),
+    dict(date=('1990-01-01', '1980-01-01')),
+    dict(),
+])
+@pytest.mark.parametrize('cell', [1.0, 0.25, 7.5])
+def test_matches_masks(nino, query, cell):
+    grid = GridIndex(nino, cell=cell)
+    pd.testing.assert_frame_equal(grid.select(**query), mask(nino, **query))
+
+
+def test_empty_frame(nino):
+    grid = GridIndex(nino.iloc[:0])
+    assert grid.select(lat=(-2, 2)).empty
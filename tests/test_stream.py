@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from pdcourse.stream import GroupAgg, PivotAgg, stream_groupby
+
+
+@pytest.fixture
+def autos():
+    "A small stand-in for the vehicles CSV"
+    rng = np.random.default_rng(5)
+    n = 3000
+    return pd.DataFrame({
+        'year': rng.integers(1990, 2000, n),
+        'make': rng.choice(['Ford', 'Honda', 'Tesla', 'Saab'], n),
+        'drive': rng.choice(['FWD', 'RWD', 'AWD'], n),
+        'city08': np.where(rng.random(n) < .05, np.nan,
+                           rng.integers(10, 40, n)),
+    })
+
+
+def chunks(df, size=401):
+    return [df.iloc[i:i + size] for i in range(0, len(df), size)]
+
+
+STATS = ['count', 'sum', 'mean', 'var', 'std', 'min', 'max', 'size']
+
+
+def test_stream_groupby(autos):
+    by = ['year', 'make', 'drive']
+    got = stream_groupby(chunks(autos), by, 'city08', 'mean',
+                         unstack=['drive', 'make'])
+    expected = (autos.groupby(by).city08.mean().unstack('drive')
+                .unstack('make'))
+    pd.testing.assert_frame_equal(got, expected)
+
+
+def test_group_agg_stats(autos):
+    got = GroupAgg('make', 'city08')
+    for chunk in chunks(autos):
+        got.update(chunk)
+    expected = autos.groupby('make').city08.agg(STATS)
+    pd.testing.assert_frame_equal(got.result(STATS), expected,
+                                  check_dtype=False)
+
+
+def test_merge_matches_one_pass(autos):
+    halves = chunks(autos, 1500)
+    left = GroupAgg(lambda df: df.year, 'city08').update(halves[0])
+    left.merge(GroupAgg(lambda df: df.year, 'city08').update(halves[1]))
+    expected = autos.groupby('year').city08.agg(['mean', 'std', 'size'])
+    pd.testing.assert_frame_equal(left.result(['mean', 'std', 'size']),
+                                  expected, check_dtype=False)
+
+
+def test_pivot_agg(autos):
+    got = PivotAgg('drive', ['city08', 'year'])
+    for chunk in chunks(autos):
+        got.update(chunk)
+    aggs = ['mean', 'max', 'std', 'count']
+    expected = autos.pivot_table(index='drive', values=['city08', 'year'],
+                                 aggfunc=aggs)
+    pd.testing.assert_frame_equal(got.result(aggs), expected,
+                                  check_dtype=False)
+    # pandas 3 gives size as one column, PivotAgg one per value column
+    size = autos.groupby('drive').size()
+    for col in ['city08', 'year']:
+        pd.testing.assert_series_equal(got.result('size')[col], size,
+                                       check_names=False)
+
+
+def test_quantile_within_rank_error(autos):
+    got = stream_groupby(chunks(autos), 'make', 'city08', .7)
+    for make, found in got.items():
+        values = autos.city08[autos.make == make].dropna()
+        assert values.quantile(.68) <= found <= values.quantile(.72)
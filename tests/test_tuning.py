@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip('sklearn')
+from sklearn.ensemble import RandomForestRegressor  # noqa: E402
+from sklearn.metrics import r2_score  # noqa: E402
+from sklearn.model_selection import ParameterGrid, TimeSeriesSplit  # noqa
+
+from pdcourse.tuning import param_grid, run_grid, time_folds  # noqa: E402
+
+
+def test_param_grid_matches_sklearn():
+    grid = {'n_estimators': [5, 10], 'max_depth': [None, 3, 6]}
+    assert param_grid(grid) == list(ParameterGrid(grid))
+
+
+def test_time_folds_match_time_series_split():
+    rng = np.random.default_rng(1)
+    time = pd.Series(pd.date_range('2000', periods=600, freq='D'))
+    shuffled = rng.permutation(600)
+    folds = time_folds(600, 5, time.iloc[shuffled])
+    for (train, test), (sk_train, sk_test) in zip(
+            folds, TimeSeriesSplit(5).split(np.arange(600))):
+        np.testing.assert_array_equal(shuffled[train], sk_train)
+        np.testing.assert_array_equal(shuffled[test], sk_test)
+
+
+@pytest.mark.parametrize('processes', [1, 2])
+def test_run_grid_matches_plain_fits(processes):
+    rng = np.random.default_rng(6)
+    X = rng.normal(size=(240, 4)).astype('float32')
+    y = X[:, 0] * 3 + rng.normal(size=240)
+    grid = {'n_estimators': [5], 'max_depth': [2, None]}
+    got = run_grid(X, y, grid, n_splits=3, processes=processes, seed=7)
+    assert len(got) == 2
+    for row in got.itertuples():
+        params = {'n_estimators': row.n_estimators,
+                  'max_depth': None if pd.isna(row.max_depth)
+                  else int(row.max_depth)}
+        expected = []
+        for train, test in time_folds(len(y), 3):
+            model = RandomForestRegressor(random_state=7, n_jobs=1, **params)
+            model.fit(X[train], y[train])
+            expected.append(r2_score(y[test], model.predict(X[test])))
+        np.testing.assert_allclose(row.r2_folds, expected)
+        assert row.r2_mean == pytest.approx(np.mean(expected))
+    assert got.r2_mean.is_monotonic_decreasing
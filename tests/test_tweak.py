@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+
+from pdcourse.tweak import fix_col, tweak_nino, tweak_nyc
+
+
+def raw_nyc():
+    return pd.DataFrame({
+        'EST': pd.date_range('2000-01-01', periods=6),
+        ' PrecipitationIn': ['0.1', 'T', '0', '1.2', 'T', '0.3'],
+        ' Events': ['Rain', None, '', 'Fog-Rain', None, 'Snow'],
+        ' Max TemperatureF': [40, 41, 39, 50, 48, 33],
+    }, index=[10, 11, 12, 13, 14, 15])
+
+
+def notebook_nyc(df_):
+    "The chain from the notebooks"
+    return (df_
+            .rename(columns=fix_col)
+            .assign(PrecipitationIn=lambda df_: pd.to_numeric(
+                        df_.PrecipitationIn.replace('T', '0.001')),
+                    Events=lambda df_: df_.Events.fillna(''))
+            .assign(PrecipitationCm=lambda df_: df_.PrecipitationIn * 2.54))
+
+
+def test_nyc_matches_notebook():
+    df = raw_nyc()
+    pd.testing.assert_frame_equal(tweak_nyc(df), notebook_nyc(df))
+
+
+def test_reordered_rows_keep_their_index():
+    df = raw_nyc()
+    tweak_nyc(df)
+    swapped = df.iloc[[1, 0, 2, 3, 4, 5]]
+    pd.testing.assert_frame_equal(tweak_nyc(swapped), notebook_nyc(swapped))
+
+
+def test_outputs_only():
+    df = raw_nyc()
+    out = tweak_nyc(df[[' PrecipitationIn']], outputs=['PrecipitationCm'])
+    pd.testing.assert_frame_equal(out, notebook_nyc(df)[['PrecipitationCm']])
+    assert tweak_nyc.requires(['PrecipitationCm'], df) == [' PrecipitationIn']
+
+
+def test_nino():
+    df = pd.DataFrame({'obs': [1, 2], 'date': [800307, 991231],
+                       'air temp.': [20., np.nan],
+                       'zon.winds': [-4.5, 1.], 'mer.winds': [2., 0.]})
+    out = tweak_nino(df)
+    assert 'obs' not in out
+    pd.testing.assert_series_equal(
+        out.date, pd.to_datetime(df.date.astype(str), format='%y%m%d')
+                  .astype(out.date.dtype), check_names=False)
+    pd.testing.assert_series_equal(out.air_temp_F, df['air temp.']*9/5+32,
+                                   check_names=False)
+    pd.testing.assert_series_equal(out.zon_winds_mph,
+                                   df['zon.winds'] / 2.237, check_names=False)
@@ -0,0 +1,93 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pdcourse.udf import vectorize
+
+
+def lt1990(v):
+    return v >= 1980 and v < 1990
+
+
+def to_cm(v):
+    return v * 2.54
+
+
+def clip(v):
+    if v < 2:
+        return 0.
+    elif v > 8:
+        return 10.
+    return math.sqrt(v)
+
+
+def bounded(v):
+    return max(min(v, 7), 1) if not v > 9 else abs(v - 20)
+
+
+def round0(v):
+    return round(v)
+
+
+def round1(v):
+    return round(v, 1)
+
+
+def year(d):
+    return d.year
+
+
+def first(s):
+    return s.split('-')[0]
+
+
+@pytest.fixture
+def floats():
+    return pd.Series(np.arange(0, 10, .05), name='x')
+
+
+@pytest.mark.parametrize('func, mode', [
+    (to_cm, 'numpy'), (clip, 'numpy'), (bounded, 'numpy'),
+    (round0, 'numpy'), (round1, 'per value')])
+def test_floats(floats, func, mode):
+    fast = vectorize(func)
+    got = fast(floats)
+    assert fast.mode == mode
+    pd.testing.assert_series_equal(got, floats.map(func), check_dtype=False)
+
+
+def test_round_ndigits_differs_from_numpy(floats):
+    # the reason round(v, 1) is not rewritten
+    assert (np.round(floats, 1) != floats.map(round1)).any()
+
+
+def test_filter():
+    years = pd.Series(np.arange(1975, 2000), index=np.arange(25) * 3)
+    fast = vectorize(lt1990)
+    pd.testing.assert_series_equal(fast(years), years.apply(lt1990))
+    assert fast.mode == 'numpy'
+
+
+def test_datetimes():
+    when = pd.Series(pd.date_range('2000-12-30', periods=40, freq='D'))
+    when[3] = pd.NaT
+    fast = vectorize(year)
+    pd.testing.assert_series_equal(fast(when), when.map(year))
+    assert fast.mode == 'per value'
+
+
+@pytest.mark.parametrize('dtype', [object, 'category'])
+def test_strings(dtype):
+    events = pd.Series(['Fog-Rain', 'Rain', 'Snow', 'Fog', 'Rain'] * 4,
+                       dtype=dtype)
+    fast = vectorize(first)
+    pd.testing.assert_series_equal(fast(events),
+                                   events.astype(object).map(first))
+    assert fast.mode == 'per value'
+
+
+def test_frame():
+    df = pd.DataFrame({'a': [1., 2.5, 3.], 'b': [0., -1., 7.]})
+    pd.testing.assert_frame_equal(vectorize(to_cm)(df), df.map(to_cm))